@@ -0,0 +1,3 @@
+from navscan.cli import main
+
+raise SystemExit(main())
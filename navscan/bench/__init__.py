@@ -0,0 +1 @@
+"""Synthetic-universe benchmarks for Stages 2, 3 and 5 (`navscan bench`)."""
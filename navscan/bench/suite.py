@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import gc
+import json
+import logging
+import platform
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from navscan.bench.synthetic import generate_raw
+from navscan.pipeline.standardize import apply_rolling_stats, build_silver_records_for_date, write_silver_outputs
+from navscan.stages.candidates import CandidateOptions, build_candidates
+from navscan.stages.tracking import update_warehouse
+
+# name -> (symbols, weekdays)
+SIZES: Dict[str, Tuple[int, int]] = {
+    "tiny": (10, 30),
+    "small": (50, 60),
+    "medium": (200, 250),
+    "large": (1000, 250),
+}
+CASES = ("silver_records_for_date", "apply_rolling_stats", "stage3_scoring", "warehouse_load", "outcomes")
+SCAN_DATES = 10
+HORIZONS = [1, 3, 5]
+ZSCORE_WINDOW = 20
+
+# A case regresses when it is `threshold` slower than the baseline and at least this much slower in absolute
+# terms; the floor keeps millisecond-scale cases from failing on timer noise.
+MIN_REGRESSION_SECONDS = 0.005
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """Like `timeit`: collect first, then keep the cyclic collector off while timing."""
+    gc.collect()
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
+
+
+def _best_of(repeat: int, fn: Callable[[], Any]) -> float:
+    best = float("inf")
+    for _ in range(max(repeat, 1)):
+        with _gc_paused():
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _calibration_work() -> None:
+    rows = [{"symbol": f"S{i % 997:04d}", "value": (i * 7919) % 10007 / 7.0} for i in range(60_000)]
+    rows.sort(key=lambda r: (r["symbol"], r["value"]))
+    json.loads(json.dumps(rows))
+
+
+def calibrate(repeat: int = 3) -> float:
+    """Seconds for a fixed dict/sort/JSON workload; `compare` divides it out so baselines travel between machines."""
+    return round(_best_of(repeat, _calibration_work), 6)
+
+
+def _span_seconds(summary: Dict[str, Any], prefixes: Tuple[str, ...]) -> float:
+    spans = summary["metrics"]["spans"]
+    return sum(s["total_ms"] for name, s in spans.items() if name.startswith(prefixes)) / 1000
+
+
+def run_size(
+    n_symbols: int, n_days: int, workdir: Path, stage3_config: Path, repeat: int = 3, seed: int = 0
+) -> Dict[str, Any]:
+    """Time every case on one synthetic universe; each case reports its best wall time over `repeat` runs.
+
+    Stage 3 scores the last `SCAN_DATES` dates with the half-life memo disabled, so every
+    repeat does the same fitting work. Warehouse load and outcomes come from the Stage 5
+    span timers of an update into a fresh database.
+    """
+    logger = logging.getLogger("navscan.bench")
+    raw_root = workdir / "raw"
+    silver_root = workdir / "silver"
+    signals_root = workdir / "signals"
+    universe = generate_raw(raw_root, n_symbols, n_days, seed=seed)
+    symbols, dates = universe.symbols, universe.dates
+    cases: Dict[str, float] = {}
+
+    rows_by_date: Dict[str, List[Dict[str, Any]]] = {}
+    summaries: Dict[str, Dict[str, Any]] = {}
+
+    def silver_records() -> None:
+        for d in dates:
+            rows_by_date[d], summaries[d] = build_silver_records_for_date(raw_root, d, symbols, ZSCORE_WINDOW)
+
+    cases["silver_records_for_date"] = _best_of(repeat, silver_records)
+    all_rows = [r for d in dates for r in rows_by_date[d]]
+    cases["apply_rolling_stats"] = _best_of(repeat, lambda: apply_rolling_stats(all_rows, ZSCORE_WINDOW))
+    write_silver_outputs(silver_root, rows_by_date, summaries)
+
+    scan_dates = dates[-SCAN_DATES:]
+    candidate_counts: Dict[str, int] = {}
+
+    def score() -> None:
+        for d in scan_dates:
+            opts = CandidateOptions(
+                silver_root=silver_root, output_root=signals_root, config_path=stage3_config, date=d, no_memo=True
+            )
+            candidate_counts[d] = build_candidates(opts, logger).summary["candidate_count"]
+
+    cases["stage3_scoring"] = _best_of(repeat, score)
+
+    load, outcomes = float("inf"), float("inf")
+    for i in range(max(repeat, 1)):
+        db_path = workdir / f"warehouse_{i}.sqlite"
+        # A database left by an earlier run in a kept --workdir would skip every partition and pair.
+        for stale in (db_path, db_path.with_name(db_path.name + "-wal"), db_path.with_name(db_path.name + "-shm")):
+            stale.unlink(missing_ok=True)
+        with _gc_paused():
+            summary = update_warehouse(db_path, signals_root, silver_root, HORIZONS, logger, scan_dates=scan_dates)
+        load = min(load, _span_seconds(summary, ("stage5.read.", "stage5.write.")))
+        outcomes = min(outcomes, _span_seconds(summary, ("stage5.outcomes",)))
+    cases["warehouse_load"] = load
+    cases["outcomes"] = outcomes
+
+    return {
+        "symbols": n_symbols,
+        "days": n_days,
+        "silver_rows": len(all_rows),
+        "candidates": sum(candidate_counts.values()),
+        "cases": {name: round(cases[name], 6) for name in CASES},
+    }
+
+
+def run_suite(
+    sizes: List[str], stage3_config: Path, repeat: int = 3, seed: int = 0, workdir: Optional[Path] = None
+) -> Dict[str, Any]:
+    """Run every case at each named size (see `SIZES`); synthetic data lives in a temp dir unless `workdir` is set."""
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        raise ValueError(f"unknown benchmark size(s): {', '.join(unknown)}; choose from {', '.join(SIZES)}")
+    results: Dict[str, Any] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "seed": seed,
+        "calibration_s": calibrate(repeat),
+        "sizes": {},
+    }
+    for name in sizes:
+        n_symbols, n_days = SIZES[name]
+        if workdir is not None:
+            results["sizes"][name] = run_size(n_symbols, n_days, workdir / name, stage3_config, repeat, seed)
+            continue
+        with tempfile.TemporaryDirectory(prefix=f"navscan-bench-{name}-") as tmp:
+            results["sizes"][name] = run_size(n_symbols, n_days, Path(tmp), stage3_config, repeat, seed)
+    return results
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    threshold: float,
+    min_seconds: float = MIN_REGRESSION_SECONDS,
+) -> List[Dict[str, Any]]:
+    """Cases present in both result sets, each with its ratio to the baseline and a `regressed` flag.
+
+    When both sides carry a calibration time, ratios are scaled by the machines' relative
+    speed on that fixed workload, so a slower or busier host does not read as a regression.
+    """
+    speed = 1.0
+    if current.get("calibration_s") and baseline.get("calibration_s"):
+        speed = current["calibration_s"] / baseline["calibration_s"]
+    out: List[Dict[str, Any]] = []
+    for size, result in current["sizes"].items():
+        base = baseline.get("sizes", {}).get(size)
+        if base is None:
+            continue
+        for case, seconds in result["cases"].items():
+            before = base["cases"].get(case)
+            if before is None:
+                continue
+            ratio = seconds / (before * speed) if before > 0 else float("inf")
+            out.append(
+                {
+                    "size": size,
+                    "case": case,
+                    "baseline_s": before,
+                    "current_s": seconds,
+                    "ratio": round(ratio, 3),
+                    "regressed": ratio > 1 + threshold and seconds - before * speed >= min_seconds,
+                }
+            )
+    return out
+
+
+def format_results(results: Dict[str, Any], comparison: Optional[List[Dict[str, Any]]] = None) -> List[str]:
+    by_key = {(c["size"], c["case"]): c for c in comparison or []}
+    lines = [f"{'size':<8} {'case':<24} {'seconds':>10}" + ("  baseline     ratio" if comparison else "")]
+    for size, result in results["sizes"].items():
+        for case, seconds in result["cases"].items():
+            line = f"{size:<8} {case:<24} {seconds:>10.4f}"
+            c = by_key.get((size, case))
+            if c is not None:
+                line += f"  {c['baseline_s']:>8.4f}  {c['ratio']:>7.2f}x" + ("  REGRESSED" if c["regressed"] else "")
+            lines.append(line)
+    return lines
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_results(path: Path, results: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
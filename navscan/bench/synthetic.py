@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import math
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from navscan.data.fetchers.common import write_ndjson
+
+SOURCE = "synthetic"
+CATEGORIES = ("Municipal Bond", "Taxable Bond", "Equity Income", "Covered Call", "Global Equity", "Loan Participation")
+
+# Per symbol-day probabilities.
+P_PRICE_MISSING = 0.01
+P_NAV_MISSING = 0.01
+P_NAV_STALE = 0.05
+P_SHOCK = 0.01
+# Share of symbols that list partway through the window (no price before listing).
+P_LATE_LISTING = 0.03
+
+
+@dataclass
+class SyntheticUniverse:
+    symbols: List[str]
+    dates: List[str]
+
+
+@dataclass
+class _Symbol:
+    name: str
+    category: str
+    listed_from: int
+    ex_div_day: int
+    nav: float
+    pd_mean: float
+    pd_phi: float
+    pd_sigma: float
+    pd: float
+    log_volume_mean: float
+    last_nav: Optional[float] = None
+    last_nav_date: Optional[str] = None
+
+
+def weekday_dates(start: str, count: int) -> List[str]:
+    day = datetime.strptime(start, "%Y-%m-%d")
+    out: List[str] = []
+    while len(out) < count:
+        if day.weekday() < 5:
+            out.append(day.strftime("%Y-%m-%d"))
+        day += timedelta(days=1)
+    return out
+
+
+def _record(dataset: str, date_str: str, symbol: str, raw: Any, reason: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "stage": "stage1_raw",
+        "dataset": dataset,
+        "source": SOURCE,
+        "fetch_timestamp_utc": f"{date_str}T21:00:00Z",
+        "requested_date": date_str,
+        "symbol": symbol,
+        "status": "ok" if raw is not None else "error",
+        "reason": reason if raw is None else None,
+        "raw": raw,
+    }
+
+
+def _mdy(date_str: str) -> str:
+    y, m, d = date_str.split("-")
+    return f"{m}/{d}/{y}"
+
+
+def _ex_div_days(sym: _Symbol, dates: List[str]) -> List[int]:
+    """Indexes of the symbol's monthly ex-dividend dates: the first weekday on or after `ex_div_day`."""
+    out: List[int] = []
+    seen_months = set()
+    for i, d in enumerate(dates):
+        month = d[:7]
+        if month not in seen_months and int(d[8:]) >= sym.ex_div_day:
+            seen_months.add(month)
+            out.append(i)
+    return out
+
+
+def generate_raw(
+    raw_root: Path, n_symbols: int, n_days: int, seed: int = 0, start: str = "2024-01-02"
+) -> SyntheticUniverse:
+    """Write Stage 1-shaped raw snapshots for `n_symbols` x `n_days` weekdays under `raw_root`.
+
+    Premium/discount follows a per-symbol AR(1) around a fund-specific mean with
+    occasional shocks, NAV a random walk, volume a lognormal. About 1% of price and
+    NAV rows are missing, 5% of NAVs are stale (prior day's value and date), a few
+    funds list partway through, and each fund goes ex-dividend monthly. Output is a
+    pure function of the arguments.
+    """
+    rng = random.Random(seed)
+    dates = weekday_dates(start, n_days)
+    symbols: List[_Symbol] = []
+    for i in range(n_symbols):
+        late = rng.random() < P_LATE_LISTING
+        pd_mean = rng.uniform(-12.0, 3.0)
+        symbols.append(
+            _Symbol(
+                name=f"S{i:04d}",
+                category=CATEGORIES[rng.randrange(len(CATEGORIES))],
+                listed_from=rng.randrange(n_days // 2) if late and n_days > 1 else 0,
+                ex_div_day=rng.randint(1, 25),
+                nav=rng.uniform(8.0, 25.0),
+                pd_mean=pd_mean,
+                pd_phi=rng.uniform(0.85, 0.97),
+                pd_sigma=rng.uniform(0.3, 1.5),
+                pd=pd_mean,
+                log_volume_mean=rng.gauss(11.5, 1.0),
+            )
+        )
+    ex_div = {s.name: _ex_div_days(s, dates) for s in symbols}
+
+    for day_index, date_str in enumerate(dates):
+        prices: List[Dict[str, Any]] = []
+        navs: List[Dict[str, Any]] = []
+        events: List[Dict[str, Any]] = []
+        meta: List[Dict[str, Any]] = []
+        for sym in symbols:
+            sym.nav *= math.exp(rng.gauss(0.0, 0.006))
+            shock = rng.uniform(4.0, 10.0) * rng.choice((-1, 1)) if rng.random() < P_SHOCK else 0.0
+            sym.pd = sym.pd_mean + sym.pd_phi * (sym.pd - sym.pd_mean) + rng.gauss(0.0, sym.pd_sigma) + shock
+            price_missing = rng.random() < P_PRICE_MISSING or day_index < sym.listed_from
+            nav_roll = rng.random()
+            volume = int(math.exp(rng.gauss(sym.log_volume_mean, 0.5)))
+
+            if price_missing:
+                prices.append(_record("price_volume", date_str, sym.name, None, "row_not_found"))
+            else:
+                close = round(sym.nav * (1 + sym.pd / 100.0), 2)
+                prices.append(
+                    _record("price_volume", date_str, sym.name, {"Close": close, "Volume": volume, "Date": date_str})
+                )
+
+            if nav_roll < P_NAV_MISSING or day_index < sym.listed_from:
+                navs.append(_record("nav", date_str, sym.name, None, "row_not_found"))
+            elif nav_roll < P_NAV_MISSING + P_NAV_STALE and sym.last_nav is not None:
+                raw = {"NAVData": sym.last_nav, "DataDate": f"{sym.last_nav_date}T00:00:00"}
+                navs.append(_record("nav", date_str, sym.name, raw))
+            else:
+                sym.last_nav = round(sym.nav, 4)
+                sym.last_nav_date = date_str
+                raw = {"NAVData": sym.last_nav, "DataDate": f"{date_str}T00:00:00"}
+                navs.append(_record("nav", date_str, sym.name, raw))
+
+            # The events fetcher asks for 45 calendar days back and 5 forward (~32 and ~3 weekdays).
+            window = [dates[i] for i in ex_div[sym.name] if day_index - 32 <= i <= day_index + 3]
+            raw_events = [{"ExDivDateDisplay": _mdy(d), "DistributionAmount": 0.05} for d in window]
+            events.append(_record("events", date_str, sym.name, raw_events))
+            meta.append(_record("metadata", date_str, sym.name, {"Ticker": sym.name, "CategoryName": sym.category}))
+
+        for dataset, rows in (("price_volume", prices), ("nav", navs), ("events", events), ("metadata", meta)):
+            write_ndjson(raw_root / dataset / f"date={date_str}" / f"source={SOURCE}" / "snapshot.ndjson", rows)
+
+    return SyntheticUniverse([s.name for s in symbols], dates)
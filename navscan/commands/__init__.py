@@ -0,0 +1 @@
+"""`navscan` subcommands; each module builds its own parser and imports its stage code only in `main`."""
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from typing import List, Optional
+
+from navscan.commands.common import data_roots, int_list, load_run_config, valid_date, warehouse_path
+
+
+def build_parser(prog: Optional[str] = None) -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog=prog, description="Run Stages 1-3 for a date range, then one Stage 5 update")
+    p.add_argument("--start", required=True)
+    p.add_argument("--end", required=True)
+    p.add_argument("--config", default="configs/default.yaml")
+    p.add_argument("--universe", default="configs/universe_example.yaml")
+    p.add_argument("--db", default="", help="Stage 5 warehouse (default: warehouse_db from the config)")
+    p.add_argument("--horizons", default="1,3,5")
+    p.add_argument("--fetch-workers", type=int, default=4, help="dates ingested concurrently (bounds network load)")
+    p.add_argument("--score-workers", type=int, default=4, help="processes scoring dates in parallel")
+    p.add_argument("--skip-ingest", action="store_true", help="reuse raw data already on disk")
+    p.add_argument("--verbose", action="store_true")
+    return p
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None) -> int:
+    args = build_parser(prog).parse_args(argv)
+    if not (valid_date(args.start) and valid_date(args.end)):
+        print("error: --start and --end must be YYYY-MM-DD", file=sys.stderr)
+        return 2
+    if args.start > args.end:
+        print("error: --start must not be after --end", file=sys.stderr)
+        return 2
+    loaded = load_run_config(args.config, args.universe)
+    if loaded is None:
+        return 2
+    cfg, universe_path = loaded
+
+    from navscan.data.fetchers.common import load_universe_symbols
+    from navscan.logging_utils import get_logger
+    from navscan.stages.backfill import BackfillSettings, format_matrix, run_backfill
+
+    settings = BackfillSettings(
+        start=args.start,
+        end=args.end,
+        db_path=warehouse_path(cfg, args.db),
+        top_n=int(cfg.get("top_n", 10)),
+        write_full_ranked=bool(cfg.get("write_full_ranked", True)),
+        fetch_workers=args.fetch_workers,
+        score_workers=args.score_workers,
+        horizons=int_list(args.horizons),
+        skip_ingest=args.skip_ingest,
+        **data_roots(cfg),
+    )
+
+    logger = get_logger(verbose=args.verbose)
+    try:
+        out = run_backfill(settings, load_universe_symbols(universe_path), logger)
+    except Exception as exc:  # noqa: BLE001
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+
+    for line in format_matrix(out["matrix"]):
+        print(line)
+    if out["stage5"] is not None:
+        print("stage5=ok")
+    else:
+        print("stage5=" + ("failed" if "stage5" in out["errors"] else "not_run"))
+    for key, message in sorted(out["errors"].items()):
+        print(f"error[{key}]: {message}", file=sys.stderr)
+    scored = sum(1 for row in out["matrix"].values() if row["stage3"] == "ok")
+    if scored == 0:
+        return 2
+    return 1 if out["errors"] or scored < len(out["dates"]) else 0
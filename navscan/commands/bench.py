@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+
+def build_parser(prog: Optional[str] = None) -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog=prog, description="Time Stages 2, 3 and 5 on synthetic universes")
+    p.add_argument("--sizes", default="small,medium", help="comma-separated: tiny, small, medium, large")
+    p.add_argument("--repeat", type=int, default=3, help="runs per case; the best time is kept")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--config", default="configs/stage3_signals.json", help="Stage 3 config used for scoring")
+    p.add_argument("--workdir", default="", help="keep the synthetic data here instead of a temp dir")
+    p.add_argument("--output", default="", help="also write this run's results as JSON")
+    p.add_argument("--baseline", default="benchmarks/baseline.json")
+    p.add_argument("--save-baseline", action="store_true", help="write this run's results to --baseline")
+    p.add_argument(
+        "--compare",
+        action="store_true",
+        help="compare against --baseline and exit 1 if any case is more than --threshold slower",
+    )
+    p.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown as a fraction (0.25 = 25%%)")
+    return p
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None) -> int:
+    args = build_parser(prog).parse_args(argv)
+    baseline_path = Path(args.baseline)
+    if args.compare and not baseline_path.exists():
+        print(f"error: baseline not found: {baseline_path}", file=sys.stderr)
+        return 2
+
+    from navscan.bench.suite import compare, format_results, load_results, run_suite, save_results
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    try:
+        results = run_suite(
+            sizes,
+            Path(args.config),
+            repeat=args.repeat,
+            seed=args.seed,
+            workdir=Path(args.workdir) if args.workdir else None,
+        )
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+
+    comparison = None
+    if args.compare:
+        baseline = load_results(baseline_path)
+        if (baseline.get("repeat"), baseline.get("seed")) != (args.repeat, args.seed):
+            print("warning: baseline was recorded with a different --repeat/--seed", file=sys.stderr)
+        comparison = compare(results, baseline, args.threshold)
+    for line in format_results(results, comparison):
+        print(line)
+
+    if args.output:
+        save_results(Path(args.output), results)
+    if args.save_baseline:
+        save_results(baseline_path, results)
+        print(f"baseline_written={baseline_path}")
+    if comparison is not None:
+        regressed = [c for c in comparison if c["regressed"]]
+        if regressed:
+            print(f"error: {len(regressed)} case(s) regressed beyond {args.threshold:.0%}", file=sys.stderr)
+            return 1
+    return 0
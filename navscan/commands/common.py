@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+def parse_simple_yaml(path: Path) -> Dict[str, Any]:
+    data: Dict[str, Any] = {}
+    for line in path.read_text(encoding="utf-8").splitlines():
+        s = line.strip()
+        if not s or s.startswith("#"):
+            continue
+        if ":" not in s:
+            continue
+        k, v = s.split(":", 1)
+        k = k.strip()
+        v = v.strip()
+        if v.lower() in ("true", "false"):
+            data[k] = v.lower() == "true"
+        else:
+            try:
+                data[k] = int(v) if "." not in v else float(v)
+            except ValueError:
+                data[k] = v
+    return data
+
+
+def valid_date(date_str: str) -> bool:
+    return bool(re.match(r"^\d{4}-\d{2}-\d{2}$", date_str))
+
+
+def int_list(arg: str) -> List[int]:
+    return [int(x.strip()) for x in arg.split(",") if x.strip()]
+
+
+def load_run_config(config: str, universe: str) -> Optional[Tuple[Dict[str, Any], Path]]:
+    """Parsed run config and universe path, or None after printing why either is missing."""
+    config_path = Path(config)
+    if not config_path.exists():
+        print(f"error: config not found: {config_path}", file=sys.stderr)
+        return None
+    universe_path = Path(universe)
+    if not universe_path.exists():
+        print(f"error: universe not found: {universe_path}", file=sys.stderr)
+        return None
+    return parse_simple_yaml(config_path), universe_path
+
+
+def data_roots(cfg: Dict[str, Any]) -> Dict[str, Path]:
+    """Raw/silver/signals roots and the Stage 3 config named by a run config."""
+    return {
+        "raw_root": Path(str(cfg.get("raw_root", "data/raw"))),
+        "silver_root": Path(str(cfg.get("silver_root", "data/silver"))),
+        "signals_root": Path(str(cfg.get("signals_root", "data/gold/signals"))),
+        "stage3_config": Path(str(cfg.get("stage3_signals_config", "configs/stage3_signals.json"))),
+    }
+
+
+def warehouse_path(cfg: Dict[str, Any], override: str) -> Path:
+    return Path(override or cfg.get("warehouse_db", "data/warehouse/navscan_stage5.sqlite"))
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="write cProfile stats, collapsed stacks and tracemalloc top allocations per stage",
+    )
+    parser.add_argument(
+        "--profile-dir", default="", help="profile output directory (default: <reports>/date=<date>/profile)"
+    )
+
+
+def profile_dir(args: argparse.Namespace, reports_root: Path, date: str = "") -> Path:
+    if args.profile_dir:
+        return Path(args.profile_dir)
+    return reports_root / f"date={date}" / "profile" if date else reports_root / "profile"
+
+
+def stage_profile_dir(args: argparse.Namespace, output_root: Path, date: str = "") -> Path:
+    """`profile_dir` for a stage command without a reports root: under `<output_root>/_profiles/`."""
+    return profile_dir(args, output_root / "_profiles", date)
+
+
+@contextmanager
+def profiled(args: argparse.Namespace, stage: str, out_dir: Path) -> Iterator[None]:
+    """Run the body as one profiled stage when `--profile` was given; writes `profile_summary.json`."""
+    if not args.profile:
+        yield
+        return
+    from navscan.profiling import StageProfiler
+
+    profiler = StageProfiler(out_dir)
+    with profiler.stage(stage):
+        yield
+    profiler.write_summary()
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+from navscan.commands.common import add_profile_arguments, profiled, stage_profile_dir
+
+
+def build_parser(prog: Optional[str] = None) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=prog, description="Run Stage 1 raw ingestion.")
+    parser.add_argument("--dates", required=True, help="Comma-separated dates, e.g. 2026-02-19,2026-02-20")
+    parser.add_argument("--universe", default="configs/universe_example.yaml")
+    parser.add_argument("--raw-root", default="data/raw")
+    add_profile_arguments(parser)
+    parser.add_argument("--verbose", action="store_true")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None) -> int:
+    args = build_parser(prog).parse_args(argv)
+
+    from navscan.data.fetchers.common import load_universe_symbols
+    from navscan.logging_utils import get_logger
+    from navscan.stages.ingest import ingest_dates
+
+    logger = get_logger(verbose=args.verbose)
+    symbols = load_universe_symbols(Path(args.universe))
+    dates = [d.strip() for d in args.dates.split(",") if d.strip()]
+
+    out_dir = stage_profile_dir(args, Path(args.raw_root), dates[0] if len(dates) == 1 else "")
+    with profiled(args, "stage1", out_dir):
+        ingest_dates(dates, symbols, Path(args.raw_root), logger)
+    return 0
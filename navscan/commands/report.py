@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from navscan.commands.common import (
+    add_profile_arguments,
+    data_roots,
+    parse_simple_yaml,
+    profile_dir,
+    profiled,
+    valid_date,
+)
+
+
+def build_parser(prog: Optional[str] = None) -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog=prog, description="Run Stage 4 (CSV + markdown report) from existing outputs")
+    p.add_argument("--date", required=True)
+    p.add_argument("--config", default="configs/default.yaml", help="run config naming the data roots")
+    p.add_argument("--output-dir", default="")
+    p.add_argument("--top-n", type=int, default=0, help="default: top_n from the config")
+    add_profile_arguments(p)
+    return p
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None) -> int:
+    args = build_parser(prog).parse_args(argv)
+    if not valid_date(args.date):
+        print("error: --date must be YYYY-MM-DD", file=sys.stderr)
+        return 2
+    config_path = Path(args.config)
+    if not config_path.exists():
+        print(f"error: config not found: {config_path}", file=sys.stderr)
+        return 2
+    cfg = parse_simple_yaml(config_path)
+
+    from navscan.stages.report import report_for_date
+
+    roots = data_roots(cfg)
+    reports_root = Path(args.output_dir or cfg.get("reports_root", "reports"))
+    try:
+        with profiled(args, "stage4", profile_dir(args, reports_root, args.date)):
+            csv_path, md_path = report_for_date(
+                args.date,
+                roots["raw_root"],
+                roots["silver_root"],
+                roots["signals_root"],
+                reports_root,
+                args.top_n or int(cfg.get("top_n", 10)),
+            )
+    except FileNotFoundError as exc:
+        print(f"error: missing Stage 1-3 output: {exc.filename}", file=sys.stderr)
+        return 2
+    print(f"generated_csv={csv_path}")
+    print(f"generated_markdown={md_path}")
+    return 0
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from navscan.commands.common import add_profile_arguments, data_roots, load_run_config, profile_dir, valid_date
+
+
+def build_parser(prog: Optional[str] = None) -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog=prog, description="Run Stage 1-4 MVP flow for a date")
+    p.add_argument("--date", required=True)
+    p.add_argument("--config", default="configs/default.yaml")
+    p.add_argument("--universe", default="configs/universe_example.yaml")
+    p.add_argument("--output-dir", default="")
+    p.add_argument(
+        "--profiles",
+        default="",
+        help="JSON list of (universe, config, output_dir) run profiles sharing one Stage 1-2 pass; "
+        "replaces --config/--universe/--output-dir",
+    )
+    p.add_argument("--force", action="store_true", help="rerun every stage even if its inputs are unchanged")
+    p.add_argument(
+        "--metrics-textfile",
+        default="",
+        help="also write run metrics in Prometheus text format here (node_exporter textfile collector)",
+    )
+    add_profile_arguments(p)
+    p.add_argument("--verbose", action="store_true")
+    return p
+
+
+def _run_settings(cfg: Dict[str, Any], date: str, output_dir: str):
+    from navscan.stages.runner import RunSettings
+
+    return RunSettings(
+        date=date,
+        reports_root=Path(output_dir or cfg.get("reports_root", "reports")),
+        top_n=int(cfg.get("top_n", 10)),
+        stage3_workers=int(cfg.get("stage3_workers", 1)),
+        write_full_ranked=bool(cfg.get("write_full_ranked", True)),
+        **data_roots(cfg),
+    )
+
+
+def _load_profiles(path: Path, date: str):
+    """RunProfiles from a manifest, or None after printing why it is unusable."""
+    from navscan.stages.runner import RunProfile
+
+    if not path.exists():
+        print(f"error: profiles file not found: {path}", file=sys.stderr)
+        return None
+    entries = json.loads(path.read_text(encoding="utf-8")).get("profiles", [])
+    profiles = []
+    for i, entry in enumerate(entries):
+        missing = [k for k in ("name", "universe", "config") if not entry.get(k)]
+        if missing:
+            print(f"error: profile #{i + 1} in {path} lacks {', '.join(missing)}", file=sys.stderr)
+            return None
+        loaded = load_run_config(entry["config"], entry["universe"])
+        if loaded is None:
+            return None
+        cfg, universe_path = loaded
+        settings = _run_settings(cfg, date, entry.get("output_dir", ""))
+        if entry.get("signals_root"):
+            settings.signals_root = Path(entry["signals_root"])
+        profiles.append(RunProfile(entry["name"], universe_path, settings))
+    if not profiles:
+        print(f"error: no profiles in {path}", file=sys.stderr)
+        return None
+    return profiles
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None) -> int:
+    args = build_parser(prog).parse_args(argv)
+    if not valid_date(args.date):
+        print("error: --date must be YYYY-MM-DD", file=sys.stderr)
+        return 2
+    if args.profiles:
+        return _main_profiles(args)
+    loaded = load_run_config(args.config, args.universe)
+    if loaded is None:
+        return 2
+    cfg, universe_path = loaded
+
+    from navscan.logging_utils import get_logger
+    from navscan.stages.runner import run_pipeline
+
+    settings = _run_settings(cfg, args.date, args.output_dir)
+
+    profiler = None
+    if args.profile:
+        from navscan.profiling import StageProfiler
+
+        profiler = StageProfiler(profile_dir(args, settings.reports_root, args.date))
+
+    logger = get_logger(verbose=args.verbose)
+    try:
+        result = run_pipeline(settings, universe_path, logger, force=args.force, profiler=profiler)
+    except Exception as exc:  # noqa: BLE001
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+
+    metrics_textfile = args.metrics_textfile or cfg.get("metrics_textfile", "")
+    if metrics_textfile:
+        from navscan.metrics import write_prometheus_textfile
+
+        write_prometheus_textfile(Path(metrics_textfile), result.metrics, {"date": args.date})
+
+    print("stages=" + ",".join(f"{k}:{v}" for k, v in result.stages.items()))
+    print(f"generated_csv={result.csv_path}")
+    print(f"generated_markdown={result.md_path}")
+    if profiler is not None:
+        print(f"profile_dir={profiler.out_dir}")
+    if not result.candidate_count:
+        print("warning: no candidates passed filters", file=sys.stderr)
+        return 1
+    return 0
+
+
+def _main_profiles(args: argparse.Namespace) -> int:
+    profiles = _load_profiles(Path(args.profiles), args.date)
+    if profiles is None:
+        return 2
+
+    from navscan.logging_utils import get_logger
+    from navscan.stages.runner import run_profiles
+
+    profiler = None
+    if args.profile:
+        from navscan.profiling import StageProfiler
+
+        profiler = StageProfiler(profile_dir(args, profiles[0].settings.reports_root, args.date))
+
+    logger = get_logger(verbose=args.verbose)
+    try:
+        results = run_profiles(profiles, logger, force=args.force, profiler=profiler)
+    except Exception as exc:  # noqa: BLE001
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+
+    if args.metrics_textfile:
+        from navscan.metrics import write_prometheus_series
+
+        series = [(r.metrics, {"date": args.date, "profile": name}) for name, r in results.items()]
+        write_prometheus_series(Path(args.metrics_textfile), series)
+
+    empty = []
+    for name, result in results.items():
+        print(f"profile={name} stages=" + ",".join(f"{k}:{v}" for k, v in result.stages.items()))
+        print(f"profile={name} generated_csv={result.csv_path}")
+        print(f"profile={name} generated_markdown={result.md_path}")
+        if not result.candidate_count:
+            empty.append(name)
+    if profiler is not None:
+        print(f"profile_dir={profiler.out_dir}")
+    if empty:
+        print(f"warning: no candidates passed filters for profile(s): {', '.join(empty)}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from navscan.commands.common import data_roots, int_list, load_run_config, warehouse_path
+
+
+def build_parser(prog: Optional[str] = None) -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog=prog, description="Keep state warm and scan each new raw date as it lands")
+    p.add_argument("--config", default="configs/default.yaml")
+    p.add_argument("--universe", default="configs/universe_example.yaml")
+    p.add_argument("--output-dir", default="")
+    p.add_argument("--db", default="", help="Stage 5 warehouse (default: warehouse_db from the config)")
+    p.add_argument("--horizons", default="1,3,5")
+    p.add_argument("--at", default="", help="HH:MM local time to run Stage 1 for today on weekdays")
+    p.add_argument("--poll-seconds", type=float, default=60.0, help="how often to look for new raw dates")
+    p.add_argument("--once", action="store_true", help="process pending dates once and exit")
+    p.add_argument("--verbose", action="store_true")
+    return p
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None) -> int:
+    args = build_parser(prog).parse_args(argv)
+    if args.at and not re.match(r"^\d{2}:\d{2}$", args.at):
+        print("error: --at must be HH:MM", file=sys.stderr)
+        return 2
+    loaded = load_run_config(args.config, args.universe)
+    if loaded is None:
+        return 2
+    cfg, universe_path = loaded
+
+    from navscan.logging_utils import get_logger
+    from navscan.stages.daemon import ScanDaemon, ServeSettings
+
+    settings = ServeSettings(
+        reports_root=Path(args.output_dir or cfg.get("reports_root", "reports")),
+        db_path=warehouse_path(cfg, args.db),
+        top_n=int(cfg.get("top_n", 10)),
+        write_full_ranked=bool(cfg.get("write_full_ranked", True)),
+        horizons=int_list(args.horizons),
+        run_at=args.at or None,
+        poll_seconds=args.poll_seconds,
+        **data_roots(cfg),
+    )
+
+    logger = get_logger(verbose=args.verbose)
+    daemon = ScanDaemon(settings, universe_path, logger)
+    try:
+        daemon.start()
+        daemon.serve_forever(max_ticks=1 if args.once else None)
+    except Exception as exc:  # noqa: BLE001
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+    finally:
+        daemon.close()
+    return 0
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+from navscan.commands.common import add_profile_arguments, profiled, stage_profile_dir
+from navscan.signals.scan import HALF_LIFE_MODES
+
+
+def build_parser(prog: Optional[str] = None) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=prog, description="Build Stage 3 ranked candidates.")
+    parser.add_argument("--silver-root", default="data/silver")
+    parser.add_argument("--output-root", default="data/gold/signals")
+    parser.add_argument("--config", default="configs/stage3_signals.json")
+    parser.add_argument("--date", default="")
+    parser.add_argument(
+        "--half-life-mode",
+        choices=HALF_LIFE_MODES,
+        default="candidates",
+        help="candidates: fit only rows passing extreme/liquidity/event filters; "
+        "top_k: only the top-K of those by extreme score; full: fit every row (research runs)",
+    )
+    parser.add_argument("--half-life-top-k", type=int, default=25)
+    parser.add_argument(
+        "--top-n",
+        type=int,
+        default=0,
+        help="also write the best N candidates to candidates_top.ndjson (bounded heap when the full file is skipped)",
+    )
+    parser.add_argument(
+        "--skip-full-ranked",
+        dest="write_full_ranked",
+        action="store_false",
+        help="do not write candidates_ranked.ndjson",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="shard half-life fitting across N processes; each reads only its shard's history",
+    )
+    parser.add_argument(
+        "--memo-cache",
+        default="",
+        help="half-life memo database (default: <output-root>/_memo/half_life.sqlite)",
+    )
+    parser.add_argument("--memo-max-entries", type=int, default=500_000)
+    parser.add_argument("--no-memo", action="store_true", help="always refit half-lives")
+    add_profile_arguments(parser)
+    parser.add_argument("--verbose", action="store_true")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None) -> int:
+    args = build_parser(prog).parse_args(argv)
+
+    from navscan.logging_utils import get_logger
+    from navscan.stages.candidates import CandidateOptions, build_candidates
+
+    logger = get_logger(verbose=args.verbose)
+    opts = CandidateOptions(
+        silver_root=Path(args.silver_root),
+        output_root=Path(args.output_root),
+        config_path=Path(args.config),
+        date=args.date,
+        half_life_mode=args.half_life_mode,
+        half_life_top_k=args.half_life_top_k,
+        top_n=args.top_n,
+        write_full_ranked=args.write_full_ranked,
+        workers=args.workers,
+        memo_cache=args.memo_cache,
+        memo_max_entries=args.memo_max_entries,
+        no_memo=args.no_memo,
+    )
+    with profiled(args, "stage3", stage_profile_dir(args, Path(args.output_root), args.date)):
+        build_candidates(opts, logger)
+    return 0
+
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+from navscan.commands.common import add_profile_arguments, profiled, stage_profile_dir
+
+
+def build_parser(prog: Optional[str] = None) -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog=prog, description="Build Stage 2 silver dataset from raw.")
+    parser.add_argument("--raw-root", default="data/raw")
+    parser.add_argument("--silver-root", default="data/silver")
+    parser.add_argument("--universe", default="configs/universe_example.yaml")
+    parser.add_argument("--dates", default="")
+    parser.add_argument("--zscore-window", type=int, default=20)
+    add_profile_arguments(parser)
+    parser.add_argument("--verbose", action="store_true")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None) -> int:
+    args = build_parser(prog).parse_args(argv)
+
+    from navscan.data.fetchers.common import load_universe_symbols
+    from navscan.logging_utils import get_logger
+    from navscan.stages.silver import build_silver
+
+    logger = get_logger(verbose=args.verbose)
+    symbols = load_universe_symbols(Path(args.universe))
+    dates = [d.strip() for d in args.dates.split(",") if d.strip()]
+    out_dir = stage_profile_dir(args, Path(args.silver_root), dates[0] if len(dates) == 1 else "")
+    with profiled(args, "stage2", out_dir):
+        build_silver(Path(args.raw_root), Path(args.silver_root), symbols, dates, args.zscore_window, logger)
+    return 0
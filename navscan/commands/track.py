@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from navscan.commands.common import add_profile_arguments, profiled, stage_profile_dir
+from navscan.tracking.asof import HORIZON_MODES
+from navscan.tracking.queries import ROLLUP_GROUPS
+from navscan.tracking.store import CONNECTION_PROFILES, DEFAULT_PROFILE
+
+
+def _date_list(arg_dates: str, discovered: Iterable[str]) -> List[str]:
+    if arg_dates.strip():
+        return sorted({x.strip() for x in arg_dates.split(",") if x.strip()})
+    return sorted(set(discovered))
+
+
+def cmd_update(args: argparse.Namespace) -> int:
+    from navscan.logging_utils import get_logger
+    from navscan.stages.tracking import update_warehouse
+
+    logger = get_logger(verbose=args.verbose)
+    horizons = [int(x.strip()) for x in args.horizons.split(",") if x.strip()]
+    scan_dates = [x.strip() for x in args.scan_dates.split(",") if x.strip()]
+    out_dir = stage_profile_dir(args, Path(args.db).parent, scan_dates[0] if len(scan_dates) == 1 else "")
+    with profiled(args, "stage5", out_dir):
+        summary = update_warehouse(
+            Path(args.db),
+            Path(args.signals_root),
+            Path(args.silver_root),
+            horizons,
+            logger,
+            scan_dates=scan_dates,
+            horizon_mode=args.horizon_mode,
+            recompute_outcomes=args.recompute_outcomes,
+            force_reload=args.force_reload,
+            db_profile=args.db_profile,
+        )
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+def _query_connection(db_path: Path):
+    from navscan.tracking.store import connect, connect_readonly, init_schema
+
+    if not db_path.exists():
+        # Nothing loaded yet: create an empty warehouse so queries return zero counts.
+        conn = connect(db_path)
+        init_schema(conn)
+        return conn
+    return connect_readonly(db_path)
+
+
+def cmd_query(args: argparse.Namespace) -> int:
+    from navscan.tracking.queries import query_reverted_by_date
+
+    conn = _query_connection(Path(args.db))
+    out = query_reverted_by_date(conn, args.scan_date, args.top_n, args.as_of_date)
+    print(json.dumps(out, indent=2))
+    return 0
+
+
+def cmd_query_range(args: argparse.Namespace) -> int:
+    from navscan.tracking.queries import query_reverted_by_date_range
+
+    conn = _query_connection(Path(args.db))
+    out = query_reverted_by_date_range(conn, args.start, args.end, args.top_n, args.as_of_date)
+    print(json.dumps(out, indent=2))
+    return 0
+
+
+def cmd_paths(args: argparse.Namespace) -> int:
+    from navscan.logging_utils import get_logger
+    from navscan.tracking.paths import compute_path_metrics
+    from navscan.tracking.store import connect, init_schema, record_run
+
+    logger = get_logger(verbose=args.verbose)
+    db_path = Path(args.db)
+    windows = [int(x.strip()) for x in args.windows.split(",") if x.strip()]
+    conn = connect(db_path, profile=args.db_profile)
+    init_schema(conn)
+    record_run(conn, "paths", f"windows={windows}")
+    known = [r["scan_date"] for r in conn.execute("SELECT DISTINCT scan_date FROM candidates ORDER BY scan_date")]
+    dates = _date_list(args.scan_dates, known)
+    counts = compute_path_metrics(conn, dates, windows)
+    summary = {"db": str(db_path), "scan_dates_considered": len(dates), "windows": windows, "path_counts": counts}
+    logger.info(
+        "stage5_paths_complete",
+        extra={"stage": "stage5", "source": "tracking", "symbol": "-", "reason": json.dumps(summary)},
+    )
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+def cmd_archive(args: argparse.Namespace) -> int:
+    from navscan.logging_utils import get_logger
+    from navscan.tracking.archive import archive_snapshot_year, closed_snapshot_years
+    from navscan.tracking.store import connect, init_schema, record_run
+
+    logger = get_logger(verbose=args.verbose)
+    db_path = Path(args.db)
+    conn = connect(db_path, profile=args.db_profile)
+    init_schema(conn)
+    if args.years.strip():
+        years = sorted({int(x.strip()) for x in args.years.split(",") if x.strip()})
+    else:
+        years = closed_snapshot_years(conn)
+    archive_dir = Path(args.archive_dir) if args.archive_dir else db_path.parent / "archive"
+    results = [archive_snapshot_year(conn, year, archive_dir) for year in years]
+    if results and args.vacuum:
+        conn.execute("VACUUM")
+    record_run(conn, "archive", f"years={years}")
+    summary = {"db": str(db_path), "archive_dir": str(archive_dir), "archived": results}
+    logger.info(
+        "stage5_archive_complete",
+        extra={"stage": "stage5", "source": "tracking", "symbol": "-", "reason": json.dumps(summary)},
+    )
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+def cmd_rollup(args: argparse.Namespace) -> int:
+    from navscan.tracking.queries import query_rollups
+
+    conn = _query_connection(Path(args.db))
+    group_by = [g.strip() for g in args.group_by.split(",") if g.strip()]
+    out = query_rollups(conn, args.start, args.end, group_by, args.horizon)
+    print(json.dumps(out, indent=2))
+    return 0
+
+
+def cmd_api(args: argparse.Namespace) -> int:
+    from navscan.tracking.api import make_server
+
+    db_path = Path(args.db)
+    if not db_path.exists():
+        print(f"error: warehouse not found: {db_path}", file=sys.stderr)
+        return 2
+    server = make_server(db_path, args.host, args.port, args.pool_size, args.cache_entries)
+    host, port = server.server_address[:2]
+    print(f"serving http://{host}:{port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.service.pool.close()
+    return 0
+
+
+def build_parser(prog: Optional[str] = None) -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(prog=prog, description="Stage 5 tracking")
+    sub = p.add_subparsers(dest="command", required=True)
+
+    up = sub.add_parser("update")
+    up.add_argument("--db", default="data/warehouse/navscan_stage5.sqlite")
+    up.add_argument("--signals-root", default="data/gold/signals")
+    up.add_argument("--silver-root", default="data/silver")
+    up.add_argument("--scan-dates", default="")
+    up.add_argument("--horizons", default="1,3,5")
+    up.add_argument(
+        "--horizon-mode",
+        choices=HORIZON_MODES,
+        default="calendar",
+        help="calendar: snapshot exactly H days later; trading: H-th observation later; "
+        "asof: latest observation on or before H days later",
+    )
+    up.add_argument(
+        "--recompute-outcomes",
+        action="store_true",
+        help="recompute every (scan date, horizon) pair instead of only those whose inputs changed",
+    )
+    up.add_argument("--db-profile", choices=sorted(CONNECTION_PROFILES), default=DEFAULT_PROFILE)
+    up.add_argument("--force-reload", action="store_true", help="reload partitions even if their fingerprint is unchanged")
+    add_profile_arguments(up)
+    up.add_argument("--verbose", action="store_true")
+
+    q = sub.add_parser("query")
+    q.add_argument("--db", default="data/warehouse/navscan_stage5.sqlite")
+    q.add_argument("--scan-date", required=True)
+    q.add_argument("--top-n", type=int, default=10)
+    q.add_argument("--as-of-date", required=True)
+
+    qr = sub.add_parser("query-range")
+    qr.add_argument("--db", default="data/warehouse/navscan_stage5.sqlite")
+    qr.add_argument("--start", required=True)
+    qr.add_argument("--end", required=True)
+    qr.add_argument("--top-n", type=int, default=10)
+    qr.add_argument("--as-of-date", required=True)
+
+    pa = sub.add_parser("paths", help="forward-path metrics (max reversion, first reversion, zero cross)")
+    pa.add_argument("--db", default="data/warehouse/navscan_stage5.sqlite")
+    pa.add_argument("--scan-dates", default="", help="comma-separated (default: every scan date with candidates)")
+    pa.add_argument("--windows", default="5,10,20", help="forward window lengths in calendar days")
+    pa.add_argument("--db-profile", choices=sorted(CONNECTION_PROFILES), default=DEFAULT_PROFILE)
+    pa.add_argument("--verbose", action="store_true")
+
+    ar = sub.add_parser("archive", help="move closed years of snapshots into per-year archive files")
+    ar.add_argument("--db", default="data/warehouse/navscan_stage5.sqlite")
+    ar.add_argument("--years", default="", help="comma-separated years (default: every closed year)")
+    ar.add_argument("--archive-dir", default="", help="default: <db dir>/archive")
+    ar.add_argument("--vacuum", action="store_true", help="VACUUM the hot database afterwards")
+    ar.add_argument("--db-profile", choices=sorted(CONNECTION_PROFILES), default=DEFAULT_PROFILE)
+    ar.add_argument("--verbose", action="store_true")
+
+    ru = sub.add_parser("rollup")
+    ru.add_argument("--db", default="data/warehouse/navscan_stage5.sqlite")
+    ru.add_argument("--start", required=True)
+    ru.add_argument("--end", required=True)
+    ru.add_argument("--horizon", type=int, default=None)
+    ru.add_argument(
+        "--group-by",
+        default="horizon,rank_bucket",
+        help=f"comma-separated keys from: {', '.join(ROLLUP_GROUPS)}",
+    )
+
+    api = sub.add_parser("api", help="read-only local HTTP/JSON query API over the warehouse")
+    api.add_argument("--db", default="data/warehouse/navscan_stage5.sqlite")
+    api.add_argument("--host", default="127.0.0.1")
+    api.add_argument("--port", type=int, default=8765)
+    api.add_argument("--pool-size", type=int, default=4, help="read-only connections shared by request threads")
+    api.add_argument("--cache-entries", type=int, default=1024, help="LRU result cache size")
+    return p
+
+
+def main(argv: Optional[List[str]] = None, prog: Optional[str] = None) -> int:
+    args = build_parser(prog).parse_args(argv)
+    if args.command == "update":
+        return cmd_update(args)
+    if args.command == "query":
+        return cmd_query(args)
+    if args.command == "query-range":
+        return cmd_query_range(args)
+    if args.command == "rollup":
+        return cmd_rollup(args)
+    if args.command == "archive":
+        return cmd_archive(args)
+    if args.command == "paths":
+        return cmd_paths(args)
+    if args.command == "api":
+        return cmd_api(args)
+    return 2
+
@@ -8,6 +8,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from navscan import metrics
+
 
 def utc_now_iso() -> str:
     return datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
@@ -41,6 +43,9 @@ def http_get_json_with_retry(
 ) -> Any:
     last_error: Optional[Exception] = None
     for i in range(1, attempts + 1):
+        metrics.incr("stage1.http.requests")
+        if i > 1:
+            metrics.incr("stage1.http.retries")
         try:
             proc = subprocess.run(
                 ["curl", "-sS", "-L", "--max-time", str(timeout_seconds), url],
@@ -48,11 +53,13 @@ def http_get_json_with_retry(
                 capture_output=True,
                 text=True,
             )
+            metrics.incr("stage1.http.bytes", len(proc.stdout))
             return json.loads(proc.stdout)
         except Exception as exc:  # noqa: BLE001
             last_error = exc
             if i < attempts:
                 time.sleep(sleep_seconds * i)
+    metrics.incr("stage1.http.failures")
     raise RuntimeError(f"Failed GET after {attempts} attempts: {url}; err={last_error}")
 
 
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class Metrics:
+    """Span timers and counters for one run (or one part of it).
+
+    Span and counter names are dotted paths such as `stage1.fetch.nav` or
+    `stage5.rows.snapshots`; each span records calls, total and max wall time.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._spans: Dict[str, List[float]] = {}
+        self._counters: Dict[str, float] = {}
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._record(name, 1, elapsed, elapsed)
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def _record(self, name: str, calls: int, total: float, longest: float) -> None:
+        with self._lock:
+            entry = self._spans.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += calls
+            entry[1] += total
+            entry[2] = max(entry[2], longest)
+
+    def merge(self, other: "Metrics") -> None:
+        with other._lock:
+            spans = {k: list(v) for k, v in other._spans.items()}
+            counters = dict(other._counters)
+        for name, (calls, total, longest) in spans.items():
+            self._record(name, int(calls), total, longest)
+        for name, value in counters.items():
+            self.incr(name, value)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = {
+                name: {"calls": int(calls), "total_ms": round(total * 1000, 3), "max_ms": round(longest * 1000, 3)}
+                for name, (calls, total, longest) in sorted(self._spans.items())
+            }
+            counters = {name: value for name, value in sorted(self._counters.items())}
+        return {"spans": spans, "counters": counters}
+
+
+_root = Metrics()
+_active = threading.local()
+
+
+def current() -> Metrics:
+    """Registry that `span`/`incr` report to on this thread."""
+    return getattr(_active, "metrics", None) or _root
+
+
+@contextmanager
+def scope() -> Iterator[Metrics]:
+    """Collect this thread's spans and counters separately, then add them to the enclosing registry.
+
+    Stage 1 runs several dates on worker threads; each date's scope keeps its own numbers.
+    """
+    parent = current()
+    child = Metrics()
+    _active.metrics = child
+    try:
+        yield child
+    finally:
+        _active.metrics = None if parent is _root else parent
+        parent.merge(child)
+
+
+def span(name: str):
+    return current().span(name)
+
+
+def incr(name: str, value: float = 1) -> None:
+    current().incr(name, value)
+
+
+def _label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def prometheus_text(snapshot: Dict[str, Any], labels: Optional[Dict[str, str]] = None) -> str:
+    """Prometheus text exposition of an `as_dict()` snapshot; values describe the last run (gauges)."""
+    return prometheus_text_series([(snapshot, labels or {})])
+
+
+def prometheus_text_series(series: List[Tuple[Dict[str, Any], Dict[str, str]]]) -> str:
+    """Several snapshots in one exposition, told apart by their labels (e.g. one per run profile)."""
+    bases = [("".join(f',{k}="{_label_value(v)}"' for k, v in sorted(labels.items())), snap) for snap, labels in series]
+    lines = [
+        "# HELP navscan_span_seconds Wall-clock seconds spent in a span during the last run.",
+        "# TYPE navscan_span_seconds gauge",
+    ]
+    for base, snap in bases:
+        for name, s in snap.get("spans", {}).items():
+            lines.append(f'navscan_span_seconds{{span="{_label_value(name)}"{base}}} {s["total_ms"] / 1000:.6f}')
+    lines += [
+        "# HELP navscan_span_calls Times a span was entered during the last run.",
+        "# TYPE navscan_span_calls gauge",
+    ]
+    for base, snap in bases:
+        for name, s in snap.get("spans", {}).items():
+            lines.append(f'navscan_span_calls{{span="{_label_value(name)}"{base}}} {s["calls"]}')
+    lines += [
+        "# HELP navscan_count Counter values (rows, requests, bytes, retries) for the last run.",
+        "# TYPE navscan_count gauge",
+    ]
+    for base, snap in bases:
+        for name, value in snap.get("counters", {}).items():
+            lines.append(f'navscan_count{{name="{_label_value(name)}"{base}}} {value:g}')
+    lines += [
+        "# HELP navscan_last_run_timestamp_seconds Unix time the metrics were written.",
+        "# TYPE navscan_last_run_timestamp_seconds gauge",
+    ]
+    now = time.time()
+    for base, _snap in bases:
+        lines.append(f"navscan_last_run_timestamp_seconds{'{' + base.lstrip(',') + '}' if base else ''} {now:.0f}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus_textfile(path: Path, snapshot: Dict[str, Any], labels: Optional[Dict[str, str]] = None) -> None:
+    """Write for the node_exporter textfile collector: temp file then rename, so scrapes never see half a file."""
+    write_prometheus_series(path, [(snapshot, labels or {})])
+
+
+def write_prometheus_series(path: Path, series: List[Tuple[Dict[str, Any], Dict[str, str]]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(prometheus_text_series(series), encoding="utf-8")
+    os.replace(tmp, path)
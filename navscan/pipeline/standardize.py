@@ -6,6 +6,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from navscan import metrics
 from navscan.features.liquidity import compute_dollar_volume
 from navscan.features.premium_discount import compute_premium_discount_pct
 from navscan.features.statistics import rolling_zscore
@@ -79,16 +80,31 @@ def build_silver_records_for_date(
     symbols: Iterable[str],
     zscore_window: int,
 ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
-    price_path = _first_snapshot_path(raw_root, "price_volume", date_str)
-    nav_path = _first_snapshot_path(raw_root, "nav", date_str)
-    events_path = _first_snapshot_path(raw_root, "events", date_str)
-    meta_path = _first_snapshot_path(raw_root, "metadata", date_str)
+    with metrics.span("stage2.parse"):
+        price_path = _first_snapshot_path(raw_root, "price_volume", date_str)
+        nav_path = _first_snapshot_path(raw_root, "nav", date_str)
+        events_path = _first_snapshot_path(raw_root, "events", date_str)
+        meta_path = _first_snapshot_path(raw_root, "metadata", date_str)
 
-    price_rows = _read_ndjson(price_path) if price_path else []
-    nav_rows = _read_ndjson(nav_path) if nav_path else []
-    events_rows = _read_ndjson(events_path) if events_path else []
-    meta_rows = _read_ndjson(meta_path) if meta_path else []
+        price_rows = _read_ndjson(price_path) if price_path else []
+        nav_rows = _read_ndjson(nav_path) if nav_path else []
+        events_rows = _read_ndjson(events_path) if events_path else []
+        meta_rows = _read_ndjson(meta_path) if meta_path else []
+    metrics.incr("stage2.raw_rows", len(price_rows) + len(nav_rows) + len(events_rows) + len(meta_rows))
 
+    with metrics.span("stage2.join"):
+        return _join_raw_rows(date_str, symbols, zscore_window, price_rows, nav_rows, events_rows, meta_rows)
+
+
+def _join_raw_rows(
+    date_str: str,
+    symbols: Iterable[str],
+    zscore_window: int,
+    price_rows: List[Dict[str, Any]],
+    nav_rows: List[Dict[str, Any]],
+    events_rows: List[Dict[str, Any]],
+    meta_rows: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
     by_symbol: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
     for r in price_rows:
         by_symbol[r.get("symbol", "")]["price"] = r
@@ -157,7 +173,11 @@ def build_silver_records_for_date(
         }
         silver_rows.append(row)
 
-    summary = {
+    return silver_rows, summarize_silver_rows(date_str, silver_rows)
+
+
+def summarize_silver_rows(date_str: str, silver_rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
         "date": date_str,
         "records": len(silver_rows),
         "missing_price": sum(1 for r in silver_rows if r["price_close"] is None),
@@ -167,7 +187,6 @@ def build_silver_records_for_date(
         "nav_stale_rows": sum(1 for r in silver_rows if r["nav_staleness_flag"]),
         "distribution_event_rows": sum(1 for r in silver_rows if r["distribution_event_flag"]),
     }
-    return silver_rows, summary
 
 
 def apply_rolling_stats(all_rows: List[Dict[str, Any]], zscore_window: int) -> None:
@@ -188,6 +207,7 @@ def write_silver_outputs(
     silver_root: Path,
     rows_by_date: Dict[str, List[Dict[str, Any]]],
     summaries: Dict[str, Dict[str, Any]],
+    stage_metrics: Optional[Dict[str, Any]] = None,
 ) -> None:
     silver_root.mkdir(parents=True, exist_ok=True)
     all_rows: List[Dict[str, Any]] = []
@@ -205,4 +225,33 @@ def write_silver_outputs(
             f.write(json.dumps(row, ensure_ascii=True) + "\n")
 
     summary_path = silver_root / "run_summary.json"
-    summary_path.write_text(json.dumps({"dates": summaries, "records_total": len(all_rows)}, indent=2))
+    run_summary: Dict[str, Any] = {"dates": summaries, "records_total": len(all_rows)}
+    if stage_metrics is not None:
+        run_summary["metrics"] = stage_metrics
+    summary_path.write_text(json.dumps(run_summary, indent=2))
+
+
+def append_silver_date(
+    silver_root: Path,
+    date_str: str,
+    rows: List[Dict[str, Any]],
+    summaries: Dict[str, Dict[str, Any]],
+    records_total: int,
+) -> None:
+    """Write one date that is newer than every date in `all_dates.ndjson`.
+
+    The date partition is written as usual; `all_dates.ndjson` is appended to instead
+    of rewritten, which leaves it byte-identical to a full `write_silver_outputs`.
+    """
+    date_path = silver_root / f"date={date_str}" / "snapshot.ndjson"
+    date_path.parent.mkdir(parents=True, exist_ok=True)
+    with date_path.open("w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=True) + "\n")
+
+    with (silver_root / "all_dates.ndjson").open("a", encoding="utf-8") as f:
+        for row in sorted(rows, key=lambda x: x["symbol"]):
+            f.write(json.dumps(row, ensure_ascii=True) + "\n")
+
+    summary_path = silver_root / "run_summary.json"
+    summary_path.write_text(json.dumps({"dates": summaries, "records_total": records_total}, indent=2))
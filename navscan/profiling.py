@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import cProfile
+import json
+import pstats
+import sys
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, ContextManager, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+TOP_ALLOCATIONS = 10
+_MAX_STACK_DEPTH = 64
+
+FuncKey = Tuple[str, int, str]
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Peak resident set size of this process so far, or None where `resource` is unavailable."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+def _frame_label(func: FuncKey) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{name} ({Path(filename).name}:{line})"
+
+
+def collapsed_stacks(stats: pstats.Stats) -> List[str]:
+    """Flamegraph-ready `frame;frame;frame <microseconds>` lines from a cProfile run.
+
+    cProfile keeps caller->callee edges, not whole stacks, so a function's time is
+    split across its callers in proportion to each edge's cumulative time. Paths
+    below 0.01% of the total are dropped and recursion is cut at the first repeat.
+    """
+    entries = stats.stats  # type: ignore[attr-defined]
+    children: Dict[FuncKey, List[Tuple[FuncKey, float]]] = {}
+    for func, (_cc, _nc, _tt, _ct, callers) in entries.items():
+        for caller, edge in callers.items():
+            if caller != func:
+                children.setdefault(caller, []).append((func, edge[3]))
+    roots = [f for f, v in entries.items() if not any(c != f for c in v[4])]
+    total = sum(entries[f][3] for f in roots)
+    floor = max(total * 1e-4, 1e-6)
+
+    out: Dict[str, float] = {}
+
+    def walk(func: FuncKey, path: List[str], seen: Tuple[FuncKey, ...], weight: float) -> None:
+        _cc, _nc, tt, ct, _callers = entries[func]
+        labels = path + [_frame_label(func)]
+        key = ";".join(labels)
+        out[key] = out.get(key, 0.0) + tt * weight
+        if len(labels) >= _MAX_STACK_DEPTH:
+            return
+        for child, edge_ct in children.get(func, ()):
+            child_ct = entries[child][3]
+            if child in seen or child_ct <= 0 or weight * edge_ct < floor:
+                continue
+            walk(child, labels, seen + (child,), weight * edge_ct / child_ct)
+
+    for root in roots:
+        walk(root, [], (root,), 1.0)
+    return [f"{k} {round(v * 1_000_000)}" for k, v in sorted(out.items()) if round(v * 1_000_000) > 0]
+
+
+def _top_allocations(snapshot: tracemalloc.Snapshot, limit: int) -> List[Dict[str, Any]]:
+    snapshot = snapshot.filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        )
+    )
+    out = []
+    for stat in snapshot.statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        out.append({"site": f"{frame.filename}:{frame.lineno}", "size_bytes": stat.size, "count": stat.count})
+    return out
+
+
+class StageProfiler:
+    """CPU and allocation profiles for each stage of one command, written under `out_dir`.
+
+    Per stage: `<stage>.pstats` (load with `python -m pstats`), `<stage>.collapsed`
+    (feed to flamegraph.pl or speedscope) and `<stage>.alloc.txt` (tracemalloc peak
+    and top allocation sites). `profile_summary.json` collects peak RSS and the
+    per-stage numbers. Work done in worker processes is not captured.
+    """
+
+    def __init__(self, out_dir: Path, top_allocations: int = TOP_ALLOCATIONS) -> None:
+        self.out_dir = out_dir
+        self.top_allocations = top_allocations
+        self.stages: Dict[str, Dict[str, Any]] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        else:
+            tracemalloc.clear_traces()
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            _current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            if started_tracing:
+                tracemalloc.stop()
+            self._write_stage(name, profiler, peak, snapshot)
+
+    def _write_stage(self, name: str, profiler: cProfile.Profile, peak: int, snapshot: tracemalloc.Snapshot) -> None:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        pstats_path = self.out_dir / f"{name}.pstats"
+        collapsed_path = self.out_dir / f"{name}.collapsed"
+        alloc_path = self.out_dir / f"{name}.alloc.txt"
+
+        profiler.dump_stats(str(pstats_path))
+        stats = pstats.Stats(profiler)
+        collapsed_path.write_text("\n".join(collapsed_stacks(stats)) + "\n", encoding="utf-8")
+        top = _top_allocations(snapshot, self.top_allocations)
+        lines = [f"peak_traced_bytes {peak}"]
+        lines += [f"{a['size_bytes']:>12} {a['count']:>8}  {a['site']}" for a in top]
+        alloc_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        self.stages[name] = {
+            "cpu_seconds": round(stats.total_tt, 6),  # type: ignore[attr-defined]
+            "peak_traced_bytes": peak,
+            "top_allocations": top,
+            "files": {"pstats": str(pstats_path), "collapsed": str(collapsed_path), "allocations": str(alloc_path)},
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {"out_dir": str(self.out_dir), "peak_rss_bytes": peak_rss_bytes(), "stages": self.stages}
+
+    def write_summary(self) -> Dict[str, Any]:
+        summary = self.summary()
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        (self.out_dir / "profile_summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        return summary
+
+
+def stage(profiler: Optional[StageProfiler], name: str) -> ContextManager[None]:
+    """`profiler.stage(name)`, or a no-op when profiling is off."""
+    return profiler.stage(name) if profiler is not None else nullcontext()
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Bump when half-life semantics change so stale entries stop matching.
+MEMO_VERSION = 1
+
+MemoKey = Tuple[str, str, str, str]  # (symbol, date, history_hash, config_hash)
+
+
+class HalfLifeFit(NamedTuple):
+    half_life_days: Optional[float]
+    reason: str
+    history_hash: str
+    cached: bool
+
+
+def half_life_config_hash(min_points: int, max_half_life_days: float) -> str:
+    payload = f"v{MEMO_VERSION}:min_points={min_points}:max_half_life_days={max_half_life_days!r}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class HalfLifeMemo:
+    """SQLite-backed memo of half-life fits, bounded by `max_entries` with LRU eviction."""
+
+    def __init__(self, path: Path, max_entries: int = 500_000, read_only: bool = False) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        if read_only:
+            self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(path))
+            self.conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS half_life_memo (
+                    symbol TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    history_hash TEXT NOT NULL,
+                    config_hash TEXT NOT NULL,
+                    half_life_days REAL,
+                    reason TEXT NOT NULL,
+                    last_used_ns INTEGER NOT NULL,
+                    PRIMARY KEY (symbol, date, history_hash, config_hash)
+                );
+                CREATE INDEX IF NOT EXISTS idx_half_life_memo_last_used ON half_life_memo (last_used_ns);
+                """
+            )
+            self.conn.commit()
+
+    @classmethod
+    def open_for_lookup(cls, path: Path) -> Optional["HalfLifeMemo"]:
+        if not path.exists():
+            return None
+        try:
+            return cls(path, read_only=True)
+        except sqlite3.Error:
+            return None
+
+    def get_many(self, keys: Iterable[MemoKey]) -> Dict[MemoKey, Tuple[Optional[float], str]]:
+        out: Dict[MemoKey, Tuple[Optional[float], str]] = {}
+        try:
+            for key in keys:
+                row = self.conn.execute(
+                    """
+                    SELECT half_life_days, reason FROM half_life_memo
+                    WHERE symbol = ? AND date = ? AND history_hash = ? AND config_hash = ?
+                    """,
+                    key,
+                ).fetchone()
+                if row is not None:
+                    out[key] = (row[0], row[1])
+        except sqlite3.Error:
+            # A missing table or locked file only costs a recompute.
+            return out
+        return out
+
+    def put_many(self, items: Iterable[Tuple[MemoKey, Optional[float], str]]) -> int:
+        now = time.time_ns()
+        rows = [(*key, hl, reason, now) for key, hl, reason in items]
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO half_life_memo (
+                  symbol, date, history_hash, config_hash, half_life_days, reason, last_used_ns
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(symbol, date, history_hash, config_hash) DO UPDATE SET
+                  half_life_days=excluded.half_life_days,
+                  reason=excluded.reason,
+                  last_used_ns=excluded.last_used_ns
+                """,
+                rows,
+            )
+        return len(rows)
+
+    def touch(self, keys: Iterable[MemoKey]) -> None:
+        now = time.time_ns()
+        with self.conn:
+            self.conn.executemany(
+                """
+                UPDATE half_life_memo SET last_used_ns = ?
+                WHERE symbol = ? AND date = ? AND history_hash = ? AND config_hash = ?
+                """,
+                [(now, *key) for key in keys],
+            )
+
+    def evict(self) -> int:
+        """Drop least-recently-used entries beyond `max_entries`."""
+        count = self.conn.execute("SELECT COUNT(*) FROM half_life_memo").fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return 0
+        with self.conn:
+            self.conn.execute(
+                """
+                DELETE FROM half_life_memo WHERE rowid IN (
+                  SELECT rowid FROM half_life_memo ORDER BY last_used_ns ASC LIMIT ?
+                )
+                """,
+                (excess,),
+            )
+        return excess
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def record_fits(memo: HalfLifeMemo, date_str: str, config_hash: str, fits: Dict[str, HalfLifeFit]) -> Dict[str, int]:
+    """Persist fresh fits, refresh LRU stamps for hits, and evict; returns memo counters."""
+    fresh: List[Tuple[MemoKey, Optional[float], str]] = []
+    hits: List[MemoKey] = []
+    for sym, fit in fits.items():
+        key = (sym, date_str, fit.history_hash, config_hash)
+        if fit.cached:
+            hits.append(key)
+        else:
+            fresh.append((key, fit.half_life_days, fit.reason))
+    memo.put_many(fresh)
+    memo.touch(hits)
+    evicted = memo.evict()
+    return {"memo_hits": len(hits), "memo_misses": len(fresh), "memo_evicted": evicted}
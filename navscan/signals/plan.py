@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from navscan.signals.mean_reversion import estimate_half_life_days
+from navscan.signals.rank import select_top_n
+
+_NUMBER = (int, float)
+
+
+def _num(value: Any) -> Optional[float]:
+    return float(value) if isinstance(value, _NUMBER) else None
+
+
+@dataclass
+class ScanColumns:
+    """Column arrays for one scan date, aligned by row index."""
+
+    symbol: List[str]
+    premium_discount_pct: List[Optional[float]]
+    pd_zscore_20d: List[Optional[float]]
+    dollar_volume: List[Optional[float]]
+    nav_stale: List[bool]
+    distribution_event: List[bool]
+    insufficient_history: List[bool]
+
+    def __len__(self) -> int:
+        return len(self.symbol)
+
+
+def columns_from_rows(rows: Sequence[Dict[str, Any]]) -> ScanColumns:
+    return ScanColumns(
+        symbol=[r["symbol"] for r in rows],
+        premium_discount_pct=[_num(r.get("premium_discount_pct")) for r in rows],
+        pd_zscore_20d=[_num(r.get("pd_zscore_20d")) for r in rows],
+        dollar_volume=[_num(r.get("dollar_volume")) for r in rows],
+        nav_stale=[bool(r.get("nav_staleness_flag")) for r in rows],
+        distribution_event=[bool(r.get("distribution_event_flag")) for r in rows],
+        insufficient_history=["insufficient_history_20d" in (r.get("data_quality_flags") or []) for r in rows],
+    )
+
+
+@dataclass
+class GateResult:
+    """Boolean masks and extreme components from the cheap filters."""
+
+    extreme: List[bool]
+    extreme_component: List[float]
+    liquidity_pass: List[bool]
+    event_pass: List[bool]
+    candidate: List[bool]
+
+
+@dataclass
+class ScoreResult:
+    score: List[float]
+    liquidity_component: List[float]
+    half_life_component: List[float]
+    penalty: List[float]
+
+
+@dataclass(frozen=True)
+class ScoringPlan:
+    """Stage 3 config compiled once per run; rules evaluated column-wise.
+
+    Produces the same values as `detect_extreme`, `liquidity_filter`, `event_filter`,
+    `build_risk_flags` and `compute_score`, but reason/rationale strings are only
+    rendered by `ScanResult.annotate` for rows that are actually written.
+    """
+
+    zscore_threshold: float
+    abs_pd_threshold: float
+    min_dollar_volume: float
+    reference_dollar_volume: float
+    exclude_distribution_events: bool
+    event_data_status: str
+    half_life_min_points: int
+    max_half_life_days: float
+    weight_extreme: float
+    weight_liquidity: float
+    weight_half_life: float
+    penalty_nav_stale: float
+    penalty_half_life_unavailable: float
+    penalty_event_data_partial: float
+
+    @property
+    def event_data_partial(self) -> bool:
+        return self.event_data_status != "full"
+
+    def fit_half_life(self, series: List[Optional[float]]) -> Dict[str, object]:
+        return estimate_half_life_days(
+            series,
+            min_points=self.half_life_min_points,
+            max_half_life_days=self.max_half_life_days,
+        )
+
+    def gate(self, cols: ScanColumns) -> GateResult:
+        z_th = self.zscore_threshold
+        pd_th = self.abs_pd_threshold
+        min_dv = self.min_dollar_volume
+        exclude_dist = self.exclude_distribution_events
+
+        abs_z = [abs(z) if z is not None else None for z in cols.pd_zscore_20d]
+        abs_pd = [abs(p) if p is not None else None for p in cols.premium_discount_pct]
+        extreme = [
+            (z >= z_th) if z is not None else (p is not None and p >= pd_th) for z, p in zip(abs_z, abs_pd)
+        ]
+        extreme_component = [
+            z if z is not None else (p / pd_th if p is not None else 0.0) for z, p in zip(abs_z, abs_pd)
+        ]
+        liquidity_pass = [dv is not None and not dv < min_dv for dv in cols.dollar_volume]
+        event_pass = [not (exclude_dist and d) for d in cols.distribution_event]
+        candidate = [e and l and v for e, l, v in zip(extreme, liquidity_pass, event_pass)]
+        return GateResult(extreme, extreme_component, liquidity_pass, event_pass, candidate)
+
+    def score(
+        self,
+        cols: ScanColumns,
+        gate: GateResult,
+        half_life_days: List[Optional[float]],
+        half_life_reason: List[str],
+    ) -> "ScanResult":
+        ref_dv = self.reference_dollar_volume
+        p_stale = self.penalty_nav_stale
+        p_hl = self.penalty_half_life_unavailable
+        p_evt = self.penalty_event_data_partial if self.event_data_partial else 0.0
+
+        if ref_dv > 0:
+            liq = [min(dv / ref_dv, 2.0) if dv is not None else 0.0 for dv in cols.dollar_volume]
+        else:
+            liq = [0.0] * len(cols)
+        hl_comp = [1.0 / (1.0 + hl) if hl is not None and hl > 0 else 0.0 for hl in half_life_days]
+        penalty = [
+            ((p_stale if stale else 0.0) + (p_hl if hl is None else 0.0)) + p_evt
+            for stale, hl in zip(cols.nav_stale, half_life_days)
+        ]
+        w_ext, w_liq, w_hl = self.weight_extreme, self.weight_liquidity, self.weight_half_life
+        score = [
+            w_ext * e + w_liq * lc + w_hl * hc - p
+            for e, lc, hc, p in zip(gate.extreme_component, liq, hl_comp, penalty)
+        ]
+        return ScanResult(
+            plan=self,
+            columns=cols,
+            gate=gate,
+            half_life_days=half_life_days,
+            half_life_reason=half_life_reason,
+            scores=ScoreResult(score, liq, hl_comp, penalty),
+        )
+
+
+def compile_scoring_plan(cfg: Dict[str, Any]) -> ScoringPlan:
+    score_cfg = cfg["score"]
+    return ScoringPlan(
+        zscore_threshold=float(cfg["extreme"]["zscore_threshold"]),
+        abs_pd_threshold=float(cfg["extreme"]["abs_pd_threshold"]),
+        min_dollar_volume=float(cfg["liquidity"]["min_dollar_volume"]),
+        reference_dollar_volume=float(cfg["liquidity"]["reference_dollar_volume"]),
+        exclude_distribution_events=bool(cfg["event_filter"].get("exclude_distribution_events", True)),
+        event_data_status=str(cfg["event_filter"]["event_data_status"]),
+        half_life_min_points=int(cfg["half_life"]["min_points"]),
+        max_half_life_days=float(cfg["half_life"]["max_half_life_days"]),
+        weight_extreme=float(score_cfg["weight_extreme"]),
+        weight_liquidity=float(score_cfg["weight_liquidity"]),
+        weight_half_life=float(score_cfg["weight_half_life"]),
+        penalty_nav_stale=float(score_cfg["penalty_nav_stale"]),
+        penalty_half_life_unavailable=float(score_cfg["penalty_half_life_unavailable"]),
+        penalty_event_data_partial=float(score_cfg["penalty_event_data_partial"]),
+    )
+
+
+@dataclass
+class ScanResult:
+    plan: ScoringPlan
+    columns: ScanColumns
+    gate: GateResult
+    half_life_days: List[Optional[float]]
+    half_life_reason: List[str]
+    scores: ScoreResult
+
+    def ranked_candidates(self, top_n: Optional[int] = None) -> List[int]:
+        """Candidate row indices in rank order; `top_n` bounds the selection."""
+        idx = (i for i, ok in enumerate(self.gate.candidate) if ok)
+        return select_top_n(idx, self.scores.score, self.columns.symbol, top_n)
+
+    def extreme_reason(self, i: int) -> str:
+        plan = self.plan
+        z = self.columns.pd_zscore_20d[i]
+        if z is not None:
+            return f"zscore={z:.4f} threshold={plan.zscore_threshold}"
+        pd = self.columns.premium_discount_pct[i]
+        if pd is not None:
+            return f"abs_pd={abs(pd):.4f}% threshold={plan.abs_pd_threshold}%"
+        return "missing_pd_and_zscore"
+
+    def liquidity_reason(self, i: int) -> str:
+        dv = self.columns.dollar_volume[i]
+        if dv is None:
+            return "missing_dollar_volume"
+        if not self.gate.liquidity_pass[i]:
+            return f"dollar_volume_below_threshold({dv:.2f}<{self.plan.min_dollar_volume:.2f})"
+        return "ok"
+
+    def event_reason(self, i: int) -> str:
+        return "ok" if self.gate.event_pass[i] else "distribution_event_excluded"
+
+    def risk_flags(self, i: int) -> List[str]:
+        flags: List[str] = []
+        if self.columns.nav_stale[i]:
+            flags.append("nav_stale")
+        if self.half_life_days[i] is None:
+            flags.append("half_life_unavailable")
+        if self.columns.insufficient_history[i]:
+            flags.append("insufficient_history_20d")
+        if self.plan.event_data_partial:
+            flags.append("event_data_partial")
+        return flags
+
+    def rationale(self, i: int) -> str:
+        bits = []
+        if self.gate.extreme[i]:
+            bits.append(f"extreme:{self.extreme_reason(i)}")
+        if self.gate.liquidity_pass[i]:
+            bits.append("liquidity:pass")
+        hl = self.half_life_days[i]
+        if hl is not None:
+            bits.append(f"half_life:{hl:.2f}d")
+        else:
+            bits.append(f"half_life:{self.half_life_reason[i]}")
+        return "; ".join(bits)
+
+    def annotate(self, i: int, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Attach Stage 3 output fields to `row` (in place) for row index `i`."""
+        gate = self.gate
+        scores = self.scores
+        row["half_life_days"] = self.half_life_days[i]
+        row["half_life_reason"] = self.half_life_reason[i]
+        row["extreme_triggered"] = gate.extreme[i]
+        row["extreme_reason"] = self.extreme_reason(i)
+        row["liquidity_pass"] = gate.liquidity_pass[i]
+        row["liquidity_reason"] = self.liquidity_reason(i)
+        row["event_pass"] = gate.event_pass[i]
+        row["event_reason"] = self.event_reason(i)
+        row["_liquidity_reference_dv"] = self.plan.reference_dollar_volume
+        row["risk_flags"] = self.risk_flags(i)
+        row["score"] = scores.score[i]
+        row["score_extreme_component"] = gate.extreme_component[i]
+        row["score_liquidity_component"] = scores.liquidity_component[i]
+        row["score_half_life_component"] = scores.half_life_component[i]
+        row["score_penalty"] = scores.penalty[i]
+        row["rationale"] = self.rationale(i)
+        return row
+
+    def annotate_all(self, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [self.annotate(i, row) for i, row in enumerate(rows)]
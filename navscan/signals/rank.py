@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+import heapq
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 
 
 def compute_score(row: Dict[str, Any], cfg: Dict[str, Any], extreme_component: float) -> Dict[str, float]:
@@ -36,3 +37,20 @@ def compute_score(row: Dict[str, Any], cfg: Dict[str, Any], extreme_component: f
         "score_penalty": penalty,
     }
 
+
+def rank_key(score: float, symbol: str) -> tuple:
+    """Sort key for candidate ranking: score descending, symbol ascending on ties."""
+    return (-score, symbol)
+
+
+def select_top_n(
+    indices: Iterable[int],
+    scores: Sequence[float],
+    symbols: Sequence[str],
+    n: Optional[int] = None,
+) -> List[int]:
+    """Return row indices in rank order; with `n`, keep only the best `n` via a bounded heap."""
+    key = lambda i: rank_key(scores[i], symbols[i])  # noqa: E731
+    if n is None:
+        return sorted(indices, key=key)
+    return heapq.nsmallest(max(n, 0), indices, key=key)
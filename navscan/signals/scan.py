@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from navscan.signals.memo import HalfLifeFit, HalfLifeMemo, MemoKey, half_life_config_hash
+from navscan.signals.plan import GateResult, ScanColumns, ScoringPlan
+
+HALF_LIFE_MODES = ("candidates", "top_k", "full")
+
+_SYMBOL_RE = re.compile(r'"symbol":\s*"([^"]*)"')
+_DATE_RE = re.compile(r'"date":\s*"([^"]*)"')
+
+
+def select_half_life_symbols(cols: ScanColumns, gate: GateResult, mode: str, top_k: int) -> Set[str]:
+    if mode == "full":
+        return set(cols.symbol)
+    passing = [(gate.extreme_component[i], cols.symbol[i]) for i, ok in enumerate(gate.candidate) if ok]
+    if mode == "top_k":
+        passing.sort(key=lambda x: (-x[0], x[1]))
+        passing = passing[: max(top_k, 0)]
+    return {sym for _, sym in passing}
+
+
+def _read_history_lines(all_dates_path: Path, date_str: str, symbols: Set[str]) -> Dict[str, List[Tuple[str, str]]]:
+    """Raw (date, line) pairs up to `date_str` for `symbols`, in file order.
+
+    Lines for other symbols are skipped before JSON parsing, so a shard pays only
+    for its own rows.
+    """
+    by_symbol: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+    with all_dates_path.open("r", encoding="utf-8") as f:
+        for line in f:
+            sm = _SYMBOL_RE.search(line)
+            if sm is not None and sm.group(1) not in symbols:
+                continue
+            line = line.strip()
+            if not line:
+                continue
+            dm = _DATE_RE.search(line)
+            if sm is None or dm is None:
+                r = json.loads(line)
+                sym, date = r["symbol"], r["date"]
+            else:
+                sym, date = sm.group(1), dm.group(1)
+            if sym in symbols and date <= date_str:
+                by_symbol[sym].append((date, line))
+    return by_symbol
+
+
+def _pd_series(lines: List[Tuple[str, str]]) -> List[Optional[float]]:
+    points = [(date, json.loads(line).get("premium_discount_pct")) for date, line in lines]
+    points.sort(key=lambda x: x[0])
+    return [pd for _, pd in points]
+
+
+def _history_hash(lines: List[Tuple[str, str]]) -> str:
+    h = hashlib.sha256()
+    for _, line in lines:
+        h.update(line.encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()[:32]
+
+
+def read_pd_history(all_dates_path: Path, date_str: str, symbols: Set[str]) -> Dict[str, List[Optional[float]]]:
+    """Premium/discount series up to `date_str` for `symbols` only, ordered by date."""
+    return {sym: _pd_series(lines) for sym, lines in _read_history_lines(all_dates_path, date_str, symbols).items()}
+
+
+def fit_half_lives(
+    plan: ScoringPlan,
+    all_dates_path: Path,
+    date_str: str,
+    symbols: Iterable[str],
+    memo_path: Optional[Path] = None,
+) -> Dict[str, HalfLifeFit]:
+    """Fit half-lives for `symbols`, reusing memoized fits whose history digest is unchanged."""
+    wanted = set(symbols)
+    return _fit_from_lines(plan, _read_history_lines(all_dates_path, date_str, wanted), date_str, wanted, memo_path)
+
+
+def fit_half_lives_from_history(
+    plan: ScoringPlan,
+    history: Dict[str, List[Tuple[str, str]]],
+    date_str: str,
+    symbols: Iterable[str],
+    memo_path: Optional[Path] = None,
+) -> Dict[str, HalfLifeFit]:
+    """`fit_half_lives` over (date, line) pairs already held in memory instead of `all_dates.ndjson`.
+
+    Lines must be the silver rows exactly as written to `all_dates.ndjson`, so history
+    digests (and therefore memo entries) match the file-based path.
+    """
+    wanted = set(symbols)
+    lines = {sym: [(d, line) for d, line in history.get(sym, []) if d <= date_str] for sym in wanted}
+    return _fit_from_lines(plan, lines, date_str, wanted, memo_path)
+
+
+def _fit_from_lines(
+    plan: ScoringPlan,
+    history: Dict[str, List[Tuple[str, str]]],
+    date_str: str,
+    wanted: Set[str],
+    memo_path: Optional[Path],
+) -> Dict[str, HalfLifeFit]:
+    digests = {sym: _history_hash(history.get(sym, [])) for sym in wanted}
+
+    cached: Dict[MemoKey, Tuple[Optional[float], str]] = {}
+    config_hash = half_life_config_hash(plan.half_life_min_points, plan.max_half_life_days)
+    memo = HalfLifeMemo.open_for_lookup(memo_path) if memo_path is not None else None
+    if memo is not None:
+        cached = memo.get_many((sym, date_str, digests[sym], config_hash) for sym in wanted)
+        memo.close()
+
+    out: Dict[str, HalfLifeFit] = {}
+    for sym in wanted:
+        hit = cached.get((sym, date_str, digests[sym], config_hash))
+        if hit is not None:
+            out[sym] = HalfLifeFit(hit[0], hit[1], digests[sym], True)
+            continue
+        hl = plan.fit_half_life(_pd_series(history.get(sym, [])))
+        out[sym] = HalfLifeFit(hl["half_life_days"], str(hl["reason"]), digests[sym], False)  # type: ignore[arg-type]
+    return out
+
+
+def _fit_shard(job: Tuple[ScoringPlan, str, str, List[str], Optional[str]]) -> Dict[str, HalfLifeFit]:
+    plan, path, date_str, symbols, memo_path = job
+    return fit_half_lives(plan, Path(path), date_str, symbols, Path(memo_path) if memo_path else None)
+
+
+def fit_half_lives_sharded(
+    plan: ScoringPlan,
+    all_dates_path: Path,
+    date_str: str,
+    symbols: Iterable[str],
+    workers: int,
+    memo_path: Optional[Path] = None,
+) -> Dict[str, HalfLifeFit]:
+    """Fit half-lives across `workers` processes, each reading only its shard's history."""
+    ordered = sorted(set(symbols))
+    if workers <= 1 or len(ordered) < 2:
+        return fit_half_lives(plan, all_dates_path, date_str, ordered, memo_path)
+    from concurrent.futures import ProcessPoolExecutor
+
+    n_shards = min(workers, len(ordered))
+    shards = [ordered[i::n_shards] for i in range(n_shards)]
+    memo_arg = str(memo_path) if memo_path is not None else None
+    jobs = [(plan, str(all_dates_path), date_str, shard, memo_arg) for shard in shards]
+    out: Dict[str, HalfLifeFit] = {}
+    with ProcessPoolExecutor(max_workers=n_shards) as pool:
+        for part in pool.map(_fit_shard, jobs):
+            out.update(part)
+    return out
@@ -0,0 +1 @@
+"""Stage entry points shared by the `scripts/` runners and the in-process `navscan run`."""
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from navscan.logging_utils import get_logger
+from navscan.stages.candidates import CandidateOptions, build_candidates
+from navscan.stages.ingest import run_for_date
+from navscan.stages.silver import build_silver
+from navscan.stages.tracking import update_warehouse
+
+BACKFILL_STAGES = ("stage1", "stage2", "stage3")
+
+
+@dataclass
+class BackfillSettings:
+    start: str
+    end: str
+    raw_root: Path
+    silver_root: Path
+    signals_root: Path
+    stage3_config: Path
+    db_path: Path
+    top_n: int = 10
+    write_full_ranked: bool = True
+    zscore_window: int = 20
+    fetch_workers: int = 4
+    score_workers: int = 4
+    horizons: List[int] = field(default_factory=lambda: [1, 3, 5])
+    skip_ingest: bool = False
+
+
+def business_dates(start: str, end: str) -> List[str]:
+    """Weekdays in [start, end]."""
+    day = datetime.strptime(start, "%Y-%m-%d")
+    last = datetime.strptime(end, "%Y-%m-%d")
+    out: List[str] = []
+    while day <= last:
+        if day.weekday() < 5:
+            out.append(day.strftime("%Y-%m-%d"))
+        day += timedelta(days=1)
+    return out
+
+
+def _ingest_status(summaries: Dict[str, Dict[str, int]]) -> str:
+    if any(s.get("error", 0) for s in summaries.values()):
+        return "partial"
+    return "ok"
+
+
+def _score_date(opts: CandidateOptions) -> Tuple[str, Optional[Dict[str, Any]], Optional[str]]:
+    try:
+        return opts.date, build_candidates(opts, get_logger()).summary, None
+    except Exception as exc:  # noqa: BLE001
+        return opts.date, None, str(exc)
+
+
+def run_backfill(settings: BackfillSettings, symbols: List[str], logger) -> Dict[str, Any]:
+    """Backfill Stages 1-3 for every weekday in the range, then one Stage 5 update.
+
+    Stage 1 runs at most `fetch_workers` dates at a time, which bounds concurrent
+    network requests; silver is built once over every raw date so rolling features
+    see the history before `start`; dates are scored across `score_workers`
+    processes. Returns the per-date status matrix plus the Stage 5 summary.
+    """
+    dates = business_dates(settings.start, settings.end)
+    if not dates:
+        raise ValueError(f"no weekdays between {settings.start} and {settings.end}")
+    matrix: Dict[str, Dict[str, str]] = {d: {s: "skipped" for s in BACKFILL_STAGES} for d in dates}
+    errors: Dict[str, str] = {}
+
+    # Stage 1
+    if not settings.skip_ingest:
+        with ThreadPoolExecutor(max_workers=max(settings.fetch_workers, 1)) as pool:
+            futures = {pool.submit(run_for_date, d, symbols, settings.raw_root, logger): d for d in dates}
+            for future in as_completed(futures):
+                d = futures[future]
+                try:
+                    matrix[d]["stage1"] = _ingest_status(future.result())
+                except Exception as exc:  # noqa: BLE001
+                    matrix[d]["stage1"] = "failed"
+                    errors[d] = f"stage1: {exc}"
+                    logger.error(
+                        "ingestion_date_crashed",
+                        extra={"stage": "stage1", "source": "-", "symbol": "-", "reason": str(exc)},
+                    )
+
+    # Stage 2
+    try:
+        silver = build_silver(settings.raw_root, settings.silver_root, symbols, [], settings.zscore_window, logger)
+    except Exception as exc:  # noqa: BLE001
+        for d in dates:
+            matrix[d]["stage2"] = "failed"
+        return {"dates": dates, "matrix": matrix, "errors": {"stage2": str(exc), **errors}, "stage5": None}
+    for d in dates:
+        if matrix[d]["stage1"] == "failed":
+            continue
+        records = silver.summaries.get(d, {}).get("records", 0)
+        matrix[d]["stage2"] = "ok" if records else "empty"
+
+    # Stage 3
+    base = CandidateOptions(
+        silver_root=settings.silver_root,
+        output_root=settings.signals_root,
+        config_path=settings.stage3_config,
+        top_n=settings.top_n,
+        write_full_ranked=settings.write_full_ranked,
+    )
+    jobs = [replace(base, date=d) for d in dates if matrix[d]["stage2"] == "ok"]
+    if settings.score_workers <= 1 or len(jobs) < 2:
+        results = [_score_date(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(settings.score_workers, len(jobs))) as pool:
+            results = list(pool.map(_score_date, jobs))
+    scored: List[str] = []
+    for d, summary, error in results:
+        if error is None:
+            matrix[d]["stage3"] = "ok"
+            scored.append(d)
+        else:
+            matrix[d]["stage3"] = "failed"
+            errors[d] = f"stage3: {error}"
+
+    # Stage 5, once for the whole range
+    stage5: Optional[Dict[str, Any]] = None
+    if scored:
+        try:
+            stage5 = update_warehouse(
+                settings.db_path,
+                settings.signals_root,
+                settings.silver_root,
+                settings.horizons,
+                logger,
+                scan_dates=scored,
+            )
+        except Exception as exc:  # noqa: BLE001
+            errors["stage5"] = str(exc)
+    return {"dates": dates, "matrix": matrix, "errors": errors, "stage5": stage5}
+
+
+def format_matrix(matrix: Dict[str, Dict[str, str]]) -> List[str]:
+    lines = ["date        " + " ".join(f"{s:<8}" for s in BACKFILL_STAGES)]
+    for d in sorted(matrix):
+        lines.append(f"{d}  " + " ".join(f"{matrix[d][s]:<8}" for s in BACKFILL_STAGES))
+    return lines
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+PACKAGE_ROOT = Path(__file__).resolve().parents[1]
+
+# Package sources whose content is part of each stage's fingerprint.
+STAGE_CODE: Dict[str, List[str]] = {
+    "stage1": ["stages/ingest.py", "data"],
+    "stage2": ["stages/silver.py", "pipeline", "features"],
+    "stage3": ["stages/candidates.py", "signals"],
+}
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def code_version(stage: str) -> str:
+    """Digest of the package sources a stage runs."""
+    h = hashlib.sha256()
+    for rel in STAGE_CODE[stage]:
+        base = PACKAGE_ROOT / rel
+        files = sorted(base.rglob("*.py")) if base.is_dir() else [base]
+        for path in files:
+            h.update(str(path.relative_to(PACKAGE_ROOT)).encode("utf-8"))
+            h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+@dataclass
+class StageFingerprint:
+    """Named input digests for one stage run on one date."""
+
+    stage: str
+    date: str
+    inputs: Dict[str, str] = field(default_factory=dict)
+
+    def add_value(self, name: str, value: object) -> None:
+        self.inputs[name] = hashlib.sha256(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def add_files(self, name: str, paths: Iterable[Path]) -> None:
+        for path in sorted(paths):
+            self.inputs[f"{name}:{path}"] = file_sha256(path) if path.exists() else "missing"
+
+    @property
+    def digest(self) -> str:
+        payload = json.dumps({"stage": self.stage, "date": self.date, "inputs": self.inputs}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def record_path(root: Path, stage: str, date_str: str) -> Path:
+    return root / "_fingerprints" / stage / f"date={date_str}.json"
+
+
+def load_record(path: Path) -> Optional[Dict[str, object]]:
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return None
+
+
+def is_fresh(path: Path, fp: StageFingerprint) -> bool:
+    """True if the last run had the same input digest and its outputs are untouched since."""
+    record = load_record(path)
+    if record is None or record.get("inputs_digest") != fp.digest:
+        return False
+    outputs = record.get("outputs") or {}
+    for out_path, sha in outputs.items():  # type: ignore[union-attr]
+        p = Path(out_path)
+        if not p.exists() or file_sha256(p) != sha:
+            return False
+    return True
+
+
+def write_record(path: Path, fp: StageFingerprint, outputs: Iterable[Path]) -> None:
+    record = {
+        "stage": fp.stage,
+        "date": fp.date,
+        "inputs_digest": fp.digest,
+        "inputs": fp.inputs,
+        "outputs": {str(p): file_sha256(p) for p in sorted(outputs) if p.exists()},
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(record, indent=2, sort_keys=True), encoding="utf-8")
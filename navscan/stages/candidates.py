@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from navscan import metrics
+from navscan.signals.memo import HalfLifeMemo, half_life_config_hash, record_fits
+from navscan.signals.plan import columns_from_rows, compile_scoring_plan
+from navscan.signals.scan import fit_half_lives_from_history, fit_half_lives_sharded, select_half_life_symbols
+
+
+def _read_ndjson(path: Path) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                out.append(json.loads(line))
+    return out
+
+
+def _write_ndjson(path: Path, rows: Iterable[Dict[str, Any]]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        for r in rows:
+            f.write(json.dumps(r, ensure_ascii=True) + "\n")
+
+
+def latest_silver_date(silver_root: Path) -> str:
+    dates = []
+    for p in (silver_root).glob("date=*"):
+        if p.is_dir():
+            dates.append(p.name.split("=", 1)[1])
+    if not dates:
+        raise ValueError("No silver date snapshots found")
+    return sorted(dates)[-1]
+
+
+@dataclass
+class CandidateOptions:
+    """Stage 3 settings; mirrors the `stage3_build_candidates.py` flags."""
+
+    silver_root: Path
+    output_root: Path
+    config_path: Path
+    date: str = ""
+    half_life_mode: str = "candidates"
+    half_life_top_k: int = 25
+    top_n: int = 0
+    write_full_ranked: bool = True
+    workers: int = 1
+    memo_cache: str = ""
+    memo_max_entries: int = 500_000
+    no_memo: bool = False
+
+
+@dataclass
+class CandidateResult:
+    date: str
+    summary: Dict[str, Any]
+    ranked_rows: List[Dict[str, Any]]
+
+    def top(self, n: int) -> List[Dict[str, Any]]:
+        return self.ranked_rows[:n]
+
+
+def build_candidates(
+    opts: CandidateOptions,
+    logger,
+    day_rows: Optional[List[Dict[str, Any]]] = None,
+    history: Optional[Dict[str, List[Tuple[str, str]]]] = None,
+) -> CandidateResult:
+    """Score one silver date and write the Stage 3 outputs.
+
+    `day_rows` lets an in-process caller hand over the silver rows it just built
+    instead of re-reading `date=<date>/snapshot.ndjson`; they are annotated in place.
+    `history` (per-symbol `all_dates.ndjson` lines, see `fit_half_lives_from_history`)
+    likewise replaces the half-life history scan of `all_dates.ndjson`.
+    """
+    with metrics.scope() as stage_metrics:
+        with metrics.span("stage3.load"):
+            cfg = json.loads(opts.config_path.read_text(encoding="utf-8"))
+            silver_root = opts.silver_root
+            date_str = opts.date or latest_silver_date(silver_root)
+
+            if day_rows is None:
+                day_rows = _read_ndjson(silver_root / f"date={date_str}" / "snapshot.ndjson")
+            plan = compile_scoring_plan(cfg)
+            cols = columns_from_rows(day_rows)
+        metrics.incr("stage3.rows", len(cols))
+
+        # Cheap filters run first so the half-life fit is only paid for rows that can become candidates.
+        with metrics.span("stage3.gate"):
+            gate = plan.gate(cols)
+            fit_symbols = select_half_life_symbols(cols, gate, opts.half_life_mode, opts.half_life_top_k)
+        out_dir = opts.output_root / f"date={date_str}"
+        memo_path = None
+        if not opts.no_memo:
+            memo_path = Path(opts.memo_cache) if opts.memo_cache else opts.output_root / "_memo" / "half_life.sqlite"
+        with metrics.span("stage3.half_life"):
+            if history is not None:
+                fitted = fit_half_lives_from_history(plan, history, date_str, fit_symbols, memo_path)
+            else:
+                fitted = fit_half_lives_sharded(
+                    plan, silver_root / "all_dates.ndjson", date_str, fit_symbols, opts.workers, memo_path
+                )
+            memo_counts = {"memo_hits": 0, "memo_misses": len(fitted), "memo_evicted": 0}
+            if memo_path is not None:
+                memo = HalfLifeMemo(memo_path, max_entries=opts.memo_max_entries)
+                config_hash = half_life_config_hash(plan.half_life_min_points, plan.max_half_life_days)
+                memo_counts = record_fits(memo, date_str, config_hash, fitted)
+                memo.close()
+        metrics.incr("stage3.half_life_fits", memo_counts["memo_misses"])
+        metrics.incr("stage3.half_life_memo_hits", memo_counts["memo_hits"])
+
+        with metrics.span("stage3.score"):
+            half_life_days: List[Optional[float]] = []
+            half_life_reason: List[str] = []
+            for i, symbol in enumerate(cols.symbol):
+                if symbol in fitted:
+                    hl_days, hl_reason = fitted[symbol].half_life_days, fitted[symbol].reason
+                elif gate.candidate[i]:
+                    hl_days, hl_reason = None, "skipped_outside_top_k"
+                else:
+                    hl_days, hl_reason = None, "skipped_not_candidate"
+                half_life_days.append(hl_days)
+                half_life_reason.append(hl_reason)
+
+            result = plan.score(cols, gate, half_life_days, half_life_reason)
+            scored_rows = result.annotate_all(day_rows)
+            ranked = result.ranked_candidates(None if opts.write_full_ranked else opts.top_n)
+            for rank, i in enumerate(ranked, start=1):
+                scored_rows[i]["rank"] = rank
+
+        with metrics.span("stage3.write"):
+            _write_ndjson(out_dir / "scored_universe.ndjson", scored_rows)
+            # A file this run does not write is removed, so a copy from an earlier run with other
+            # options is never read (Stage 5 prefers the ranked file) as if it were current.
+            ranked_path = out_dir / "candidates_ranked.ndjson"
+            top_path = out_dir / "candidates_top.ndjson"
+            if opts.write_full_ranked:
+                _write_ndjson(ranked_path, (scored_rows[i] for i in ranked))
+            else:
+                ranked_path.unlink(missing_ok=True)
+            if opts.top_n > 0:
+                _write_ndjson(top_path, (scored_rows[i] for i in ranked[: opts.top_n]))
+            else:
+                top_path.unlink(missing_ok=True)
+
+        summary = {
+            "date": date_str,
+            "universe_count": len(cols),
+            "candidate_count": sum(gate.candidate),
+            "extreme_count": sum(gate.extreme),
+            "liquidity_pass_count": sum(gate.liquidity_pass),
+            "event_block_count": len(cols) - sum(gate.event_pass),
+            "half_life_available_count": sum(1 for hl in half_life_days if hl is not None),
+            "half_life_mode": opts.half_life_mode,
+            "half_life_fit_count": len(fit_symbols),
+            "top_n": opts.top_n,
+            "full_ranked_written": opts.write_full_ranked,
+            "workers": opts.workers,
+            **memo_counts,
+        }
+        (out_dir / "summary.json").write_text(
+            json.dumps({**summary, "metrics": stage_metrics.as_dict()}, indent=2), encoding="utf-8"
+        )
+
+    logger.info(
+        "stage3_complete",
+        extra={"stage": "stage3", "source": "silver", "symbol": "-", "reason": json.dumps(summary)},
+    )
+    return CandidateResult(date_str, summary, [scored_rows[i] for i in ranked])
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from navscan.data.fetchers.common import load_universe_symbols
+from navscan.features.statistics import rolling_zscore
+from navscan.pipeline.standardize import append_silver_date, build_silver_records_for_date
+from navscan.pipeline.validate import build_data_quality_flags
+from navscan.stages.candidates import CandidateOptions, build_candidates
+from navscan.stages.ingest import ingest_dates
+from navscan.stages.report import build_coverage, write_daily_report
+from navscan.stages.silver import build_silver
+from navscan.stages.tracking import update_warehouse
+from navscan.tracking.store import DEFAULT_PROFILE, connect, init_schema
+
+
+@dataclass
+class ServeSettings:
+    """`navscan serve` settings resolved from the run config."""
+
+    raw_root: Path
+    silver_root: Path
+    signals_root: Path
+    reports_root: Path
+    stage3_config: Path
+    db_path: Path
+    top_n: int = 10
+    write_full_ranked: bool = True
+    zscore_window: int = 20
+    horizons: List[int] = field(default_factory=lambda: [1, 3, 5])
+    run_at: Optional[str] = None
+    poll_seconds: float = 60.0
+    db_profile: str = DEFAULT_PROFILE
+
+
+def ready_raw_dates(raw_root: Path) -> List[str]:
+    """Raw dates whose Stage 1 run summary exists; it is written after every dataset file."""
+    return sorted(p.stem.split("=", 1)[1] for p in (raw_root / "run_summaries").glob("date=*.json"))
+
+
+class ScanDaemon:
+    """Daily scan loop that keeps its inputs resident between runs.
+
+    The universe, the silver panel (rows per date), each symbol's `all_dates.ndjson`
+    lines for half-life fitting, the trailing premium/discount values the rolling
+    z-score needs, and the warehouse connection are loaded once. A new raw date then
+    costs one silver date, one scored date, one report and one Stage 5 update.
+    """
+
+    def __init__(self, settings: ServeSettings, universe_path: Path, logger) -> None:
+        self.settings = settings
+        self.universe_path = universe_path
+        self.logger = logger
+        self.symbols: List[str] = []
+        self.rows_by_date: Dict[str, List[Dict[str, Any]]] = {}
+        self.summaries: Dict[str, Dict[str, Any]] = {}
+        self.history: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+        self._pd_tail: Dict[str, Deque[Optional[float]]] = {}
+        self._ingest_attempted: Optional[str] = None
+        self.conn = None
+
+    # -- warm state -----------------------------------------------------------------
+
+    def start(self) -> None:
+        self.symbols = load_universe_symbols(self.universe_path)
+        self.conn = connect(self.settings.db_path, profile=self.settings.db_profile)
+        init_schema(self.conn)
+        if not self._load_panel():
+            self._rebuild_panel()
+        self._log("serve_started", f"dates={len(self.rows_by_date)} symbols={len(self.symbols)}")
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def _log(self, msg: str, reason: str) -> None:
+        self.logger.info(msg, extra={"stage": "serve", "source": "daemon", "symbol": "-", "reason": reason})
+
+    def _reset_state(self) -> None:
+        self.rows_by_date = {}
+        self.history = defaultdict(list)
+        self._pd_tail = {}
+
+    def _remember(self, date_str: str, row: Dict[str, Any], line: str) -> None:
+        symbol = row["symbol"]
+        self.history[symbol].append((date_str, line))
+        tail = self._pd_tail.get(symbol)
+        if tail is None:
+            tail = self._pd_tail[symbol] = deque(maxlen=max(self.settings.zscore_window - 1, 1))
+        tail.append(row.get("premium_discount_pct"))
+
+    def _load_panel(self) -> bool:
+        """Load silver from disk; False if it is missing or lacks a raw date it should contain."""
+        silver_root = self.settings.silver_root
+        all_path = silver_root / "all_dates.ndjson"
+        summary_path = silver_root / "run_summary.json"
+        if not all_path.exists() or not summary_path.exists():
+            return False
+        self._reset_state()
+        with all_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                row = json.loads(line)
+                self.rows_by_date.setdefault(row["date"], []).append(row)
+                self._remember(row["date"], row, line)
+        self.summaries = json.loads(summary_path.read_text(encoding="utf-8"))["dates"]
+        if not self.rows_by_date:
+            return False
+        last = max(self.rows_by_date)
+        return all(d in self.rows_by_date for d in ready_raw_dates(self.settings.raw_root) if d <= last)
+
+    def _rebuild_panel(self) -> None:
+        """Full Stage 2 over every raw date, then warm state from its rows."""
+        dates = ready_raw_dates(self.settings.raw_root)
+        if not dates:
+            self._reset_state()
+            self.summaries = {}
+            return
+        silver = build_silver(
+            self.settings.raw_root, self.settings.silver_root, self.symbols, dates, self.settings.zscore_window, self.logger
+        )
+        self._reset_state()
+        self.summaries = silver.summaries
+        ordered = sorted(
+            (r for rows in silver.rows_by_date.values() for r in rows), key=lambda x: (x["date"], x["symbol"])
+        )
+        for row in ordered:
+            self._remember(row["date"], row, json.dumps(row, ensure_ascii=True))
+        self.rows_by_date = silver.rows_by_date
+        self._log("serve_panel_rebuilt", f"dates={len(self.rows_by_date)}")
+
+    def _extend_panel(self, date_str: str) -> None:
+        """Stage 2 for a date newer than the panel: z-scores from the resident tails, then append."""
+        window = self.settings.zscore_window
+        rows, summary = build_silver_records_for_date(self.settings.raw_root, date_str, self.symbols, window)
+        for row in rows:
+            tail = list(self._pd_tail.get(row["symbol"], ()))
+            row["pd_zscore_20d"] = rolling_zscore(tail + [row["premium_discount_pct"]], window)[-1]
+            row["data_quality_flags"] = build_data_quality_flags(row, window)
+        for row in sorted(rows, key=lambda x: x["symbol"]):
+            self._remember(date_str, row, json.dumps(row, ensure_ascii=True))
+        self.rows_by_date[date_str] = rows
+        self.summaries[date_str] = summary
+        records_total = sum(len(r) for r in self.rows_by_date.values())
+        append_silver_date(self.settings.silver_root, date_str, rows, self.summaries, records_total)
+        self.logger.info(
+            "stage2_date_built",
+            extra={"stage": "stage2", "source": "silver", "symbol": "-", "reason": json.dumps(summary)},
+        )
+
+    # -- per-date work --------------------------------------------------------------
+
+    def _score_and_report(self, date_str: str) -> Dict[str, Any]:
+        s = self.settings
+        opts = CandidateOptions(
+            silver_root=s.silver_root,
+            output_root=s.signals_root,
+            config_path=s.stage3_config,
+            date=date_str,
+            top_n=s.top_n,
+            write_full_ranked=s.write_full_ranked,
+        )
+        # Scoring annotates rows in place; the panel keeps the plain silver rows.
+        day_rows = [dict(r) for r in self.rows_by_date.get(date_str, [])]
+        candidates = build_candidates(opts, self.logger, day_rows=day_rows, history=self.history)
+
+        raw_summary = json.loads((s.raw_root / "run_summaries" / f"date={date_str}.json").read_text(encoding="utf-8"))
+        coverage = build_coverage(raw_summary["datasets"], self.summaries.get(date_str, {}))
+        csv_path, md_path = write_daily_report(
+            date_str, s.reports_root, candidates.top(s.top_n), coverage, candidates.summary
+        )
+        # Every scan date, not just this one: the new snapshot is a follow-up day for earlier
+        # scans, and the outcome watermarks skip the pairs it does not touch.
+        stage5 = update_warehouse(
+            s.db_path,
+            s.signals_root,
+            s.silver_root,
+            s.horizons,
+            self.logger,
+            conn=self.conn,
+        )
+        return {
+            "date": date_str,
+            "candidate_count": candidates.summary["candidate_count"],
+            "csv": str(csv_path),
+            "markdown": str(md_path),
+            "outcome_pairs": stage5["outcome_pairs"],
+        }
+
+    def _unscored_dates(self) -> List[str]:
+        return [
+            d
+            for d in sorted(self.rows_by_date)
+            if not (self.settings.signals_root / f"date={d}" / "summary.json").exists()
+        ]
+
+    def process_new_dates(self) -> List[Dict[str, Any]]:
+        """Bring silver up to date with the ready raw dates, then score every unscored date."""
+        new = [d for d in ready_raw_dates(self.settings.raw_root) if d not in self.rows_by_date]
+        if new:
+            last = max(self.rows_by_date) if self.rows_by_date else ""
+            if new[0] < last:
+                # A date landed behind the panel; rolling features must be recomputed from scratch.
+                self._rebuild_panel()
+            else:
+                for d in new:
+                    self._extend_panel(d)
+        results = []
+        for d in self._unscored_dates():
+            try:
+                results.append(self._score_and_report(d))
+            except Exception as exc:  # noqa: BLE001
+                self.logger.error(
+                    "serve_date_failed",
+                    extra={"stage": "serve", "source": "daemon", "symbol": "-", "reason": f"{d}: {exc}"},
+                )
+                results.append({"date": d, "error": str(exc)})
+        return results
+
+    def tick(self, now: datetime) -> List[Dict[str, Any]]:
+        """One scheduler pass: the daily ingestion if it is due, then any new raw dates."""
+        today = now.strftime("%Y-%m-%d")
+        due = (
+            self.settings.run_at is not None
+            and now.weekday() < 5
+            and now.strftime("%H:%M") >= self.settings.run_at
+            and self._ingest_attempted != today
+            and today not in ready_raw_dates(self.settings.raw_root)
+        )
+        if due:
+            self._ingest_attempted = today
+            ingest_dates([today], self.symbols, self.settings.raw_root, self.logger)
+        results = self.process_new_dates()
+        for r in results:
+            self._log("serve_date_done", json.dumps(r))
+        return results
+
+    def serve_forever(self, max_ticks: Optional[int] = None) -> None:
+        """Tick every `poll_seconds` until interrupted (or after `max_ticks` passes)."""
+        ticks = 0
+        try:
+            while max_ticks is None or ticks < max_ticks:
+                self.tick(datetime.now())
+                ticks += 1
+                if max_ticks is None or ticks < max_ticks:
+                    time.sleep(self.settings.poll_seconds)
+        except KeyboardInterrupt:
+            self._log("serve_stopped", "interrupted")
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from navscan import metrics
+from navscan.data.fetchers.common import write_ndjson
+from navscan.data.fetchers.events import fetch_events_for_date
+from navscan.data.fetchers.metadata import fetch_metadata
+from navscan.data.fetchers.nav import fetch_nav_for_date
+from navscan.data.fetchers.price_volume import fetch_price_volume_for_date
+
+
+def _summary(rows: List[Dict[str, object]]) -> Dict[str, int]:
+    ok = sum(1 for r in rows if r.get("status") == "ok")
+    error = sum(1 for r in rows if r.get("status") == "error")
+    skipped = sum(1 for r in rows if r.get("status") == "skipped")
+    return {"ok": ok, "error": error, "skipped": skipped, "total": len(rows)}
+
+
+def summarize_raw_for_symbols(raw_root: Path, date_str: str, symbols: Iterable[str]) -> Dict[str, Dict[str, int]]:
+    """Per-dataset status counts of a written raw date, restricted to `symbols` (same shape as the run summary)."""
+    wanted = set(symbols)
+    out: Dict[str, Dict[str, int]] = {}
+    for dataset in ("price_volume", "nav", "events", "metadata"):
+        rows: List[Dict[str, object]] = []
+        for path in sorted((raw_root / dataset / f"date={date_str}").glob("source=*/snapshot.ndjson")):
+            with path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        row = json.loads(line)
+                        if row.get("symbol") in wanted:
+                            rows.append(row)
+        out[dataset] = _summary(rows)
+    return out
+
+
+def _log_errors(logger, rows: List[Dict[str, object]], source: str) -> None:
+    for r in rows:
+        if r.get("status") == "error":
+            logger.warning(
+                "raw_fetch_failed",
+                extra={
+                    "stage": "stage1",
+                    "source": source,
+                    "symbol": r.get("symbol", "-"),
+                    "reason": r.get("reason", "-"),
+                },
+            )
+
+
+def run_for_date(date_str: str, symbols: List[str], raw_root: Path, logger) -> Dict[str, Dict[str, int]]:
+    logger.info(
+        "ingestion_date_start",
+        extra={"stage": "stage1", "source": "-", "symbol": "-", "reason": date_str},
+    )
+
+    with metrics.scope() as date_metrics:
+        by_dataset: Dict[str, List[Dict[str, object]]] = {}
+        with metrics.span("stage1.fetch.price_volume"):
+            by_dataset["price_volume"] = fetch_price_volume_for_date(symbols, date_str)
+        with metrics.span("stage1.fetch.nav"):
+            by_dataset["nav"] = fetch_nav_for_date(symbols, date_str)
+        with metrics.span("stage1.fetch.events"):
+            by_dataset["events"] = fetch_events_for_date(symbols, date_str)
+        with metrics.span("stage1.fetch.metadata"):
+            by_dataset["metadata"] = fetch_metadata(symbols, date_str)
+
+        with metrics.span("stage1.write"):
+            for dataset, rows in by_dataset.items():
+                source = rows[0]["source"] if rows else "-"
+                path = raw_root / dataset / f"date={date_str}" / f"source={source}" / "snapshot.ndjson"
+                write_ndjson(path, rows)
+                metrics.incr("stage1.rows", len(rows))
+                metrics.incr("stage1.bytes_written", path.stat().st_size)
+                _log_errors(logger, rows, str(source))
+
+        summaries = {dataset: _summary(rows) for dataset, rows in by_dataset.items()}
+        metrics.incr("stage1.row_errors", sum(s["error"] for s in summaries.values()))
+        summary_path = raw_root / "run_summaries" / f"date={date_str}.json"
+        summary_path.parent.mkdir(parents=True, exist_ok=True)
+        summary_path.write_text(
+            json.dumps({"date": date_str, "datasets": summaries, "metrics": date_metrics.as_dict()}, indent=2)
+        )
+
+    logger.info(
+        "ingestion_date_done",
+        extra={"stage": "stage1", "source": "-", "symbol": "-", "reason": json.dumps(summaries)},
+    )
+    return summaries
+
+
+def ingest_dates(dates: List[str], symbols: List[str], raw_root: Path, logger) -> Dict[str, Dict[str, Dict[str, int]]]:
+    """Stage 1 for each date; a crashing date is logged and recorded as one fatal error."""
+    if not dates:
+        raise ValueError("No dates supplied")
+    all_summaries: Dict[str, Dict[str, Dict[str, int]]] = {}
+    for d in dates:
+        try:
+            all_summaries[d] = run_for_date(d, symbols, raw_root, logger)
+        except Exception as exc:  # noqa: BLE001
+            logger.error(
+                "ingestion_date_crashed",
+                extra={"stage": "stage1", "source": "-", "symbol": "-", "reason": str(exc)},
+            )
+            all_summaries[d] = {"fatal": {"ok": 0, "error": 1, "skipped": 0, "total": 1}}
+
+    logger.info(
+        "stage1_complete",
+        extra={"stage": "stage1", "source": "-", "symbol": "-", "reason": json.dumps(all_summaries)},
+    )
+    return all_summaries
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from navscan.reporting.csv_export import export_candidates_csv
+from navscan.reporting.markdown_report import build_markdown_report, write_markdown_report
+
+
+def build_coverage(raw_datasets: Dict[str, Dict[str, int]], silver_summary: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "raw_price_ok": raw_datasets["price_volume"]["ok"],
+        "raw_nav_ok": raw_datasets["nav"]["ok"],
+        "raw_events_ok": raw_datasets["events"]["ok"],
+        "raw_metadata_ok": raw_datasets["metadata"]["ok"],
+        "silver_records": silver_summary.get("records", 0),
+        "silver_missing_nav": silver_summary.get("missing_nav", 0),
+        "silver_invalid_nav": silver_summary.get("invalid_nav", 0),
+    }
+
+
+def write_daily_report(
+    date_str: str,
+    reports_root: Path,
+    top_rows: List[Dict[str, Any]],
+    coverage: Dict[str, Any],
+    signal_summary: Dict[str, Any],
+) -> Tuple[Path, Path]:
+    """Stage 4: top-opportunities CSV and markdown report under `reports_root/date=<date>`."""
+    out_dir = reports_root / f"date={date_str}"
+    csv_path = out_dir / "top_opportunities.csv"
+    md_path = out_dir / "daily_report.md"
+    export_candidates_csv(csv_path, top_rows)
+    md = build_markdown_report(date_str, top_rows, coverage, signal_summary)
+    write_markdown_report(md_path, md)
+    return csv_path, md_path
+
+
+def _read_head(path: Path, limit: int) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if len(rows) >= limit:
+                break
+            line = line.strip()
+            if line:
+                rows.append(json.loads(line))
+    return rows
+
+
+def read_top_rows(signals_root: Path, date_str: str, top_n: int) -> List[Dict[str, Any]]:
+    """First `top_n` ranked candidates Stage 3 wrote for a date.
+
+    The top-N file is used when it holds at least `top_n` rows; a larger request (say
+    `--top-n 20` after a run with `top_n: 10`) reads the full ranked file when there is one.
+    """
+    signal_dir = signals_root / f"date={date_str}"
+    top_path = signal_dir / "candidates_top.ndjson"
+    ranked_path = signal_dir / "candidates_ranked.ndjson"
+    if top_path.exists():
+        rows = _read_head(top_path, top_n)
+        if len(rows) >= top_n or not ranked_path.exists():
+            return rows
+    return _read_head(ranked_path, top_n)
+
+
+def report_for_date(
+    date_str: str, raw_root: Path, silver_root: Path, signals_root: Path, reports_root: Path, top_n: int
+) -> Tuple[Path, Path]:
+    """Stage 4 from the files Stages 1-3 left on disk."""
+    raw = json.loads((raw_root / "run_summaries" / f"date={date_str}.json").read_text(encoding="utf-8"))
+    silver = json.loads((silver_root / "run_summary.json").read_text(encoding="utf-8"))
+    signal_summary = json.loads((signals_root / f"date={date_str}" / "summary.json").read_text(encoding="utf-8"))
+    coverage = build_coverage(raw["datasets"], silver["dates"].get(date_str, {}))
+    top_rows = read_top_rows(signals_root, date_str, top_n)
+    return write_daily_report(date_str, reports_root, top_rows, coverage, signal_summary)
@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from navscan import metrics, profiling
+from navscan.data.fetchers.common import load_universe_symbols
+from navscan.pipeline.standardize import summarize_silver_rows
+from navscan.stages.cache import StageFingerprint, code_version, is_fresh, record_path, write_record
+from navscan.stages.candidates import CandidateOptions, build_candidates
+from navscan.stages.ingest import ingest_dates, summarize_raw_for_symbols
+from navscan.stages.report import build_coverage, read_top_rows, write_daily_report
+from navscan.stages.silver import build_silver
+
+
+class StageError(RuntimeError):
+    """A stage could not produce the outputs the next stage needs."""
+
+
+@dataclass
+class RunSettings:
+    """`navscan run` settings resolved from the run config."""
+
+    date: str
+    raw_root: Path
+    silver_root: Path
+    signals_root: Path
+    reports_root: Path
+    stage3_config: Path
+    top_n: int = 10
+    stage3_workers: int = 1
+    write_full_ranked: bool = True
+    zscore_window: int = 20
+
+
+@dataclass
+class RunResult:
+    csv_path: Path
+    md_path: Path
+    candidate_count: int
+    top_rows: List[Dict[str, Any]]
+    stages: Dict[str, str] = field(default_factory=dict)
+    metrics: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class RunProfile:
+    """One (universe, run config, output dir) combination of a multi-profile run."""
+
+    name: str
+    universe_path: Path
+    settings: RunSettings
+
+
+def _read_ndjson(path: Path) -> List[Dict[str, Any]]:
+    rows: List[Dict[str, Any]] = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                rows.append(json.loads(line))
+    return rows
+
+
+def _log_cached(logger, stage: str, date_str: str) -> None:
+    logger.info(
+        f"{stage}_cached",
+        extra={"stage": stage, "source": "fingerprint", "symbol": "-", "reason": f"inputs_unchanged date={date_str}"},
+    )
+
+
+def _raw_outputs(raw_root: Path, date_str: str) -> List[Path]:
+    return [
+        *raw_root.glob(f"*/date={date_str}/source=*/snapshot.ndjson"),
+        raw_root / "run_summaries" / f"date={date_str}.json",
+    ]
+
+
+def _signal_outputs(signals_root: Path, date_str: str) -> List[Path]:
+    out_dir = signals_root / f"date={date_str}"
+    names = ("scored_universe.ndjson", "candidates_ranked.ndjson", "candidates_top.ndjson", "summary.json")
+    return [out_dir / name for name in names]
+
+
+def run_pipeline(
+    settings: RunSettings,
+    universe_path: Path,
+    logger,
+    force: bool = False,
+    profiler: Optional[profiling.StageProfiler] = None,
+) -> RunResult:
+    """Stages 1-4 for one date in this process.
+
+    Each stage still writes its files for audit, but the next stage receives the
+    previous stage's rows and summaries directly instead of re-reading them.
+
+    Stages 1-3 record an input fingerprint (upstream files, config content, code
+    version) under `<root>/_fingerprints/`; a stage whose fingerprint matches and
+    whose recorded outputs are untouched is skipped and its outputs are read back.
+    `force` reruns everything.
+
+    Span timings and counters for the whole run go to `RunResult.metrics` and to
+    `<reports_root>/date=<date>/run_summary.json`. With a `profiler`, each stage is
+    also run under cProfile and tracemalloc and the profile summary (peak RSS, top
+    allocation sites) is added to the run summary.
+    """
+    with metrics.scope() as run_metrics:
+        result = _run_stages(settings, universe_path, logger, force, profiler)
+    result.metrics = run_metrics.as_dict()
+    extra = {"profile": profiler.write_summary()} if profiler is not None else {}
+    _write_run_summary(settings, result, extra)
+    return result
+
+
+def run_profiles(
+    profiles: List[RunProfile],
+    logger,
+    force: bool = False,
+    profiler: Optional[profiling.StageProfiler] = None,
+) -> Dict[str, RunResult]:
+    """Stages 1-2 once for the union of every profile's universe, then Stages 3-4 per profile.
+
+    Profiles share the date, raw and silver roots and z-score window; each needs its
+    own signals and reports roots. A profile scores only its own symbols (in its
+    universe's order), and its report coverage counts only those symbols, so its
+    outputs match a standalone `run_pipeline` over the same inputs. Each profile's
+    `run_summary.json` carries the shared Stage 1-2 metrics plus its own.
+    """
+    _check_profiles(profiles)
+    shared = profiles[0].settings
+    date_str = shared.date
+    symbols_by_profile = {p.name: load_universe_symbols(p.universe_path) for p in profiles}
+    union = list(dict.fromkeys(s for p in profiles for s in symbols_by_profile[p.name]))
+
+    shared_stages: Dict[str, str] = {}
+    with metrics.scope() as shared_metrics:
+        _raw, day_rows, _summary = _shared_stages(shared, union, shared_stages, logger, force, profiler)
+    by_symbol = {r["symbol"]: r for r in day_rows}
+
+    results: Dict[str, RunResult] = {}
+    for p in profiles:
+        symbols = symbols_by_profile[p.name]
+        with metrics.scope() as profile_metrics:
+            # Stage 3 annotates rows in place; each profile scores its own copies.
+            rows = [dict(by_symbol[s]) for s in symbols if s in by_symbol]
+            raw = summarize_raw_for_symbols(shared.raw_root, date_str, symbols)
+            coverage = build_coverage(raw, summarize_silver_rows(date_str, rows))
+            result = _scored_stages(
+                p.settings, symbols, rows, coverage, dict(shared_stages), logger, force, profiler, f".{p.name}"
+            )
+        combined = metrics.Metrics()
+        combined.merge(shared_metrics)
+        combined.merge(profile_metrics)
+        result.metrics = combined.as_dict()
+        results[p.name] = result
+
+    profile_summary = profiler.write_summary() if profiler is not None else None
+    for p in profiles:
+        extra: Dict[str, Any] = {"profile_name": p.name, "shared_symbols": len(union)}
+        if profile_summary is not None:
+            extra["profile"] = profile_summary
+        _write_run_summary(p.settings, results[p.name], extra)
+    return results
+
+
+def _check_profiles(profiles: List[RunProfile]) -> None:
+    if not profiles:
+        raise ValueError("no run profiles given")
+    names = [p.name for p in profiles]
+    if len(set(names)) != len(names):
+        raise ValueError(f"duplicate profile names: {names}")
+    first = profiles[0].settings
+    for p in profiles[1:]:
+        s = p.settings
+        for attr in ("date", "raw_root", "silver_root", "zscore_window"):
+            if getattr(s, attr) != getattr(first, attr):
+                raise ValueError(f"profile {p.name!r}: {attr} differs from profile {profiles[0].name!r}")
+    for attr in ("signals_root", "reports_root"):
+        roots = [getattr(p.settings, attr) for p in profiles]
+        if len(set(roots)) != len(roots):
+            raise ValueError(f"profiles must not share a {attr}")
+
+
+def _write_run_summary(settings: RunSettings, result: RunResult, extra: Dict[str, Any]) -> None:
+    summary_path = settings.reports_root / f"date={settings.date}" / "run_summary.json"
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    summary = {
+        "date": settings.date,
+        "stages": result.stages,
+        "candidate_count": result.candidate_count,
+        "metrics": result.metrics,
+        **extra,
+    }
+    summary_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+
+
+def _run_stages(
+    settings: RunSettings, universe_path: Path, logger, force: bool, profiler: Optional[profiling.StageProfiler]
+) -> RunResult:
+    symbols = load_universe_symbols(universe_path)
+    stages: Dict[str, str] = {}
+    raw, day_rows, silver_summary = _shared_stages(settings, symbols, stages, logger, force, profiler)
+    coverage = build_coverage(raw, silver_summary)
+    return _scored_stages(settings, symbols, day_rows, coverage, stages, logger, force, profiler)
+
+
+def _shared_stages(
+    settings: RunSettings,
+    symbols: List[str],
+    stages: Dict[str, str],
+    logger,
+    force: bool,
+    profiler: Optional[profiling.StageProfiler],
+) -> Tuple[Dict[str, Dict[str, int]], List[Dict[str, Any]], Dict[str, Any]]:
+    """Stages 1-2 for `symbols`: raw dataset counts, the date's silver rows and its silver summary."""
+    date_str = settings.date
+
+    # Stage 1
+    with metrics.span("stage1"), profiling.stage(profiler, "stage1"):
+        fp1 = StageFingerprint("stage1", date_str)
+        fp1.add_value("symbols", symbols)
+        fp1.add_value("code", code_version("stage1"))
+        rec1 = record_path(settings.raw_root, "stage1", date_str)
+        if not force and is_fresh(rec1, fp1):
+            _log_cached(logger, "stage1", date_str)
+            stages["stage1"] = "cached"
+            summary_path = settings.raw_root / "run_summaries" / f"date={date_str}.json"
+            raw = json.loads(summary_path.read_text(encoding="utf-8"))["datasets"]
+        else:
+            stages["stage1"] = "ran"
+            raw = ingest_dates([date_str], symbols, settings.raw_root, logger)[date_str]
+            if "fatal" in raw:
+                raise StageError(f"stage1 ingestion crashed for {date_str}")
+            # The fingerprint cannot see upstream failures, so a date with fetch errors is never fresh.
+            if not any(counts.get("error", 0) for counts in raw.values()):
+                write_record(rec1, fp1, _raw_outputs(settings.raw_root, date_str))
+
+    # Stage 2
+    with metrics.span("stage2"), profiling.stage(profiler, "stage2"):
+        silver_day = settings.silver_root / f"date={date_str}" / "snapshot.ndjson"
+        silver_all = settings.silver_root / "all_dates.ndjson"
+        silver_summary_path = settings.silver_root / "run_summary.json"
+        fp2 = StageFingerprint("stage2", date_str)
+        fp2.add_files("raw", _raw_outputs(settings.raw_root, date_str))
+        fp2.add_value("symbols", symbols)
+        fp2.add_value("zscore_window", settings.zscore_window)
+        fp2.add_value("code", code_version("stage2"))
+        rec2 = record_path(settings.silver_root, "stage2", date_str)
+        if not force and is_fresh(rec2, fp2):
+            _log_cached(logger, "stage2", date_str)
+            stages["stage2"] = "cached"
+            day_rows = _read_ndjson(silver_day)
+            silver_summaries = json.loads(silver_summary_path.read_text(encoding="utf-8"))["dates"]
+        else:
+            stages["stage2"] = "ran"
+            silver = build_silver(
+                settings.raw_root, settings.silver_root, symbols, [date_str], settings.zscore_window, logger
+            )
+            day_rows = silver.rows_by_date.get(date_str, [])
+            silver_summaries = silver.summaries
+            write_record(rec2, fp2, [silver_day, silver_all, silver_summary_path])
+
+    return raw, day_rows, silver_summaries.get(date_str, {})
+
+
+def _scored_stages(
+    settings: RunSettings,
+    symbols: List[str],
+    day_rows: List[Dict[str, Any]],
+    coverage: Dict[str, Any],
+    stages: Dict[str, str],
+    logger,
+    force: bool,
+    profiler: Optional[profiling.StageProfiler],
+    label: str = "",
+) -> RunResult:
+    """Stages 3-4 over silver rows already in memory; `label` suffixes the profiler's stage names."""
+    date_str = settings.date
+    silver_day = settings.silver_root / f"date={date_str}" / "snapshot.ndjson"
+    silver_all = settings.silver_root / "all_dates.ndjson"
+
+    # Stage 3
+    with metrics.span("stage3"), profiling.stage(profiler, f"stage3{label}"):
+        opts = CandidateOptions(
+            silver_root=settings.silver_root,
+            output_root=settings.signals_root,
+            config_path=settings.stage3_config,
+            date=date_str,
+            top_n=settings.top_n,
+            write_full_ranked=settings.write_full_ranked,
+            workers=settings.stage3_workers,
+        )
+        fp3 = StageFingerprint("stage3", date_str)
+        fp3.add_files("silver", [silver_day, silver_all])
+        fp3.add_files("config", [settings.stage3_config])
+        fp3.add_value("symbols", symbols)
+        fp3.add_value(
+            "options",
+            {
+                "half_life_mode": opts.half_life_mode,
+                "half_life_top_k": opts.half_life_top_k,
+                "top_n": opts.top_n,
+                "write_full_ranked": opts.write_full_ranked,
+            },
+        )
+        fp3.add_value("code", code_version("stage3"))
+        rec3 = record_path(settings.signals_root, "stage3", date_str)
+        signal_dir = settings.signals_root / f"date={date_str}"
+        if not force and is_fresh(rec3, fp3):
+            _log_cached(logger, "stage3", date_str)
+            stages["stage3"] = "cached"
+            signal_summary = json.loads((signal_dir / "summary.json").read_text(encoding="utf-8"))
+            top_rows = read_top_rows(settings.signals_root, date_str, settings.top_n)
+        else:
+            stages["stage3"] = "ran"
+            candidates = build_candidates(opts, logger, day_rows=day_rows)
+            signal_summary = candidates.summary
+            top_rows = candidates.top(settings.top_n)
+            write_record(rec3, fp3, _signal_outputs(settings.signals_root, date_str))
+
+    # Stage 4 is cheap and is what a rerun usually wants regenerated, so it always runs.
+    with metrics.span("stage4"), profiling.stage(profiler, f"stage4{label}"):
+        stages["stage4"] = "ran"
+        csv_path, md_path = write_daily_report(date_str, settings.reports_root, top_rows, coverage, signal_summary)
+
+    return RunResult(
+        csv_path,
+        md_path,
+        int(signal_summary.get("candidate_count", len(top_rows))),
+        top_rows,
+        stages,
+    )
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List
+
+from navscan import metrics
+from navscan.pipeline.standardize import (
+    apply_rolling_stats,
+    build_silver_records_for_date,
+    list_raw_dates,
+    write_silver_outputs,
+)
+
+
+@dataclass
+class SilverResult:
+    """Silver rows and per-date summaries exactly as written to `silver_root`."""
+
+    rows_by_date: Dict[str, List[Dict[str, Any]]]
+    summaries: Dict[str, Dict[str, Any]]
+
+    @property
+    def records_total(self) -> int:
+        return sum(len(rows) for rows in self.rows_by_date.values())
+
+
+def build_silver(
+    raw_root: Path,
+    silver_root: Path,
+    symbols: List[str],
+    dates: List[str],
+    zscore_window: int,
+    logger,
+) -> SilverResult:
+    if not dates:
+        dates = list_raw_dates(raw_root)
+    if not dates:
+        raise ValueError("No raw dates found to process")
+
+    logger.info(
+        "stage2_start",
+        extra={
+            "stage": "stage2",
+            "source": "raw",
+            "symbol": "-",
+            "reason": f"dates={','.join(dates)} window={zscore_window}",
+        },
+    )
+
+    with metrics.scope() as stage_metrics:
+        rows_by_date: Dict[str, List[Dict[str, Any]]] = {}
+        summaries: Dict[str, Dict[str, Any]] = {}
+        all_rows: List[Dict[str, Any]] = []
+
+        for date_str in dates:
+            rows, summary = build_silver_records_for_date(raw_root, date_str, symbols, zscore_window)
+            rows_by_date[date_str] = rows
+            summaries[date_str] = summary
+            all_rows.extend(rows)
+            logger.info(
+                "stage2_date_built",
+                extra={
+                    "stage": "stage2",
+                    "source": "silver",
+                    "symbol": "-",
+                    "reason": json.dumps(summary),
+                },
+            )
+
+        metrics.incr("stage2.rows", len(all_rows))
+        with metrics.span("stage2.features"):
+            apply_rolling_stats(all_rows, zscore_window)
+        with metrics.span("stage2.write"):
+            write_silver_outputs(silver_root, rows_by_date, summaries, stage_metrics.as_dict())
+
+    logger.info(
+        "stage2_complete",
+        extra={
+            "stage": "stage2",
+            "source": "silver",
+            "symbol": "-",
+            "reason": f"records={len(all_rows)}",
+        },
+    )
+    return SilverResult(rows_by_date, summaries)
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from navscan import metrics
+from navscan.tracking.archive import archive_snapshot_year, archived_snapshot_years, snapshot_archive_dir
+from navscan.tracking.outcomes import update_outcomes_incremental
+from navscan.tracking.store import (
+    DEFAULT_PROFILE,
+    connect,
+    init_schema,
+    partition_unchanged,
+    record_partition,
+    record_run,
+    upsert_candidates,
+    upsert_snapshots,
+)
+
+
+def _read_ndjson(path: Path) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    if not path.exists():
+        return out
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                out.append(json.loads(line))
+    return out
+
+
+def _discover_dates(base: Path, pattern: str) -> List[str]:
+    out = []
+    for p in base.glob(pattern):
+        if p.is_dir():
+            out.append(p.name.split("=", 1)[1])
+    return sorted(out)
+
+
+def _add_counts(totals: Dict[str, int], counts: Dict[str, int]) -> None:
+    for k, v in counts.items():
+        totals[k] = totals.get(k, 0) + v
+
+
+def _load_partition(
+    conn,
+    kind: str,
+    partition_key: str,
+    path: Path,
+    upsert: Callable[..., Dict[str, int]],
+    totals: Dict[str, int],
+    force: bool,
+    checked: Optional[Tuple[bool, Dict[str, Any]]] = None,
+) -> bool:
+    """Upsert one partition file unless its fingerprint matches the last load; True if loaded.
+
+    `checked` is a `partition_unchanged` result the caller already computed for this file.
+    """
+    unchanged, fingerprint = checked if checked is not None else partition_unchanged(conn, kind, partition_key, path)
+    if unchanged and not force:
+        return False
+    with metrics.span(f"stage5.read.{kind}"):
+        rows = _read_ndjson(path)
+    metrics.incr(f"stage5.rows_read.{kind}", len(rows))
+    metrics.incr(f"stage5.bytes_read.{kind}", fingerprint["size_bytes"])
+    if rows:
+        with metrics.span(f"stage5.write.{kind}"):
+            _add_counts(totals, upsert(conn, rows, str(path)))
+    record_partition(conn, kind, partition_key, path, fingerprint, len(rows))
+    return True
+
+
+def update_warehouse(
+    db_path: Path,
+    signals_root: Path,
+    silver_root: Path,
+    horizons: List[int],
+    logger,
+    scan_dates: Optional[List[str]] = None,
+    horizon_mode: str = "calendar",
+    recompute_outcomes: bool = False,
+    force_reload: bool = False,
+    db_profile: str = DEFAULT_PROFILE,
+    conn=None,
+) -> Dict[str, Any]:
+    """Stage 5 update: load changed silver/candidate partitions, then refresh outcomes.
+
+    `scan_dates` defaults to every date found under `silver_root` and `signals_root`.
+    A caller that keeps a warehouse connection open passes it as `conn` (already
+    through `init_schema`); it is left open.
+    """
+    with metrics.scope() as stage_metrics:
+        owned = conn is None
+        if owned:
+            conn = connect(db_path, profile=db_profile)
+            init_schema(conn)
+        record_run(conn, "update", f"horizons={horizons}")
+
+        silver_dates = _discover_dates(silver_root, "date=*")
+        signal_dates = _discover_dates(signals_root, "date=*")
+        dates = sorted(set(scan_dates)) if scan_dates else sorted(set(silver_dates) | set(signal_dates))
+        partitions = {"loaded": 0, "skipped_unchanged": 0, "skipped_archived": 0, "rearchived": 0}
+        snapshot_counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        archived_years = archived_snapshot_years(conn)
+        rearchive: Dict[int, List[str]] = {}
+        for d in silver_dates:
+            snap_path = silver_root / f"date={d}" / "snapshot.ndjson"
+            checked = partition_unchanged(conn, "snapshots", d, snap_path)
+            year = int(d[:4])
+            if year in archived_years:
+                # Closed years live in per-year archive files (see the `archive` command); a partition
+                # that changed since it was loaded goes through the hot table and is merged back below.
+                if checked[0] and not force_reload:
+                    partitions["skipped_archived"] += 1
+                    continue
+                rearchive.setdefault(year, []).append(d)
+            if _load_partition(
+                conn, "snapshots", d, snap_path, upsert_snapshots, snapshot_counts, force_reload, checked
+            ):
+                partitions["loaded"] += 1
+            else:
+                partitions["skipped_unchanged"] += 1
+        for year, changed in sorted(rearchive.items()):
+            archive_snapshot_year(conn, year, snapshot_archive_dir(conn, year))
+            partitions["rearchived"] += len(changed)
+            logger.warning(
+                "stage5_archived_partitions_reloaded",
+                extra={
+                    "stage": "stage5",
+                    "source": "tracking",
+                    "symbol": "-",
+                    "reason": f"merged into snapshots_{year} archive: {','.join(changed)}",
+                },
+            )
+
+        candidate_counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        for d in dates:
+            cand_path = signals_root / f"date={d}" / "candidates_ranked.ndjson"
+            if not cand_path.exists():
+                # Stage 3 ran with --skip-full-ranked; only the top-N file is available.
+                cand_path = signals_root / f"date={d}" / "candidates_top.ndjson"
+            if not cand_path.exists():
+                continue
+            if _load_partition(conn, "candidates", d, cand_path, upsert_candidates, candidate_counts, force_reload):
+                partitions["loaded"] += 1
+            else:
+                partitions["skipped_unchanged"] += 1
+
+        with metrics.span("stage5.outcomes"):
+            outcome_totals, outcome_pairs = update_outcomes_incremental(
+                conn, dates, horizons, force=recompute_outcomes, mode=horizon_mode
+            )
+
+    summary = {
+        "db": str(db_path),
+        "scan_dates_considered": dates,
+        "horizons": horizons,
+        "horizon_mode": horizon_mode,
+        "partitions": partitions,
+        "snapshot_rows": snapshot_counts,
+        "candidate_rows": candidate_counts,
+        "outcome_pairs": outcome_pairs,
+        "outcome_counts": outcome_totals,
+        "metrics": stage_metrics.as_dict(),
+    }
+    logger.info(
+        "stage5_update_complete",
+        extra={"stage": "stage5", "source": "tracking", "symbol": "-", "reason": json.dumps(summary)},
+    )
+    if owned:
+        conn.close()
+    return summary
@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import json
+import queue
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from navscan.tracking.archive import snapshot_source
+from navscan.tracking.queries import query_reverted_by_date_range, query_rollups
+from navscan.tracking.store import DEFAULT_PROFILE, connect_readonly
+
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+
+class ReadOnlyPool:
+    """Fixed set of read-only warehouse connections shared by request threads."""
+
+    def __init__(self, db_path: Path, size: int = 4, profile: str = DEFAULT_PROFILE) -> None:
+        self._conns: "queue.Queue" = queue.Queue()
+        self._all = [connect_readonly(db_path, profile=profile) for _ in range(max(size, 1))]
+        for conn in self._all:
+            self._conns.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        conn = self._conns.get()
+        try:
+            yield conn
+        finally:
+            self._conns.put(conn)
+
+    def close(self) -> None:
+        for conn in self._all:
+            conn.close()
+
+
+class ResultCache:
+    """LRU of query results, cleared whenever the warehouse's latest scan date changes."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+
+    def observe(self, generation: Optional[str]) -> None:
+        with self._lock:
+            if generation != self._generation:
+                self._entries.clear()
+                self._generation = generation
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def _date_param(params: Dict[str, str], name: str, default: Optional[str] = None) -> str:
+    value = params.get(name, default)
+    if value is None or not _DATE_RE.match(value):
+        raise ValueError(f"{name} must be YYYY-MM-DD")
+    return value
+
+
+def _int_param(params: Dict[str, str], name: str, default: Optional[int]) -> Optional[int]:
+    if name not in params:
+        return default
+    try:
+        return int(params[name])
+    except ValueError:
+        raise ValueError(f"{name} must be an integer") from None
+
+
+def latest_scan_date(conn) -> Optional[str]:
+    return conn.execute("SELECT MAX(scan_date) FROM candidates").fetchone()[0]
+
+
+def candidates_for_date(conn, scan_date: str, limit: Optional[int]) -> List[Dict[str, Any]]:
+    rows = conn.execute(
+        """
+        SELECT scan_date, symbol, rank, score, premium_discount_pct_at_scan, dollar_volume_at_scan,
+               rationale, risk_flags_json
+        FROM candidates
+        WHERE scan_date = ?
+        ORDER BY rank ASC
+        LIMIT ?
+        """,
+        (scan_date, -1 if limit is None else limit),
+    )
+    out = []
+    for r in rows:
+        row = dict(r)
+        row["risk_flags"] = json.loads(row.pop("risk_flags_json") or "[]")
+        out.append(row)
+    return out
+
+
+def pd_history(conn, symbol: str, start_date: str, end_date: str) -> List[Dict[str, Any]]:
+    source = snapshot_source(conn, start_date, end_date)
+    rows = conn.execute(
+        f"""
+        SELECT date, premium_discount_pct, price_close, nav
+        FROM {source}
+        WHERE symbol = ? AND date BETWEEN ? AND ?
+        ORDER BY date
+        """,
+        (symbol, start_date, end_date),
+    )
+    return [dict(r) for r in rows]
+
+
+class QueryService:
+    """Route handlers behind the HTTP API; each answer is cached per latest-scan-date generation."""
+
+    def __init__(self, pool: ReadOnlyPool, cache: ResultCache) -> None:
+        self.pool = pool
+        self.cache = cache
+
+    def handle(self, path: str, params: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+        route = self._routes().get(path)
+        if route is None and path != "/health":
+            return 404, {"error": f"unknown path: {path}"}
+        # The pool takes the connection back on every path, including the error returns.
+        with self.pool.connection() as conn:
+            try:
+                latest = latest_scan_date(conn)
+                self.cache.observe(latest)
+                if path == "/health":
+                    return 200, {"latest_scan_date": latest, "cache": self.cache.stats()}
+                key = (path, tuple(sorted(params.items())))
+                return 200, self.cache.get_or_compute(key, lambda: route(conn, params, latest))
+            except ValueError as exc:
+                return 400, {"error": str(exc)}
+            except sqlite3.Error as exc:
+                # e.g. a locked database or an archive file that cannot be attached.
+                return 500, {"error": f"database error: {exc}"}
+
+    def _routes(self) -> Dict[str, Callable[..., Any]]:
+        return {
+            "/candidates": self._candidates,
+            "/history": self._history,
+            "/hit-rate": self._hit_rate,
+            "/rollups": self._rollups,
+        }
+
+    @staticmethod
+    def _candidates(conn, params: Dict[str, str], latest: Optional[str]) -> Dict[str, Any]:
+        scan_date = params.get("date") or latest
+        if scan_date is None:
+            return {"scan_date": None, "candidates": []}
+        scan_date = _date_param({"date": scan_date}, "date")
+        limit = _int_param(params, "limit", None)
+        return {"scan_date": scan_date, "candidates": candidates_for_date(conn, scan_date, limit)}
+
+    @staticmethod
+    def _history(conn, params: Dict[str, str], latest: Optional[str]) -> Dict[str, Any]:
+        symbol = params.get("symbol")
+        if not symbol:
+            raise ValueError("symbol is required")
+        start = _date_param(params, "start", "0000-01-01")
+        end = _date_param(params, "end", "9999-12-31")
+        return {"symbol": symbol, "points": pd_history(conn, symbol, start, end)}
+
+    @staticmethod
+    def _hit_rate(conn, params: Dict[str, str], latest: Optional[str]) -> Dict[str, Any]:
+        start = _date_param(params, "start")
+        end = _date_param(params, "end", start)
+        as_of = _date_param(params, "as_of", "9999-12-31")
+        top_n = _int_param(params, "top_n", 10)
+        return {"rows": query_reverted_by_date_range(conn, start, end, top_n, as_of)}
+
+    @staticmethod
+    def _rollups(conn, params: Dict[str, str], latest: Optional[str]) -> Dict[str, Any]:
+        start = _date_param(params, "start")
+        end = _date_param(params, "end", start)
+        group_by = [g.strip() for g in params.get("group_by", "").split(",") if g.strip()]
+        horizon = _int_param(params, "horizon", None)
+        return {"rows": query_rollups(conn, start, end, group_by, horizon)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service: QueryService
+
+    def do_GET(self) -> None:  # noqa: N802
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        status, payload = self.service.handle(url.path, params)
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+
+def make_server(
+    db_path: Path,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    pool_size: int = 4,
+    cache_entries: int = 1024,
+) -> ThreadingHTTPServer:
+    """HTTP server answering JSON queries from read-only warehouse connections.
+
+    The warehouse must already exist. Close with `server.server_close()` and
+    `server.service.pool.close()`.
+
+    Routes: `/candidates?date=&limit=`, `/history?symbol=&start=&end=`,
+    `/hit-rate?start=&end=&top_n=&as_of=`, `/rollups?start=&end=&group_by=&horizon=`, `/health`.
+    """
+    service = QueryService(ReadOnlyPool(db_path, size=pool_size), ResultCache(cache_entries))
+    handler = type("QueryHandler", (_Handler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.service = service  # type: ignore[attr-defined]
+    return server
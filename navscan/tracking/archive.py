@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from navscan.tracking.store import utc_now
+
+# Per-year archive layout: symbols, flag sets and source paths are stored once and
+# referenced by integer id from the snapshot rows.
+_ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {db}.symbols (
+    id INTEGER PRIMARY KEY,
+    symbol TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS {db}.flag_sets (
+    id INTEGER PRIMARY KEY,
+    data_quality_flags_json TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS {db}.sources (
+    id INTEGER PRIMARY KEY,
+    source_path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS {db}.snapshots (
+    date TEXT NOT NULL,
+    symbol_id INTEGER NOT NULL,
+    price_close REAL,
+    nav REAL,
+    premium_discount_pct REAL,
+    dollar_volume REAL,
+    flags_id INTEGER,
+    source_id INTEGER,
+    row_hash TEXT NOT NULL,
+    first_seen_ts TEXT NOT NULL,
+    last_seen_ts TEXT NOT NULL,
+    PRIMARY KEY (date, symbol_id)
+) WITHOUT ROWID;
+"""
+
+_DECODED_SELECT = """
+SELECT s.date, y.symbol, s.price_close, s.nav, s.premium_discount_pct, s.dollar_volume,
+       f.data_quality_flags_json, src.source_path
+FROM {db}.snapshots s
+JOIN {db}.symbols y ON y.id = s.symbol_id
+LEFT JOIN {db}.flag_sets f ON f.id = s.flags_id
+LEFT JOIN {db}.sources src ON src.id = s.source_id
+"""
+
+
+def _main_dir(conn: sqlite3.Connection) -> Path:
+    for row in conn.execute("PRAGMA database_list"):
+        if row[1] == "main" and row[2]:
+            return Path(row[2]).parent
+    return Path.cwd()
+
+
+def _attached(conn: sqlite3.Connection) -> Set[str]:
+    return {row[1] for row in conn.execute("PRAGMA database_list")}
+
+
+def _alias(year: int) -> str:
+    return f"snapshots_{year}"
+
+
+def archived_snapshot_years(conn: sqlite3.Connection) -> Set[int]:
+    return {int(r[0]) for r in conn.execute("SELECT year FROM archives WHERE kind = 'snapshots'")}
+
+
+def snapshot_archive_dir(conn: sqlite3.Connection, year: int) -> Optional[Path]:
+    """Directory holding `year`'s snapshot archive file, or None if the year is not archived."""
+    row = conn.execute("SELECT path FROM archives WHERE kind = 'snapshots' AND year = ?", (year,)).fetchone()
+    return (_main_dir(conn) / row[0]).parent if row is not None else None
+
+
+def closed_snapshot_years(conn: sqlite3.Connection) -> List[int]:
+    """Years in the hot `snapshots` table older than the year of its latest date."""
+    years = [int(r[0]) for r in conn.execute("SELECT DISTINCT substr(date, 1, 4) FROM snapshots ORDER BY 1")]
+    return years[:-1]
+
+
+def archive_snapshot_year(conn: sqlite3.Connection, year: int, archive_dir: Path) -> Dict[str, object]:
+    """Move one closed year of snapshots into `archive_dir/snapshots_<year>.sqlite`.
+
+    Rows are copied, registered in `archives` and deleted from the hot table. Re-running
+    for an already archived year merges any remaining hot rows into the same file.
+    """
+    if year not in closed_snapshot_years(conn) and year not in archived_snapshot_years(conn):
+        raise ValueError(f"snapshot year {year} is not closed")
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    path = archive_dir / f"snapshots_{year}.sqlite"
+    alias = _alias(year)
+    start, end = f"{year}-01-01", f"{year}-12-31"
+
+    attach = alias not in _attached(conn)
+    if attach:
+        conn.execute("ATTACH DATABASE ? AS " + alias, (str(path),))
+    try:
+        conn.executescript(_ARCHIVE_SCHEMA.format(db=alias))
+        with conn:
+            conn.execute(
+                f"INSERT OR IGNORE INTO {alias}.symbols (symbol) "
+                "SELECT DISTINCT symbol FROM main.snapshots WHERE date BETWEEN ? AND ?",
+                (start, end),
+            )
+            conn.execute(
+                f"INSERT OR IGNORE INTO {alias}.flag_sets (data_quality_flags_json) "
+                "SELECT DISTINCT data_quality_flags_json FROM main.snapshots "
+                "WHERE date BETWEEN ? AND ? AND data_quality_flags_json IS NOT NULL",
+                (start, end),
+            )
+            conn.execute(
+                f"INSERT OR IGNORE INTO {alias}.sources (source_path) "
+                "SELECT DISTINCT source_path FROM main.snapshots "
+                "WHERE date BETWEEN ? AND ? AND source_path IS NOT NULL",
+                (start, end),
+            )
+            moved = conn.execute(
+                f"""
+                INSERT OR REPLACE INTO {alias}.snapshots
+                SELECT s.date, y.id, s.price_close, s.nav, s.premium_discount_pct, s.dollar_volume,
+                       f.id, src.id, s.row_hash, s.first_seen_ts, s.last_seen_ts
+                FROM main.snapshots s
+                JOIN {alias}.symbols y ON y.symbol = s.symbol
+                LEFT JOIN {alias}.flag_sets f ON f.data_quality_flags_json = s.data_quality_flags_json
+                LEFT JOIN {alias}.sources src ON src.source_path = s.source_path
+                WHERE s.date BETWEEN ? AND ?
+                """,
+                (start, end),
+            ).rowcount
+            conn.execute("DELETE FROM main.snapshots WHERE date BETWEEN ? AND ?", (start, end))
+            row_count = conn.execute(f"SELECT COUNT(*) FROM {alias}.snapshots").fetchone()[0]
+            try:
+                stored_path = os.path.relpath(path.resolve(), _main_dir(conn).resolve())
+            except ValueError:
+                stored_path = str(path.resolve())
+            conn.execute(
+                """
+                INSERT INTO archives (kind, year, path, row_count, archived_ts)
+                VALUES ('snapshots', ?, ?, ?, ?)
+                ON CONFLICT(kind, year) DO UPDATE SET
+                  path=excluded.path, row_count=excluded.row_count, archived_ts=excluded.archived_ts
+                """,
+                (year, stored_path, row_count, utc_now()),
+            )
+    finally:
+        if attach:
+            conn.execute("DETACH DATABASE " + alias)
+    return {"year": year, "path": str(path), "moved_rows": moved, "archive_rows": row_count}
+
+
+def _span_select(conn: sqlite3.Connection, start_date: str, end_date: Optional[str]) -> Optional[str]:
+    """UNION ALL of the hot table and every archive in range (attached on demand); None without archives."""
+    first = int(start_date[:4])
+    last = int(end_date[:4]) if end_date else None
+    rows = [
+        r
+        for r in conn.execute("SELECT year, path FROM archives WHERE kind = 'snapshots' ORDER BY year")
+        if int(r[0]) >= first and (last is None or int(r[0]) <= last)
+    ]
+    if not rows:
+        return None
+    attached = _attached(conn)
+    base = _main_dir(conn)
+    parts = [
+        "SELECT date, symbol, price_close, nav, premium_discount_pct, dollar_volume, "
+        "data_quality_flags_json, source_path FROM main.snapshots"
+    ]
+    for year, path in rows:
+        alias = _alias(int(year))
+        if alias not in attached:
+            conn.execute("ATTACH DATABASE ? AS " + alias, (str(base / path),))
+        parts.append(_DECODED_SELECT.format(db=alias))
+    return " UNION ALL ".join(parts)
+
+
+def snapshot_relation(conn: sqlite3.Connection, start_date: str, end_date: Optional[str] = None) -> str:
+    """Table or view to read snapshots for [start_date, end_date] from.
+
+    Archives for years in the range are attached on demand and exposed, decoded, next to
+    the hot table through `temp.snapshots_span`; without any it is just `snapshots`.
+    Must be called outside a transaction.
+    """
+    span = _span_select(conn, start_date, end_date)
+    if span is None:
+        return "snapshots"
+    conn.execute("DROP VIEW IF EXISTS temp.snapshots_span")
+    conn.execute("CREATE TEMP VIEW snapshots_span AS " + span)
+    return "temp.snapshots_span"
+
+
+def snapshot_source(conn: sqlite3.Connection, start_date: str, end_date: Optional[str] = None) -> str:
+    """Like `snapshot_relation`, but returns a FROM-clause subquery instead of creating a view.
+
+    Usable on read-only (`query_only`) connections, which cannot create temp views.
+    """
+    span = _span_select(conn, start_date, end_date)
+    return "snapshots" if span is None else f"({span})"
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+HORIZON_MODES = ("calendar", "trading", "asof")
+
+
+def calendar_target(scan_date: str, days: int) -> str:
+    return (datetime.strptime(scan_date, "%Y-%m-%d") + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+class SnapshotAsOfIndex:
+    """Sorted snapshot dates (and premium/discount values) per symbol.
+
+    Only snapshots with a premium/discount value count as observations. Follow-up
+    points for a horizon are resolved with a binary search instead of one lookup
+    query per candidate.
+    """
+
+    def __init__(self, series: Dict[str, Tuple[List[str], List[float]]]) -> None:
+        self._series = series
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[str, str, Optional[float]]]) -> "SnapshotAsOfIndex":
+        """Build from (symbol, date, premium_discount_pct) rows sorted by symbol, date."""
+        series: Dict[str, Tuple[List[str], List[float]]] = {}
+        for symbol, date, pd in rows:
+            if pd is None:
+                continue
+            dates, values = series.setdefault(symbol, ([], []))
+            dates.append(date)
+            values.append(float(pd))
+        return cls(series)
+
+    @classmethod
+    def load(
+        cls, conn, symbols: Iterable[str], start_after: str, relation: str = "snapshots"
+    ) -> "SnapshotAsOfIndex":
+        """Load snapshots strictly after `start_after` for `symbols` in one query per chunk.
+
+        `relation` is the table or view to read (see `archive.snapshot_relation`).
+        """
+        wanted = sorted(set(symbols))
+        rows: List[Tuple[str, str, Optional[float]]] = []
+        for i in range(0, len(wanted), 500):
+            chunk = wanted[i : i + 500]
+            marks = ",".join("?" for _ in chunk)
+            rows.extend(
+                tuple(r)
+                for r in conn.execute(
+                    f"""
+                    SELECT symbol, date, premium_discount_pct FROM {relation}
+                    WHERE symbol IN ({marks}) AND date > ?
+                    ORDER BY symbol, date
+                    """,
+                    (*chunk, start_after),
+                )
+            )
+        return cls.from_rows(rows)
+
+    def series(self, symbol: str) -> Tuple[List[str], List[float]]:
+        """(sorted dates, premium/discount values) observed for `symbol`."""
+        return self._series.get(symbol, ([], []))
+
+    def resolve(self, symbol: str, scan_date: str, horizon: int, mode: str) -> Optional[Tuple[str, float]]:
+        """(snapshot date, premium/discount) of the follow-up point, or None if not available yet.
+
+        `calendar`: the snapshot exactly `horizon` calendar days after the scan date.
+        `trading`: the `horizon`-th observation after the scan date.
+        `asof`: the latest observation after the scan date and on or before the calendar target.
+        """
+        entry = self._series.get(symbol)
+        if entry is None:
+            return None
+        dates, values = entry
+        if mode == "trading":
+            i = bisect_right(dates, scan_date) + horizon - 1
+            return (dates[i], values[i]) if horizon > 0 and i < len(dates) else None
+        target = calendar_target(scan_date, horizon)
+        if mode == "calendar":
+            i = bisect_left(dates, target)
+            return (dates[i], values[i]) if i < len(dates) and dates[i] == target else None
+        if mode == "asof":
+            i = bisect_right(dates, target) - 1
+            return (dates[i], values[i]) if i >= 0 and dates[i] > scan_date else None
+        raise ValueError(f"unknown horizon mode: {mode}")
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import hashlib
+from bisect import bisect_right
 from datetime import datetime, timedelta
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
-from navscan.tracking.store import fetch_snapshot_pd, upsert_outcome, utc_now
+from navscan.tracking.archive import snapshot_relation
+from navscan.tracking.asof import HORIZON_MODES, SnapshotAsOfIndex
+from navscan.tracking.rollups import pairs_missing_rollups, refresh_rollups
+from navscan.tracking.store import fetch_snapshot_pd, upsert_outcomes, utc_now
 
 
 def _date_add(date_str: str, days: int) -> str:
@@ -12,6 +17,7 @@ def _date_add(date_str: str, days: int) -> str:
 
 def compute_and_store_outcomes(conn, scan_date: str, candidates: List[Dict[str, Any]], horizons: List[int]) -> Dict[str, int]:
     counts = {"ok": 0, "missing_followup_data": 0, "zero_scan_pd": 0}
+    pending: List[Dict[str, Any]] = []
     for c in candidates:
         symbol = c["symbol"]
         pd_scan = c["premium_discount_pct_at_scan"]
@@ -35,19 +41,19 @@ def compute_and_store_outcomes(conn, scan_date: str, candidates: List[Dict[str,
             if not isinstance(pd_scan, (int, float)):
                 outcome["status"] = "missing_scan_pd"
                 outcome["reason"] = "scan_pd_missing"
-                upsert_outcome(conn, outcome)
+                pending.append(outcome)
                 counts["missing_followup_data"] += 1
                 continue
             if float(pd_scan) == 0.0:
                 outcome["status"] = "zero_scan_pd"
                 outcome["reason"] = "cannot_assess_reversion_from_zero"
-                upsert_outcome(conn, outcome)
+                pending.append(outcome)
                 counts["zero_scan_pd"] += 1
                 continue
 
             pd_target = fetch_snapshot_pd(conn, target_date, symbol)
             if not isinstance(pd_target, (int, float)):
-                upsert_outcome(conn, outcome)
+                pending.append(outcome)
                 counts["missing_followup_data"] += 1
                 continue
 
@@ -60,8 +66,317 @@ def compute_and_store_outcomes(conn, scan_date: str, candidates: List[Dict[str,
             outcome["reverted_flag"] = reverted
             outcome["status"] = "ok"
             outcome["reason"] = "reverted" if reverted else "not_reverted"
-            upsert_outcome(conn, outcome)
+            pending.append(outcome)
             counts["ok"] += 1
 
+    upsert_outcomes(conn, pending)
     return counts
 
+
+_SET_BASED_OUTCOMES_SQL = """
+WITH scan AS (
+  SELECT
+    c.scan_date,
+    c.symbol,
+    c.premium_discount_pct_at_scan AS pd_scan,
+    h.horizon_days,
+    date(c.scan_date, '+' || h.horizon_days || ' days') AS target_date
+  FROM candidates c
+  JOIN temp.outcome_pairs h ON h.scan_date = c.scan_date
+),
+joined AS (
+  SELECT
+    s.*,
+    CASE WHEN s.pd_scan IS NULL OR s.pd_scan = 0 THEN NULL ELSE sn.premium_discount_pct END AS pd_target
+  FROM scan s
+  LEFT JOIN {snapshots} sn ON sn.date = s.target_date AND sn.symbol = s.symbol
+)
+INSERT INTO outcomes (
+  scan_date, symbol, horizon_days, target_date, pd_scan, pd_target, abs_pd_change,
+  reverted_flag, status, reason, source_snapshot_date, computed_ts
+)
+SELECT
+  scan_date,
+  symbol,
+  horizon_days,
+  target_date,
+  pd_scan,
+  pd_target,
+  CASE WHEN pd_target IS NOT NULL THEN abs(pd_scan) - abs(pd_target) END,
+  CASE WHEN pd_target IS NOT NULL THEN abs(pd_target) < abs(pd_scan) END,
+  CASE
+    WHEN pd_scan IS NULL THEN 'missing_scan_pd'
+    WHEN pd_scan = 0 THEN 'zero_scan_pd'
+    WHEN pd_target IS NULL THEN 'missing_followup_data'
+    ELSE 'ok'
+  END,
+  CASE
+    WHEN pd_scan IS NULL THEN 'scan_pd_missing'
+    WHEN pd_scan = 0 THEN 'cannot_assess_reversion_from_zero'
+    WHEN pd_target IS NULL THEN 'snapshot_not_found'
+    WHEN abs(pd_target) < abs(pd_scan) THEN 'reverted'
+    ELSE 'not_reverted'
+  END,
+  target_date,
+  ?
+FROM joined
+WHERE true
+ON CONFLICT(scan_date, symbol, horizon_days, target_date) DO UPDATE SET
+  pd_scan=excluded.pd_scan,
+  pd_target=excluded.pd_target,
+  abs_pd_change=excluded.abs_pd_change,
+  reverted_flag=excluded.reverted_flag,
+  status=excluded.status,
+  reason=excluded.reason,
+  source_snapshot_date=excluded.source_snapshot_date,
+  computed_ts=excluded.computed_ts
+RETURNING status
+"""
+
+
+_DELETE_PAIR_OUTCOMES_SQL = """
+DELETE FROM outcomes
+WHERE (scan_date, horizon_days) IN (SELECT scan_date, horizon_days FROM temp.outcome_pairs)
+"""
+
+
+def _stage_pairs(conn, pairs: List[Tuple[str, int]]) -> None:
+    conn.execute(
+        "CREATE TEMP TABLE IF NOT EXISTS outcome_pairs ("
+        "scan_date TEXT NOT NULL, horizon_days INTEGER NOT NULL, PRIMARY KEY (scan_date, horizon_days))"
+    )
+    conn.execute("DELETE FROM temp.outcome_pairs")
+    conn.executemany("INSERT OR IGNORE INTO temp.outcome_pairs VALUES (?, ?)", pairs)
+
+
+def _compute_outcome_pairs(conn, pairs: List[Tuple[str, int]], replace: bool = False) -> Dict[str, int]:
+    counts = {"ok": 0, "missing_followup_data": 0, "zero_scan_pd": 0}
+    if not pairs:
+        return counts
+    relation = snapshot_relation(conn, min(d for d, _ in pairs), max(_date_add(d, h) for d, h in pairs))
+    with conn:
+        _stage_pairs(conn, pairs)
+        if replace:
+            conn.execute(_DELETE_PAIR_OUTCOMES_SQL)
+        sql = _SET_BASED_OUTCOMES_SQL.format(snapshots=relation)
+        for (status,) in conn.execute(sql, (utc_now(),)).fetchall():
+            key = "missing_followup_data" if status == "missing_scan_pd" else status
+            counts[key] += 1
+    return counts
+
+
+def _compute_outcome_pairs_indexed(conn, pairs: List[Tuple[str, int]], mode: str) -> Dict[str, int]:
+    """Replace outcomes for `pairs`, resolving follow-up points through a `SnapshotAsOfIndex`."""
+    counts = {"ok": 0, "missing_followup_data": 0, "zero_scan_pd": 0}
+    if not pairs:
+        return counts
+    start_after = min(d for d, _ in pairs)
+    relation = snapshot_relation(conn, start_after)
+    _stage_pairs(conn, pairs)
+    scans = conn.execute(
+        """
+        SELECT c.scan_date, c.symbol, c.premium_discount_pct_at_scan AS pd_scan, p.horizon_days
+        FROM candidates c
+        JOIN temp.outcome_pairs p ON p.scan_date = c.scan_date
+        ORDER BY c.scan_date, c.symbol, p.horizon_days
+        """
+    ).fetchall()
+    index = SnapshotAsOfIndex.load(conn, (r["symbol"] for r in scans), start_after, relation)
+
+    now = utc_now()
+    rows: List[Dict[str, Any]] = []
+    for r in scans:
+        scan_date, symbol, pd_scan, h = r["scan_date"], r["symbol"], r["pd_scan"], r["horizon_days"]
+        target_date = _date_add(scan_date, h)
+        outcome = {
+            "scan_date": scan_date,
+            "symbol": symbol,
+            "horizon_days": h,
+            "target_date": target_date,
+            "pd_scan": pd_scan,
+            "pd_target": None,
+            "abs_pd_change": None,
+            "reverted_flag": None,
+            "status": "missing_followup_data",
+            "reason": "snapshot_not_found",
+            "source_snapshot_date": target_date,
+            "computed_ts": now,
+        }
+        rows.append(outcome)
+        if pd_scan is None:
+            outcome["status"] = "missing_scan_pd"
+            outcome["reason"] = "scan_pd_missing"
+            counts["missing_followup_data"] += 1
+            continue
+        if float(pd_scan) == 0.0:
+            outcome["status"] = "zero_scan_pd"
+            outcome["reason"] = "cannot_assess_reversion_from_zero"
+            counts["zero_scan_pd"] += 1
+            continue
+        hit = index.resolve(symbol, scan_date, h, mode)
+        if hit is None:
+            counts["missing_followup_data"] += 1
+            continue
+
+        snapshot_date, pd_target = hit
+        abs_scan = abs(float(pd_scan))
+        abs_target = abs(pd_target)
+        reverted = 1 if abs_target < abs_scan else 0
+        if mode == "trading":
+            outcome["target_date"] = snapshot_date
+        outcome["source_snapshot_date"] = snapshot_date
+        outcome["pd_target"] = pd_target
+        outcome["abs_pd_change"] = abs_scan - abs_target
+        outcome["reverted_flag"] = reverted
+        outcome["status"] = "ok"
+        outcome["reason"] = "reverted" if reverted else "not_reverted"
+        counts["ok"] += 1
+
+    # One transaction, so readers never see the pairs without outcomes and a failed insert keeps
+    # the old rows; `upsert_outcomes`'s own `with conn:` commits (or rolls back) both statements.
+    with conn:
+        conn.execute(_DELETE_PAIR_OUTCOMES_SQL)
+        upsert_outcomes(conn, rows)
+    return counts
+
+
+def compute_outcomes_set_based(conn, scan_dates: List[str], horizons: List[int]) -> Dict[str, int]:
+    """Compute and upsert outcomes for every candidate on `scan_dates` in one statement.
+
+    Same statuses and counts as `compute_and_store_outcomes` (including `missing_scan_pd`
+    being tallied under `missing_followup_data`), but as a single INSERT ... SELECT
+    joining candidates to the horizon target-date snapshots, in one transaction.
+    """
+    return _compute_outcome_pairs(conn, [(d, h) for d in sorted(set(scan_dates)) for h in sorted(set(horizons))])
+
+
+def _window_end(mode: str, scan_date: str, horizon: int, watermark: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Last snapshot date a pair's outcomes can depend on; None means open-ended.
+
+    A `trading` pair that is not final yet may resolve to any later observation, so
+    its window stays open until every follow-up point is found.
+    """
+    if mode != "trading":
+        return _date_add(scan_date, horizon)
+    if watermark is not None and watermark["horizon_mode"] == mode and watermark["final"]:
+        return watermark["window_end"]
+    return None
+
+
+def _pair_digest(
+    snap: List[Tuple[str, str]],
+    snap_dates: List[str],
+    cand_sha: str,
+    mode: str,
+    scan_date: str,
+    horizon: int,
+    window_end: Optional[str],
+) -> str:
+    lo = bisect_right(snap_dates, scan_date)
+    hi = len(snap_dates) if window_end is None else bisect_right(snap_dates, window_end)
+    hasher = hashlib.sha256(f"{mode}|{scan_date}|{horizon}|{cand_sha}".encode("utf-8"))
+    for key, sha in snap[lo:hi]:
+        hasher.update(f"|{key}:{sha}".encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def update_outcomes_incremental(
+    conn,
+    scan_dates: List[str],
+    horizons: List[int],
+    force: bool = False,
+    mode: str = "calendar",
+) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Recompute only (scan_date, horizon) pairs whose input digest moved since the last run.
+
+    The digest covers the scan date's candidate partition fingerprint and every snapshot
+    partition fingerprint inside the pair's window, so a newly arrived or reloaded
+    follow-up day changes it. Returns (outcome row counts for recomputed pairs, pair counters).
+    """
+    if mode not in HORIZON_MODES:
+        raise ValueError(f"unknown horizon mode: {mode}")
+    wanted = set(scan_dates)
+    with_candidates = sorted(
+        r["scan_date"] for r in conn.execute("SELECT DISTINCT scan_date FROM candidates") if r["scan_date"] in wanted
+    )
+    snap = [
+        (r["partition_key"], r["sha256"])
+        for r in conn.execute(
+            "SELECT partition_key, sha256 FROM loaded_partitions WHERE kind = 'snapshots' ORDER BY partition_key"
+        )
+    ]
+    snap_dates = [d for d, _ in snap]
+    cand_sha = {
+        r["partition_key"]: r["sha256"]
+        for r in conn.execute("SELECT partition_key, sha256 FROM loaded_partitions WHERE kind = 'candidates'")
+    }
+    stored = {
+        (r["scan_date"], r["horizon_days"]): dict(r)
+        for r in conn.execute(
+            "SELECT scan_date, horizon_days, inputs_digest, horizon_mode, final, window_end FROM outcome_watermarks"
+        )
+    }
+
+    todo: List[Tuple[str, int]] = []
+    all_pairs = [(d, h) for d in with_candidates for h in sorted(set(horizons))]
+    skipped = 0
+    for d, h in all_pairs:
+        mark = stored.get((d, h))
+        digest = _pair_digest(snap, snap_dates, cand_sha.get(d, ""), mode, d, h, _window_end(mode, d, h, mark))
+        if force or mark is None or mark["horizon_mode"] != mode or mark["inputs_digest"] != digest:
+            todo.append((d, h))
+        else:
+            skipped += 1
+
+    if mode == "calendar":
+        counts = _compute_outcome_pairs(conn, todo, replace=True)
+    else:
+        counts = _compute_outcome_pairs_indexed(conn, todo, mode)
+
+    recomputed = set(todo)
+    refresh_rollups(conn, todo + pairs_missing_rollups(conn, [p for p in all_pairs if p not in recomputed]))
+
+    marks: List[Tuple[Any, ...]] = []
+    if todo:
+        pair_stats = {
+            (r["scan_date"], r["horizon_days"]): (r["pending"], r["last_source"])
+            for r in conn.execute(
+                """
+                SELECT o.scan_date, o.horizon_days,
+                       SUM(o.status = 'missing_followup_data') AS pending,
+                       MAX(CASE WHEN o.status = 'ok' THEN o.source_snapshot_date END) AS last_source
+                FROM outcomes o
+                JOIN temp.outcome_pairs p ON p.scan_date = o.scan_date AND p.horizon_days = o.horizon_days
+                GROUP BY o.scan_date, o.horizon_days
+                """
+            )
+        }
+        now = utc_now()
+        for d, h in todo:
+            pending, last_source = pair_stats.get((d, h), (0, None))
+            final = int(not pending)
+            if mode == "trading":
+                window_end = (last_source or d) if final else None
+            else:
+                window_end = _date_add(d, h)
+            digest = _pair_digest(snap, snap_dates, cand_sha.get(d, ""), mode, d, h, window_end)
+            marks.append((d, h, digest, pending or 0, final, now, mode, window_end))
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO outcome_watermarks (
+              scan_date, horizon_days, inputs_digest, pending_count, final, computed_ts, horizon_mode, window_end
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(scan_date, horizon_days) DO UPDATE SET
+              inputs_digest=excluded.inputs_digest,
+              pending_count=excluded.pending_count,
+              final=excluded.final,
+              computed_ts=excluded.computed_ts,
+              horizon_mode=excluded.horizon_mode,
+              window_end=excluded.window_end
+            """,
+            marks,
+        )
+    pending_pairs = conn.execute("SELECT COUNT(*) FROM outcome_watermarks WHERE final = 0").fetchone()[0]
+    pairs = {"recomputed": len(todo), "skipped_unchanged": skipped, "pending": int(pending_pairs)}
+    return counts, pairs
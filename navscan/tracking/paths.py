@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Sequence
+
+from navscan.tracking.archive import snapshot_relation
+from navscan.tracking.asof import SnapshotAsOfIndex, calendar_target
+from navscan.tracking.store import upsert_path_outcomes, utc_now
+
+
+def _days_between(start: str, end: str) -> int:
+    return (datetime.strptime(end, "%Y-%m-%d") - datetime.strptime(start, "%Y-%m-%d")).days
+
+
+def _next_smaller(values: Sequence[float]) -> List[int]:
+    """Index of the next strictly smaller value for each position (len(values) if none)."""
+    out = [len(values)] * len(values)
+    stack: List[int] = []
+    for i, v in enumerate(values):
+        while stack and v < values[stack[-1]]:
+            out[stack.pop()] = i
+        stack.append(i)
+    return out
+
+
+def _next_matching(flags: Sequence[bool]) -> List[int]:
+    """For each position k, the first index >= k whose flag is set (len(flags) if none)."""
+    out = [len(flags)] * (len(flags) + 1)
+    for k in range(len(flags) - 1, -1, -1):
+        out[k] = k if flags[k] else out[k + 1]
+    return out
+
+
+def _symbol_path_metrics(
+    dates: List[str],
+    pds: List[float],
+    scans: List[Dict[str, Any]],
+    window_days: int,
+    now: str,
+) -> List[Dict[str, Any]]:
+    """Forward-window metrics for one symbol's candidates (sorted by scan_date).
+
+    Window bounds only move forward as scan dates increase, so the running minimum of
+    |pd| is kept with a monotonic deque; first reversion and first zero cross come from
+    next-smaller / next-sign-change tables built once per symbol.
+    """
+    abs_pd = [abs(v) for v in pds]
+    next_smaller = _next_smaller(abs_pd)
+    next_nonpos = _next_matching([v <= 0 for v in pds])
+    next_nonneg = _next_matching([v >= 0 for v in pds])
+
+    window: deque = deque()
+    pushed = 0
+    out: List[Dict[str, Any]] = []
+    for c in scans:
+        scan_date, pd_scan = c["scan_date"], c["pd_scan"]
+        end_date = calendar_target(scan_date, window_days)
+        lo = bisect_right(dates, scan_date)
+        hi = bisect_right(dates, end_date)
+        while pushed < hi:
+            while window and abs_pd[window[-1]] >= abs_pd[pushed]:
+                window.pop()
+            window.append(pushed)
+            pushed += 1
+        while window and window[0] < lo:
+            window.popleft()
+
+        row: Dict[str, Any] = {
+            "scan_date": scan_date,
+            "symbol": c["symbol"],
+            "window_days": window_days,
+            "pd_scan": pd_scan,
+            "observations": hi - lo,
+            "max_favorable_reversion": None,
+            "max_favorable_date": None,
+            "days_to_first_reversion": None,
+            "crossed_zero": None,
+            "days_to_zero_cross": None,
+            "status": "ok",
+            "computed_ts": now,
+        }
+        out.append(row)
+        if pd_scan is None:
+            row["status"] = "missing_scan_pd"
+            continue
+        if float(pd_scan) == 0.0:
+            row["status"] = "zero_scan_pd"
+            continue
+        if hi == lo:
+            row["status"] = "missing_followup_data"
+            continue
+
+        abs_scan = abs(float(pd_scan))
+        best = window[0]
+        row["max_favorable_reversion"] = abs_scan - abs_pd[best]
+        row["max_favorable_date"] = dates[best]
+
+        at = bisect_left(dates, scan_date)
+        if at < len(dates) and dates[at] == scan_date and abs_pd[at] == abs_scan:
+            first = next_smaller[at]
+        else:
+            first = next((k for k in range(lo, hi) if abs_pd[k] < abs_scan), len(dates))
+        if first < hi:
+            row["days_to_first_reversion"] = _days_between(scan_date, dates[first])
+
+        cross = next_nonpos[lo] if pd_scan > 0 else next_nonneg[lo]
+        row["crossed_zero"] = 1 if cross < hi else 0
+        if cross < hi:
+            row["days_to_zero_cross"] = _days_between(scan_date, dates[cross])
+    return out
+
+
+def compute_path_metrics(conn, scan_dates: List[str], windows: List[int]) -> Dict[str, int]:
+    """Compute and store forward-path metrics for all candidates on `scan_dates`.
+
+    Snapshots for every candidate symbol over the whole span are loaded once; metrics
+    for each window length are then derived per symbol in linear time.
+    """
+    counts = {"ok": 0, "missing_followup_data": 0, "missing_scan_pd": 0, "zero_scan_pd": 0}
+    wanted = sorted(set(scan_dates))
+    if not wanted or not windows:
+        return counts
+    by_symbol: Dict[str, List[Dict[str, Any]]] = {}
+    for chunk_start in range(0, len(wanted), 500):
+        chunk = wanted[chunk_start : chunk_start + 500]
+        marks = ",".join("?" for _ in chunk)
+        for r in conn.execute(
+            f"""
+            SELECT scan_date, symbol, premium_discount_pct_at_scan AS pd_scan
+            FROM candidates WHERE scan_date IN ({marks})
+            ORDER BY symbol, scan_date
+            """,
+            chunk,
+        ):
+            by_symbol.setdefault(r["symbol"], []).append(dict(r))
+    if not by_symbol:
+        return counts
+
+    start_after = calendar_target(wanted[0], -1)
+    relation = snapshot_relation(conn, start_after, calendar_target(wanted[-1], max(windows)))
+    index = SnapshotAsOfIndex.load(conn, by_symbol, start_after, relation)
+    now = utc_now()
+    rows: List[Dict[str, Any]] = []
+    for symbol, scans in by_symbol.items():
+        dates, pds = index.series(symbol)
+        for w in sorted(set(windows)):
+            rows.extend(_symbol_path_metrics(dates, pds, scans, w, now))
+    for row in rows:
+        counts[row["status"]] += 1
+    upsert_path_outcomes(conn, rows)
+    return counts
@@ -1,66 +1,109 @@
 from __future__ import annotations
 
-from typing import Dict
+from typing import Any, Dict, List, Optional
 
+_REVERTED_BY_DATE_SQL = """
+WITH top AS (
+  SELECT scan_date, symbol
+  FROM (
+    SELECT scan_date, symbol, ROW_NUMBER() OVER (PARTITION BY scan_date ORDER BY rank ASC) AS rn
+    FROM candidates
+    WHERE scan_date BETWEEN ? AND ?
+  )
+  WHERE rn <= ?
+),
+per_symbol AS (
+  SELECT
+    t.scan_date,
+    t.symbol,
+    SUM(CASE WHEN o.status = 'ok' THEN 1 ELSE 0 END) AS ok_rows,
+    MAX(CASE WHEN o.status = 'ok' AND o.reverted_flag = 1 THEN 1 ELSE 0 END) AS reverted
+  FROM top t
+  LEFT JOIN outcomes o
+    ON o.scan_date = t.scan_date AND o.symbol = t.symbol AND o.target_date <= ?
+  GROUP BY t.scan_date, t.symbol
+)
+SELECT
+  scan_date,
+  COUNT(*) AS candidate_count,
+  SUM(reverted) AS reverted_count,
+  SUM(CASE WHEN ok_rows > 0 THEN 1 ELSE 0 END) AS with_followup_count
+FROM per_symbol
+GROUP BY scan_date
+ORDER BY scan_date
+"""
 
-def query_reverted_by_date(conn, scan_date: str, top_n: int, as_of_date: str) -> Dict[str, int]:
-    top = list(
-        conn.execute(
-            """
-            SELECT symbol
-            FROM candidates
-            WHERE scan_date = ?
-            ORDER BY rank ASC
-            LIMIT ?
-            """,
-            (scan_date, top_n),
-        ).fetchall()
-    )
-    symbols = [r["symbol"] for r in top]
-    if not symbols:
-        return {
-            "scan_date": scan_date,
-            "as_of_date": as_of_date,
-            "top_n": top_n,
-            "candidate_count": 0,
-            "reverted_count": 0,
-            "with_followup_count": 0,
-            "missing_followup_count": 0,
-        }
-
-    reverted = 0
-    with_followup = 0
-    missing = 0
-    for sym in symbols:
-        rows = list(
-            conn.execute(
-                """
-                SELECT status, reverted_flag
-                FROM outcomes
-                WHERE scan_date = ? AND symbol = ? AND target_date <= ?
-                ORDER BY target_date ASC
-                """,
-                (scan_date, sym, as_of_date),
-            ).fetchall()
-        )
-        if not rows:
-            missing += 1
-            continue
-        ok_rows = [r for r in rows if r["status"] == "ok"]
-        if not ok_rows:
-            missing += 1
-            continue
-        with_followup += 1
-        if any(int(r["reverted_flag"]) == 1 for r in ok_rows):
-            reverted += 1
 
+def _hit_rate_row(scan_date: str, as_of_date: str, top_n: int, row) -> Dict[str, int]:
+    candidate_count = int(row["candidate_count"]) if row is not None else 0
+    with_followup = int(row["with_followup_count"]) if row is not None else 0
     return {
         "scan_date": scan_date,
         "as_of_date": as_of_date,
         "top_n": top_n,
-        "candidate_count": len(symbols),
-        "reverted_count": reverted,
+        "candidate_count": candidate_count,
+        "reverted_count": int(row["reverted_count"]) if row is not None else 0,
         "with_followup_count": with_followup,
-        "missing_followup_count": missing,
+        "missing_followup_count": candidate_count - with_followup,
     }
 
+
+def query_reverted_by_date(conn, scan_date: str, top_n: int, as_of_date: str) -> Dict[str, int]:
+    row = conn.execute(_REVERTED_BY_DATE_SQL, (scan_date, scan_date, top_n, as_of_date)).fetchone()
+    return _hit_rate_row(scan_date, as_of_date, top_n, row)
+
+
+def query_reverted_by_date_range(
+    conn, start_date: str, end_date: str, top_n: int, as_of_date: str
+) -> List[Dict[str, int]]:
+    """Per-scan-date hit rates for every scan date with candidates in [start_date, end_date]."""
+    rows = conn.execute(_REVERTED_BY_DATE_SQL, (start_date, end_date, top_n, as_of_date)).fetchall()
+    return [_hit_rate_row(r["scan_date"], as_of_date, top_n, r) for r in rows]
+
+
+ROLLUP_GROUPS = {
+    "scan_date": "scan_date",
+    "month": "substr(scan_date, 1, 7)",
+    "horizon": "horizon_days",
+    "rank_bucket": "rank_bucket",
+}
+
+
+def query_rollups(
+    conn, start_date: str, end_date: str, group_by: List[str], horizon_days: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """Hit rate, mean abs_pd_change and counts from `outcome_rollups`, grouped by `group_by` keys."""
+    unknown = [g for g in group_by if g not in ROLLUP_GROUPS]
+    if unknown:
+        raise ValueError(f"unknown rollup group(s): {', '.join(unknown)}")
+    keys = [f"{ROLLUP_GROUPS[g]} AS {g}" for g in group_by]
+    where = "scan_date BETWEEN ? AND ?"
+    params: List[Any] = [start_date, end_date]
+    if horizon_days is not None:
+        where += " AND horizon_days = ?"
+        params.append(horizon_days)
+    group = f"GROUP BY {', '.join(group_by)} ORDER BY {', '.join(group_by)}" if group_by else ""
+    sql = f"""
+        SELECT {''.join(k + ', ' for k in keys)}
+               SUM(n) AS n, SUM(ok_count) AS ok_count, SUM(reverted_count) AS reverted_count,
+               SUM(missing_followup_count) AS missing_followup_count, TOTAL(sum_abs_pd_change) AS sum_abs_pd_change
+        FROM outcome_rollups
+        WHERE {where}
+        {group}
+    """
+    out: List[Dict[str, Any]] = []
+    for r in conn.execute(sql, params):
+        ok_count = int(r["ok_count"] or 0)
+        row = {g: r[g] for g in group_by}
+        row.update(
+            {
+                "n": int(r["n"] or 0),
+                "ok_count": ok_count,
+                "reverted_count": int(r["reverted_count"] or 0),
+                "missing_followup_count": int(r["missing_followup_count"] or 0),
+                "hit_rate": (int(r["reverted_count"] or 0) / ok_count) if ok_count else None,
+                "mean_abs_pd_change": (float(r["sum_abs_pd_change"]) / ok_count) if ok_count else None,
+            }
+        )
+        out.append(row)
+    return out
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+# Inclusive rank ranges; None is open-ended.
+RANK_BUCKETS: Tuple[Tuple[int, Optional[int]], ...] = ((1, 5), (6, 10), (11, 25), (26, 50), (51, None))
+
+
+def rank_bucket_label(lo: int, hi: Optional[int]) -> str:
+    return f"{lo}+" if hi is None else f"{lo}-{hi}"
+
+
+def _rank_bucket_sql(column: str) -> str:
+    whens = []
+    for lo, hi in RANK_BUCKETS:
+        cond = f"{column} >= {lo}" if hi is None else f"{column} BETWEEN {lo} AND {hi}"
+        whens.append(f"WHEN {cond} THEN '{rank_bucket_label(lo, hi)}'")
+    return "CASE " + " ".join(whens) + " ELSE 'unranked' END"
+
+
+_REFRESH_ROLLUPS_SQL = f"""
+INSERT INTO outcome_rollups (
+  scan_date, horizon_days, rank_bucket, n, ok_count, reverted_count, missing_followup_count, sum_abs_pd_change
+)
+SELECT
+  o.scan_date,
+  o.horizon_days,
+  {_rank_bucket_sql("c.rank")} AS rank_bucket,
+  COUNT(*),
+  SUM(o.status = 'ok'),
+  SUM(o.status = 'ok' AND o.reverted_flag = 1),
+  SUM(o.status = 'missing_followup_data'),
+  TOTAL(CASE WHEN o.status = 'ok' THEN o.abs_pd_change END)
+FROM outcomes o
+JOIN temp.rollup_pairs p ON p.scan_date = o.scan_date AND p.horizon_days = o.horizon_days
+LEFT JOIN candidates c ON c.scan_date = o.scan_date AND c.symbol = o.symbol
+GROUP BY o.scan_date, o.horizon_days, rank_bucket
+"""
+
+
+def refresh_rollups(conn, pairs: List[Tuple[str, int]]) -> int:
+    """Rebuild rollup rows for the given (scan_date, horizon) pairs from their outcomes."""
+    if not pairs:
+        return 0
+    with conn:
+        conn.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS rollup_pairs ("
+            "scan_date TEXT NOT NULL, horizon_days INTEGER NOT NULL, PRIMARY KEY (scan_date, horizon_days))"
+        )
+        conn.execute("DELETE FROM temp.rollup_pairs")
+        conn.executemany("INSERT OR IGNORE INTO temp.rollup_pairs VALUES (?, ?)", pairs)
+        conn.execute(
+            """
+            DELETE FROM outcome_rollups
+            WHERE (scan_date, horizon_days) IN (SELECT scan_date, horizon_days FROM temp.rollup_pairs)
+            """
+        )
+        conn.execute(_REFRESH_ROLLUPS_SQL)
+    return len(pairs)
+
+
+def pairs_missing_rollups(conn, pairs: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+    """Pairs with no rollup rows yet, e.g. outcomes written before the rollup table existed."""
+    have = {(r[0], r[1]) for r in conn.execute("SELECT DISTINCT scan_date, horizon_days FROM outcome_rollups")}
+    return [pair for pair in pairs if pair not in have]
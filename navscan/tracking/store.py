@@ -3,9 +3,37 @@ from __future__ import annotations
 import hashlib
 import json
 import sqlite3
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Rows per executemany batch and bound parameters per IN (...) lookup.
+_WRITE_CHUNK = 5000
+_SQL_PARAM_CHUNK = 500
+
+SNAPSHOT_COLUMNS = [
+    "date",
+    "symbol",
+    "price_close",
+    "nav",
+    "premium_discount_pct",
+    "dollar_volume",
+    "data_quality_flags_json",
+    "source_path",
+]
+
+CANDIDATE_COLUMNS = [
+    "scan_date",
+    "symbol",
+    "rank",
+    "score",
+    "premium_discount_pct_at_scan",
+    "dollar_volume_at_scan",
+    "rationale",
+    "risk_flags_json",
+    "source_path",
+]
 
 
 def utc_now() -> str:
@@ -17,10 +45,71 @@ def _row_hash(row: Dict[str, Any]) -> str:
     return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 
-def connect(db_path: Path) -> sqlite3.Connection:
+@dataclass(frozen=True)
+class ConnectionProfile:
+    """SQLite connection tuning applied by `connect` / `connect_readonly`."""
+
+    journal_mode: str
+    synchronous: str
+    mmap_size: int
+    cache_size_kib: int
+    temp_store: str
+    cached_statements: int = 256
+    busy_timeout_ms: int = 10_000
+
+
+CONNECTION_PROFILES: Dict[str, ConnectionProfile] = {
+    # Rollback journal with a full fsync per commit (SQLite defaults; the pre-profile behaviour).
+    "safe": ConnectionProfile(
+        journal_mode="DELETE",
+        synchronous="FULL",
+        mmap_size=0,
+        cache_size_kib=2_000,
+        temp_store="DEFAULT",
+    ),
+    # WAL lets readers run while the nightly update writes; NORMAL only fsyncs at checkpoints.
+    "wal": ConnectionProfile(
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        mmap_size=256 * 1024 * 1024,
+        cache_size_kib=64_000,
+        temp_store="MEMORY",
+    ),
+}
+DEFAULT_PROFILE = "wal"
+
+
+def _apply_profile(conn: sqlite3.Connection, profile: ConnectionProfile, read_only: bool) -> None:
+    conn.execute(f"PRAGMA busy_timeout = {int(profile.busy_timeout_ms)}")
+    if not read_only:
+        conn.execute(f"PRAGMA journal_mode = {profile.journal_mode}")
+        conn.execute(f"PRAGMA synchronous = {profile.synchronous}")
+    conn.execute(f"PRAGMA mmap_size = {int(profile.mmap_size)}")
+    conn.execute(f"PRAGMA cache_size = {-int(profile.cache_size_kib)}")
+    conn.execute(f"PRAGMA temp_store = {profile.temp_store}")
+
+
+def connect(db_path: Path, profile: str = DEFAULT_PROFILE) -> sqlite3.Connection:
+    prof = CONNECTION_PROFILES[profile]
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(db_path))
+    conn = sqlite3.connect(str(db_path), cached_statements=prof.cached_statements)
     conn.row_factory = sqlite3.Row
+    _apply_profile(conn, prof, read_only=False)
+    return conn
+
+
+def connect_readonly(db_path: Path, profile: str = DEFAULT_PROFILE) -> sqlite3.Connection:
+    """Read-only connection for query paths; does not create the file or touch the schema."""
+    prof = CONNECTION_PROFILES[profile]
+    conn = sqlite3.connect(
+        f"{db_path.resolve().as_uri()}?mode=ro",
+        uri=True,
+        cached_statements=prof.cached_statements,
+        check_same_thread=False,
+    )
+    conn.row_factory = sqlite3.Row
+    _apply_profile(conn, prof, read_only=True)
+    conn.execute("PRAGMA query_only = ON")
     return conn
 
 
@@ -80,9 +169,106 @@ def init_schema(conn: sqlite3.Connection) -> None:
             computed_ts TEXT NOT NULL,
             PRIMARY KEY (scan_date, symbol, horizon_days, target_date)
         );
+
+        CREATE TABLE IF NOT EXISTS loaded_partitions (
+            kind TEXT NOT NULL,
+            partition_key TEXT NOT NULL,
+            source_path TEXT NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            row_count INTEGER NOT NULL,
+            loaded_ts TEXT NOT NULL,
+            PRIMARY KEY (kind, partition_key)
+        );
         """
     )
     conn.commit()
+    apply_migrations(conn)
+
+
+# Ordered schema migrations applied after the base tables; PRAGMA user_version
+# records how many have run, so append only and never edit a shipped entry.
+MIGRATIONS: List[str] = [
+    # 1: secondary indexes for top-N candidate lookups and outcome joins by scan date
+    """
+    CREATE INDEX IF NOT EXISTS idx_candidates_scan_date_rank ON candidates (scan_date, rank);
+    CREATE INDEX IF NOT EXISTS idx_outcomes_scan_date_target_date ON outcomes (scan_date, target_date);
+    """,
+    # 2: per (scan_date, horizon) watermark of the inputs last used to compute outcomes
+    """
+    CREATE TABLE IF NOT EXISTS outcome_watermarks (
+        scan_date TEXT NOT NULL,
+        horizon_days INTEGER NOT NULL,
+        inputs_digest TEXT NOT NULL,
+        pending_count INTEGER NOT NULL,
+        final INTEGER NOT NULL,
+        computed_ts TEXT NOT NULL,
+        PRIMARY KEY (scan_date, horizon_days)
+    );
+    """,
+    # 3: horizon resolution mode and the last snapshot date a pair's outcomes depend on
+    """
+    ALTER TABLE outcome_watermarks ADD COLUMN horizon_mode TEXT NOT NULL DEFAULT 'calendar';
+    ALTER TABLE outcome_watermarks ADD COLUMN window_end TEXT;
+    """,
+    # 4: outcome counts per (scan_date, horizon, rank bucket), refreshed with each recomputed pair
+    """
+    CREATE TABLE IF NOT EXISTS outcome_rollups (
+        scan_date TEXT NOT NULL,
+        horizon_days INTEGER NOT NULL,
+        rank_bucket TEXT NOT NULL,
+        n INTEGER NOT NULL,
+        ok_count INTEGER NOT NULL,
+        reverted_count INTEGER NOT NULL,
+        missing_followup_count INTEGER NOT NULL,
+        sum_abs_pd_change REAL NOT NULL,
+        PRIMARY KEY (scan_date, horizon_days, rank_bucket)
+    );
+    """,
+    # 5: per-year archive files holding rows moved out of the hot tables
+    """
+    CREATE TABLE IF NOT EXISTS archives (
+        kind TEXT NOT NULL,
+        year INTEGER NOT NULL,
+        path TEXT NOT NULL,
+        row_count INTEGER NOT NULL,
+        archived_ts TEXT NOT NULL,
+        PRIMARY KEY (kind, year)
+    );
+    """,
+    # 6: forward-path metrics per candidate and window length
+    """
+    CREATE TABLE IF NOT EXISTS outcomes_path (
+        scan_date TEXT NOT NULL,
+        symbol TEXT NOT NULL,
+        window_days INTEGER NOT NULL,
+        pd_scan REAL,
+        observations INTEGER NOT NULL,
+        max_favorable_reversion REAL,
+        max_favorable_date TEXT,
+        days_to_first_reversion INTEGER,
+        crossed_zero INTEGER,
+        days_to_zero_cross INTEGER,
+        status TEXT NOT NULL,
+        computed_ts TEXT NOT NULL,
+        PRIMARY KEY (scan_date, symbol, window_days)
+    );
+    """,
+]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return int(conn.execute("PRAGMA user_version").fetchone()[0])
+
+
+def apply_migrations(conn: sqlite3.Connection) -> int:
+    version = schema_version(conn)
+    for number, ddl in enumerate(MIGRATIONS[version:], start=version + 1):
+        conn.executescript(ddl)
+        conn.execute(f"PRAGMA user_version = {number}")
+        conn.commit()
+    return schema_version(conn)
 
 
 def record_run(conn: sqlite3.Connection, mode: str, notes: str) -> int:
@@ -94,10 +280,148 @@ def record_run(conn: sqlite3.Connection, mode: str, notes: str) -> int:
     return int(cur.lastrowid)
 
 
-def upsert_snapshots(conn: sqlite3.Connection, rows: Iterable[Dict[str, Any]], source_path: str) -> None:
+def file_fingerprint(path: Path) -> Dict[str, Any]:
+    st = path.stat()
+    return {"size_bytes": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": None}
+
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def partition_unchanged(conn: sqlite3.Connection, kind: str, partition_key: str, path: Path) -> Tuple[bool, Dict[str, Any]]:
+    """Compare a partition file against its loaded fingerprint.
+
+    Size and mtime matching is taken as unchanged; otherwise the content hash decides.
+    Returns the fingerprint to pass to `record_partition` after a load.
+    """
+    fp = file_fingerprint(path)
+    prev = conn.execute(
+        "SELECT size_bytes, mtime_ns, sha256 FROM loaded_partitions WHERE kind = ? AND partition_key = ?",
+        (kind, partition_key),
+    ).fetchone()
+    if prev is not None and prev["size_bytes"] == fp["size_bytes"] and prev["mtime_ns"] == fp["mtime_ns"]:
+        fp["sha256"] = prev["sha256"]
+        return True, fp
+    fp["sha256"] = _file_sha256(path)
+    if prev is not None and prev["sha256"] == fp["sha256"]:
+        # Touched but identical content: refresh the stat so the next check is cheap.
+        with conn:
+            conn.execute(
+                "UPDATE loaded_partitions SET size_bytes = ?, mtime_ns = ? WHERE kind = ? AND partition_key = ?",
+                (fp["size_bytes"], fp["mtime_ns"], kind, partition_key),
+            )
+        return True, fp
+    return False, fp
+
+
+def record_partition(
+    conn: sqlite3.Connection,
+    kind: str,
+    partition_key: str,
+    path: Path,
+    fingerprint: Dict[str, Any],
+    row_count: int,
+) -> None:
+    with conn:
+        conn.execute(
+            """
+            INSERT INTO loaded_partitions (
+              kind, partition_key, source_path, size_bytes, mtime_ns, sha256, row_count, loaded_ts
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(kind, partition_key) DO UPDATE SET
+              source_path=excluded.source_path,
+              size_bytes=excluded.size_bytes,
+              mtime_ns=excluded.mtime_ns,
+              sha256=excluded.sha256,
+              row_count=excluded.row_count,
+              loaded_ts=excluded.loaded_ts
+            """,
+            (
+                kind,
+                partition_key,
+                str(path),
+                fingerprint["size_bytes"],
+                fingerprint["mtime_ns"],
+                fingerprint["sha256"],
+                row_count,
+                utc_now(),
+            ),
+        )
+
+
+def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+def _existing_hashes(
+    conn: sqlite3.Connection, table: str, date_col: str, keys: List[Tuple[str, str]]
+) -> Dict[Tuple[str, str], str]:
+    """Stored row_hash by (date, symbol) for the given keys, fetched per date partition."""
+    by_date: Dict[str, List[str]] = {}
+    for d, sym in keys:
+        by_date.setdefault(d, []).append(sym)
+    out: Dict[Tuple[str, str], str] = {}
+    for d, symbols in by_date.items():
+        for chunk in _chunks(symbols, _SQL_PARAM_CHUNK):
+            placeholders = ",".join("?" * len(chunk))
+            for r in conn.execute(
+                f"SELECT symbol, row_hash FROM {table} WHERE {date_col} = ? AND symbol IN ({placeholders})",
+                (d, *chunk),
+            ):
+                out[(d, r["symbol"])] = r["row_hash"]
+    return out
+
+
+def _bulk_upsert(
+    conn: sqlite3.Connection,
+    table: str,
+    date_col: str,
+    columns: List[str],
+    payloads: List[Dict[str, Any]],
+) -> Dict[str, int]:
+    """Upsert payload rows with executemany in one transaction; count inserted/updated/unchanged.
+
+    Rows whose row_hash matches the stored one are not rewritten.
+    """
     now = utc_now()
-    for row in rows:
-        payload = {
+    existing = _existing_hashes(conn, table, date_col, [(p[date_col], p["symbol"]) for p in payloads])
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+    changed: List[Tuple[Dict[str, Any], str]] = []
+    for p in payloads:
+        rh = _row_hash(p)
+        prev = existing.get((p[date_col], p["symbol"]))
+        if prev is None:
+            counts["inserted"] += 1
+        elif prev != rh:
+            counts["updated"] += 1
+        else:
+            counts["unchanged"] += 1
+            continue
+        changed.append((p, rh))
+
+    all_cols = [*columns, "row_hash", "first_seen_ts", "last_seen_ts"]
+    update_cols = [c for c in columns if c not in (date_col, "symbol")] + ["row_hash", "last_seen_ts"]
+    sql = (
+        f"INSERT INTO {table} ({', '.join(all_cols)}) VALUES ({', '.join('?' * len(all_cols))}) "
+        f"ON CONFLICT({date_col}, symbol) DO UPDATE SET "
+        + ", ".join(f"{c}=excluded.{c}" for c in update_cols)
+    )
+    params = [(*(p[c] for c in columns), rh, now, now) for p, rh in changed]
+    with conn:
+        for chunk in _chunks(params, _WRITE_CHUNK):
+            conn.executemany(sql, chunk)
+    return counts
+
+
+def upsert_snapshots(conn: sqlite3.Connection, rows: Iterable[Dict[str, Any]], source_path: str) -> Dict[str, int]:
+    payloads = [
+        {
             "date": row.get("date"),
             "symbol": row.get("symbol"),
             "price_close": row.get("price_close"),
@@ -107,44 +431,14 @@ def upsert_snapshots(conn: sqlite3.Connection, rows: Iterable[Dict[str, Any]], s
             "data_quality_flags_json": json.dumps(row.get("data_quality_flags") or []),
             "source_path": source_path,
         }
-        rh = _row_hash(payload)
-        conn.execute(
-            """
-            INSERT INTO snapshots (
-              date, symbol, price_close, nav, premium_discount_pct, dollar_volume,
-              data_quality_flags_json, source_path, row_hash, first_seen_ts, last_seen_ts
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(date, symbol) DO UPDATE SET
-              price_close=excluded.price_close,
-              nav=excluded.nav,
-              premium_discount_pct=excluded.premium_discount_pct,
-              dollar_volume=excluded.dollar_volume,
-              data_quality_flags_json=excluded.data_quality_flags_json,
-              source_path=excluded.source_path,
-              row_hash=excluded.row_hash,
-              last_seen_ts=excluded.last_seen_ts
-            """,
-            (
-                payload["date"],
-                payload["symbol"],
-                payload["price_close"],
-                payload["nav"],
-                payload["premium_discount_pct"],
-                payload["dollar_volume"],
-                payload["data_quality_flags_json"],
-                payload["source_path"],
-                rh,
-                now,
-                now,
-            ),
-        )
-    conn.commit()
+        for row in rows
+    ]
+    return _bulk_upsert(conn, "snapshots", "date", SNAPSHOT_COLUMNS, payloads)
 
 
-def upsert_candidates(conn: sqlite3.Connection, rows: Iterable[Dict[str, Any]], source_path: str) -> None:
-    now = utc_now()
-    for row in rows:
-        payload = {
+def upsert_candidates(conn: sqlite3.Connection, rows: Iterable[Dict[str, Any]], source_path: str) -> Dict[str, int]:
+    payloads = [
+        {
             "scan_date": row.get("date"),
             "symbol": row.get("symbol"),
             "rank": row.get("rank"),
@@ -155,59 +449,30 @@ def upsert_candidates(conn: sqlite3.Connection, rows: Iterable[Dict[str, Any]],
             "risk_flags_json": json.dumps(row.get("risk_flags") or []),
             "source_path": source_path,
         }
-        rh = _row_hash(payload)
-        conn.execute(
-            """
-            INSERT INTO candidates (
-              scan_date, symbol, rank, score, premium_discount_pct_at_scan, dollar_volume_at_scan,
-              rationale, risk_flags_json, source_path, row_hash, first_seen_ts, last_seen_ts
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(scan_date, symbol) DO UPDATE SET
-              rank=excluded.rank,
-              score=excluded.score,
-              premium_discount_pct_at_scan=excluded.premium_discount_pct_at_scan,
-              dollar_volume_at_scan=excluded.dollar_volume_at_scan,
-              rationale=excluded.rationale,
-              risk_flags_json=excluded.risk_flags_json,
-              source_path=excluded.source_path,
-              row_hash=excluded.row_hash,
-              last_seen_ts=excluded.last_seen_ts
-            """,
-            (
-                payload["scan_date"],
-                payload["symbol"],
-                payload["rank"],
-                payload["score"],
-                payload["premium_discount_pct_at_scan"],
-                payload["dollar_volume_at_scan"],
-                payload["rationale"],
-                payload["risk_flags_json"],
-                payload["source_path"],
-                rh,
-                now,
-                now,
-            ),
-        )
-    conn.commit()
+        for row in rows
+    ]
+    return _bulk_upsert(conn, "candidates", "scan_date", CANDIDATE_COLUMNS, payloads)
 
 
-def upsert_outcome(conn: sqlite3.Connection, row: Dict[str, Any]) -> None:
-    conn.execute(
-        """
-        INSERT INTO outcomes (
-          scan_date, symbol, horizon_days, target_date, pd_scan, pd_target, abs_pd_change,
-          reverted_flag, status, reason, source_snapshot_date, computed_ts
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(scan_date, symbol, horizon_days, target_date) DO UPDATE SET
-          pd_scan=excluded.pd_scan,
-          pd_target=excluded.pd_target,
-          abs_pd_change=excluded.abs_pd_change,
-          reverted_flag=excluded.reverted_flag,
-          status=excluded.status,
-          reason=excluded.reason,
-          source_snapshot_date=excluded.source_snapshot_date,
-          computed_ts=excluded.computed_ts
-        """,
+_UPSERT_OUTCOME_SQL = """
+    INSERT INTO outcomes (
+      scan_date, symbol, horizon_days, target_date, pd_scan, pd_target, abs_pd_change,
+      reverted_flag, status, reason, source_snapshot_date, computed_ts
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(scan_date, symbol, horizon_days, target_date) DO UPDATE SET
+      pd_scan=excluded.pd_scan,
+      pd_target=excluded.pd_target,
+      abs_pd_change=excluded.abs_pd_change,
+      reverted_flag=excluded.reverted_flag,
+      status=excluded.status,
+      reason=excluded.reason,
+      source_snapshot_date=excluded.source_snapshot_date,
+      computed_ts=excluded.computed_ts
+"""
+
+
+def upsert_outcomes(conn: sqlite3.Connection, rows: Iterable[Dict[str, Any]]) -> int:
+    params = [
         (
             row["scan_date"],
             row["symbol"],
@@ -221,9 +486,48 @@ def upsert_outcome(conn: sqlite3.Connection, row: Dict[str, Any]) -> None:
             row.get("reason"),
             row.get("source_snapshot_date"),
             row["computed_ts"],
-        ),
+        )
+        for row in rows
+    ]
+    with conn:
+        for chunk in _chunks(params, _WRITE_CHUNK):
+            conn.executemany(_UPSERT_OUTCOME_SQL, chunk)
+    return len(params)
+
+
+PATH_OUTCOME_COLUMNS = [
+    "scan_date",
+    "symbol",
+    "window_days",
+    "pd_scan",
+    "observations",
+    "max_favorable_reversion",
+    "max_favorable_date",
+    "days_to_first_reversion",
+    "crossed_zero",
+    "days_to_zero_cross",
+    "status",
+    "computed_ts",
+]
+
+
+def upsert_path_outcomes(conn: sqlite3.Connection, rows: Iterable[Dict[str, Any]]) -> int:
+    keys = ("scan_date", "symbol", "window_days")
+    sql = (
+        f"INSERT INTO outcomes_path ({', '.join(PATH_OUTCOME_COLUMNS)}) "
+        f"VALUES ({', '.join('?' * len(PATH_OUTCOME_COLUMNS))}) "
+        f"ON CONFLICT({', '.join(keys)}) DO UPDATE SET "
+        + ", ".join(f"{c}=excluded.{c}" for c in PATH_OUTCOME_COLUMNS if c not in keys)
     )
-    conn.commit()
+    params = [tuple(row.get(c) for c in PATH_OUTCOME_COLUMNS) for row in rows]
+    with conn:
+        for chunk in _chunks(params, _WRITE_CHUNK):
+            conn.executemany(sql, chunk)
+    return len(params)
+
+
+def upsert_outcome(conn: sqlite3.Connection, row: Dict[str, Any]) -> None:
+    upsert_outcomes(conn, [row])
 
 
 def fetch_snapshot_pd(conn: sqlite3.Connection, date: str, symbol: str) -> Optional[float]:
@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+import time
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Wall-clock milliseconds a `python -m navscan ...` invocation may add on top of a bare
+# `python -c pass` (best of several runs). NAVSCAN_STARTUP_BUDGET_SCALE loosens them on slow hosts.
+STARTUP_BUDGET_MS = {
+    ("--help",): 40,
+    ("run", "--help"): 120,
+    ("track", "--help"): 200,
+}
+
+_LOADED_MODULES = """
+import sys
+from navscan.cli import main
+try:
+    main(sys.argv[1:])
+except SystemExit:
+    pass
+print(",".join(sorted(m for m in sys.modules if m.startswith("navscan"))), file=sys.stderr)
+"""
+
+
+def _best_ms(args, runs=5):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=REPO_ROOT, capture_output=True, check=True)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def _loaded_modules(*argv):
+    proc = subprocess.run(
+        [sys.executable, "-c", _LOADED_MODULES, *argv], cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    return set(proc.stderr.strip().splitlines()[-1].split(","))
+
+
+class TestCliStartup(unittest.TestCase):
+    def test_help_imports_only_the_chosen_command(self):
+        self.assertEqual(_loaded_modules("--help"), {"navscan", "navscan.cli"})
+        loaded = _loaded_modules("run", "--help")
+        self.assertIn("navscan.commands.run", loaded)
+        self.assertFalse([m for m in loaded if m.startswith(("navscan.stages", "navscan.signals", "navscan.tracking"))])
+        loaded = _loaded_modules("track", "--help")
+        self.assertNotIn("navscan.tracking.outcomes", loaded)
+        self.assertFalse([m for m in loaded if m.startswith("navscan.stages")])
+
+    def test_startup_budget(self):
+        scale = float(os.environ.get("NAVSCAN_STARTUP_BUDGET_SCALE", "1"))
+        bare = _best_ms(["-c", "pass"])
+        for argv, budget in STARTUP_BUDGET_MS.items():
+            overhead = _best_ms(["-m", "navscan", *argv]) - bare
+            self.assertLess(overhead, budget * scale, msg=f"navscan {' '.join(argv)} took {overhead:.0f}ms over bare python")
+
+
+if __name__ == "__main__":
+    unittest.main()
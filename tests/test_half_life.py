@@ -1,6 +1,14 @@
+import json
+import tempfile
 import unittest
+from pathlib import Path
 
 from navscan.signals.mean_reversion import estimate_half_life_days
+from navscan.signals.memo import HalfLifeMemo, half_life_config_hash, record_fits
+from navscan.signals.plan import compile_scoring_plan
+from navscan.signals.scan import fit_half_lives
+
+STAGE3_CFG = json.loads((Path(__file__).resolve().parents[1] / "configs" / "stage3_signals.json").read_text())
 
 
 class TestHalfLife(unittest.TestCase):
@@ -31,6 +39,37 @@ class TestHalfLife(unittest.TestCase):
         self.assertGreater(out["half_life_days"], 0.0)
 
 
+class TestHalfLifeMemo(unittest.TestCase):
+    def _write_history(self, path: Path, last_pd: float) -> None:
+        pd = 10.0
+        with path.open("w", encoding="utf-8") as f:
+            for day in range(1, 31):
+                pd = last_pd if day == 30 else pd * 0.92
+                f.write(json.dumps({"date": f"2026-01-{day:02d}", "symbol": "MEMO", "premium_discount_pct": pd}) + "\n")
+
+    def test_memo_reuses_unchanged_history_only(self):
+        plan = compile_scoring_plan(STAGE3_CFG)
+        config_hash = half_life_config_hash(plan.half_life_min_points, plan.max_half_life_days)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            history_path = Path(tmpdir) / "all_dates.ndjson"
+            memo_path = Path(tmpdir) / "memo.sqlite"
+            self._write_history(history_path, last_pd=1.0)
+
+            first = fit_half_lives(plan, history_path, "2026-01-30", ["MEMO"], memo_path)
+            self.assertFalse(first["MEMO"].cached)
+            memo = HalfLifeMemo(memo_path)
+            record_fits(memo, "2026-01-30", config_hash, first)
+            memo.close()
+
+            second = fit_half_lives(plan, history_path, "2026-01-30", ["MEMO"], memo_path)
+            self.assertTrue(second["MEMO"].cached)
+            self.assertEqual(second["MEMO"].half_life_days, first["MEMO"].half_life_days)
+
+            self._write_history(history_path, last_pd=1.5)
+            third = fit_half_lives(plan, history_path, "2026-01-30", ["MEMO"], memo_path)
+            self.assertFalse(third["MEMO"].cached)
+
+
 if __name__ == "__main__":
     unittest.main()
 
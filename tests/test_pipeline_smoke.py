@@ -1,8 +1,26 @@
 import json
+import logging
+import pstats
+import sqlite3
 import subprocess
 import tempfile
 import unittest
+from datetime import datetime
 from pathlib import Path
+from unittest import mock
+
+from navscan.bench import suite as bench
+from navscan.bench.synthetic import generate_raw
+from navscan.metrics import write_prometheus_textfile
+from navscan.profiling import StageProfiler
+from navscan.stages.backfill import BackfillSettings, run_backfill
+from navscan.stages.candidates import CandidateOptions, build_candidates
+from navscan.stages.daemon import ScanDaemon, ServeSettings
+from navscan.stages.ingest import ingest_dates
+from navscan.stages.report import read_top_rows
+from navscan.stages.silver import build_silver
+from navscan.stages.tracking import update_warehouse
+from navscan.stages.runner import RunProfile, RunSettings, run_pipeline, run_profiles
 
 
 def write_ndjson(path: Path, rows: list[dict]) -> None:
@@ -12,6 +30,48 @@ def write_ndjson(path: Path, rows: list[dict]) -> None:
             f.write(json.dumps(r) + "\n")
 
 
+def _fake_fetchers(drift: float = 0.0) -> dict:
+    closes = {"AAA": 9.0, "BBB": 10.0, "CCC": 11.5}
+
+    def fake(kind):
+        def fetch(symbols, date):
+            rows = []
+            for sym in symbols:
+                raw = {
+                    "price_volume": {"Close": closes[sym] + drift * int(date[-2:]), "Volume": 500_000, "Date": date},
+                    "nav": {"NAVData": 10.0, "DataDate": date},
+                    "events": [],
+                }.get(kind)
+                status = "skipped" if raw is None else "ok"
+                rows.append({"symbol": sym, "source": "fake", "status": status, "raw": raw})
+            return rows
+
+        return fetch
+
+    return {
+        "fetch_price_volume_for_date": fake("price_volume"),
+        "fetch_nav_for_date": fake("nav"),
+        "fetch_events_for_date": fake("events"),
+        "fetch_metadata": fake("metadata"),
+    }
+
+
+def _run_settings(tmpdir: Path, date_str: str):
+    repo_root = Path(__file__).resolve().parents[1]
+    universe = tmpdir / "universe.yaml"
+    universe.write_text("symbols:\n  - AAA\n  - BBB\n  - CCC\n", encoding="utf-8")
+    settings = RunSettings(
+        date=date_str,
+        raw_root=tmpdir / "raw",
+        silver_root=tmpdir / "silver",
+        signals_root=tmpdir / "signals",
+        reports_root=tmpdir / "reports",
+        stage3_config=repo_root / "configs" / "stage3_signals.json",
+        top_n=5,
+    )
+    return settings, universe
+
+
 class TestPipelineSmoke(unittest.TestCase):
     def test_stage3_build_candidates_from_synthetic_silver(self):
         repo_root = Path(__file__).resolve().parents[1]
@@ -81,6 +141,440 @@ class TestPipelineSmoke(unittest.TestCase):
             self.assertIn("rationale", first)
             self.assertIn("risk_flags", first)
 
+    def test_stage3_half_life_skipped_for_non_candidates(self):
+        repo_root = Path(__file__).resolve().parents[1]
+        date_str = "2026-02-20"
+
+        all_rows = []
+        for i in range(25):
+            d = f"2026-01-{i + 1:02d}"
+            for symbol, pd in (("HOTCEF", 10.0 * (0.9**i)), ("QUIETCEF", 0.5 * (0.9**i))):
+                all_rows.append(
+                    {
+                        "date": d,
+                        "symbol": symbol,
+                        "premium_discount_pct": pd,
+                        "dollar_volume": 5_000_000.0,
+                        "distribution_event_flag": False,
+                        "nav_staleness_flag": False,
+                        "data_quality_flags": [],
+                        "pd_zscore_20d": None,
+                    }
+                )
+        day_rows = [
+            {**all_rows[-2], "date": date_str, "premium_discount_pct": 9.0},
+            {**all_rows[-1], "date": date_str, "premium_discount_pct": 0.4},
+        ]
+        all_rows.extend(day_rows)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            silver_root = tmpdir / "silver"
+            write_ndjson(silver_root / "all_dates.ndjson", all_rows)
+            write_ndjson(silver_root / f"date={date_str}" / "snapshot.ndjson", day_rows)
+
+            reasons = {}
+            scored_text = {}
+            for label, extra in (
+                ("candidates", ["--half-life-mode", "candidates"]),
+                ("full", ["--half-life-mode", "full"]),
+                ("full_sharded", ["--half-life-mode", "full", "--workers", "2"]),
+            ):
+                output_root = tmpdir / label
+                cmd = [
+                    "python3",
+                    "scripts/stage3_build_candidates.py",
+                    "--silver-root",
+                    str(silver_root),
+                    "--output-root",
+                    str(output_root),
+                    "--date",
+                    date_str,
+                    *extra,
+                ]
+                proc = subprocess.run(cmd, cwd=repo_root, text=True, capture_output=True)
+                self.assertEqual(proc.returncode, 0, msg=f"stderr={proc.stderr}")
+                scored_path = output_root / f"date={date_str}" / "scored_universe.ndjson"
+                scored_text[label] = scored_path.read_text(encoding="utf-8")
+                scored = [json.loads(x) for x in scored_text[label].splitlines() if x.strip()]
+                reasons[label] = {r["symbol"]: r["half_life_reason"] for r in scored}
+
+            self.assertEqual(scored_text["full"], scored_text["full_sharded"])
+            self.assertEqual(reasons["candidates"]["QUIETCEF"], "skipped_not_candidate")
+            self.assertEqual(reasons["candidates"]["HOTCEF"], reasons["full"]["HOTCEF"])
+            self.assertNotEqual(reasons["full"]["QUIETCEF"], "skipped_not_candidate")
+
+    def test_in_process_run_matches_stage3_script(self):
+        repo_root = Path(__file__).resolve().parents[1]
+        date_str = "2026-02-20"
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            settings, universe = _run_settings(tmpdir, date_str)
+            with mock.patch.multiple("navscan.stages.ingest", **_fake_fetchers()):
+                result = run_pipeline(settings, universe, logging.getLogger("navscan.test"))
+
+            self.assertEqual([r["symbol"] for r in result.top_rows], ["CCC", "AAA"])
+            self.assertEqual(result.candidate_count, 2)
+            self.assertTrue(result.csv_path.exists())
+            self.assertTrue(result.md_path.exists())
+
+            proc = subprocess.run(
+                [
+                    "python3",
+                    "scripts/stage3_build_candidates.py",
+                    "--silver-root",
+                    str(settings.silver_root),
+                    "--output-root",
+                    str(tmpdir / "script"),
+                    "--date",
+                    date_str,
+                    "--top-n",
+                    "5",
+                ],
+                cwd=repo_root,
+                text=True,
+                capture_output=True,
+            )
+            self.assertEqual(proc.returncode, 0, msg=f"stderr={proc.stderr}")
+            for name in ("scored_universe.ndjson", "candidates_ranked.ndjson", "candidates_top.ndjson"):
+                self.assertEqual(
+                    (settings.signals_root / f"date={date_str}" / name).read_text(encoding="utf-8"),
+                    (tmpdir / "script" / f"date={date_str}" / name).read_text(encoding="utf-8"),
+                    name,
+                )
+
+    def test_read_top_rows_falls_back_to_ranked_file_for_larger_requests(self):
+        date_str = "2026-02-20"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            settings, universe = _run_settings(tmpdir, date_str)
+            settings.top_n = 1
+            with mock.patch.multiple("navscan.stages.ingest", **_fake_fetchers()):
+                run_pipeline(settings, universe, logging.getLogger("navscan.test"))
+            self.assertEqual([r["symbol"] for r in read_top_rows(settings.signals_root, date_str, 1)], ["CCC"])
+            self.assertEqual([r["symbol"] for r in read_top_rows(settings.signals_root, date_str, 5)], ["CCC", "AAA"])
+
+    def test_stage3_removes_candidate_files_it_no_longer_writes(self):
+        date_str = "2026-02-20"
+        logger = logging.getLogger("navscan.test")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            settings, universe = _run_settings(tmpdir, date_str)
+            with mock.patch.multiple("navscan.stages.ingest", **_fake_fetchers()):
+                run_pipeline(settings, universe, logger)
+            out_dir = settings.signals_root / f"date={date_str}"
+            self.assertTrue((out_dir / "candidates_ranked.ndjson").exists())
+
+            opts = CandidateOptions(
+                silver_root=settings.silver_root,
+                output_root=settings.signals_root,
+                config_path=settings.stage3_config,
+                date=date_str,
+                top_n=1,
+                write_full_ranked=False,
+            )
+            build_candidates(opts, logger)
+            self.assertFalse((out_dir / "candidates_ranked.ndjson").exists())
+            self.assertEqual(len((out_dir / "candidates_top.ndjson").read_text().splitlines()), 1)
+            summary = update_warehouse(tmpdir / "wh.sqlite", settings.signals_root, settings.silver_root, [1], logger)
+            self.assertEqual(summary["candidate_rows"]["inserted"], 1)
+
+            opts.top_n, opts.write_full_ranked = 0, True
+            build_candidates(opts, logger)
+            self.assertFalse((out_dir / "candidates_top.ndjson").exists())
+            self.assertTrue((out_dir / "candidates_ranked.ndjson").exists())
+
+    def test_run_skips_stages_with_unchanged_fingerprints(self):
+        date_str = "2026-02-20"
+        logger = logging.getLogger("navscan.test")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            settings, universe = _run_settings(tmpdir, date_str)
+            fetchers = _fake_fetchers()
+            with mock.patch.multiple("navscan.stages.ingest", **fetchers):
+                first = run_pipeline(settings, universe, logger)
+                csv_text = first.csv_path.read_text(encoding="utf-8")
+                second = run_pipeline(settings, universe, logger)
+                self.assertEqual(
+                    second.stages, {"stage1": "cached", "stage2": "cached", "stage3": "cached", "stage4": "ran"}
+                )
+                self.assertEqual(second.top_rows, first.top_rows)
+                self.assertEqual(second.csv_path.read_text(encoding="utf-8"), csv_text)
+
+                # A Stage 3 config change only reruns Stage 3.
+                cfg = json.loads(settings.stage3_config.read_text(encoding="utf-8"))
+                cfg["liquidity"]["min_dollar_volume"] = 1.0
+                settings.stage3_config = tmpdir / "stage3.json"
+                settings.stage3_config.write_text(json.dumps(cfg), encoding="utf-8")
+                third = run_pipeline(settings, universe, logger)
+                self.assertEqual([third.stages[s] for s in ("stage1", "stage2", "stage3")], ["cached", "cached", "ran"])
+
+                forced = run_pipeline(settings, universe, logger, force=True)
+                self.assertEqual(set(forced.stages.values()), {"ran"})
+
+    def test_run_refetches_after_partial_fetch_failure(self):
+        date_str = "2026-02-20"
+        logger = logging.getLogger("navscan.test")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            settings, universe = _run_settings(tmpdir, date_str)
+            fetchers = _fake_fetchers()
+            ok_nav = fetchers["fetch_nav_for_date"]
+
+            def failing_nav(symbols, date):
+                rows = ok_nav(symbols, date)
+                return [{**r, "status": "error", "raw": None} if r["symbol"] == "BBB" else r for r in rows]
+
+            with mock.patch.multiple("navscan.stages.ingest", **{**fetchers, "fetch_nav_for_date": failing_nav}):
+                run_pipeline(settings, universe, logger)
+            with mock.patch.multiple("navscan.stages.ingest", **fetchers):
+                retry = run_pipeline(settings, universe, logger)
+                self.assertEqual(retry.stages["stage1"], "ran")
+                self.assertEqual(run_pipeline(settings, universe, logger).stages["stage1"], "cached")
+
+    def test_run_summary_records_stage_spans_and_prometheus_text(self):
+        date_str = "2026-02-20"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            settings, universe = _run_settings(tmpdir, date_str)
+            with mock.patch.multiple("navscan.stages.ingest", **_fake_fetchers()):
+                result = run_pipeline(settings, universe, logging.getLogger("navscan.test"))
+
+            summary = json.loads((settings.reports_root / f"date={date_str}" / "run_summary.json").read_text())
+            self.assertEqual(summary["metrics"], result.metrics)
+            spans = summary["metrics"]["spans"]
+            for name in ("stage1", "stage1.fetch.nav", "stage2", "stage2.join", "stage3", "stage3.score", "stage4"):
+                self.assertEqual(spans[name]["calls"], 1, name)
+            counters = summary["metrics"]["counters"]
+            self.assertEqual(counters["stage1.rows"], 12)
+            self.assertEqual(counters["stage3.rows"], 3)
+
+            out = tmpdir / "textfile" / "navscan.prom"
+            write_prometheus_textfile(out, result.metrics, {"date": date_str})
+            text = out.read_text(encoding="utf-8")
+            self.assertIn(f'navscan_span_calls{{span="stage3",date="{date_str}"}} 1', text)
+            self.assertIn(f'navscan_count{{name="stage1.rows",date="{date_str}"}} 12', text)
+            self.assertEqual(list(out.parent.iterdir()), [out])
+
+    def test_profiled_run_writes_per_stage_profiles(self):
+        date_str = "2026-02-20"
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            settings, universe = _run_settings(tmpdir, date_str)
+            profiler = StageProfiler(settings.reports_root / f"date={date_str}" / "profile")
+            with mock.patch.multiple("navscan.stages.ingest", **_fake_fetchers()):
+                result = run_pipeline(settings, universe, logging.getLogger("navscan.test"), profiler=profiler)
+            self.assertEqual(result.candidate_count, 2)
+
+            summary = json.loads((settings.reports_root / f"date={date_str}" / "run_summary.json").read_text())
+            profile = summary["profile"]
+            self.assertGreater(profile["peak_rss_bytes"], 0)
+            self.assertEqual(sorted(profile["stages"]), ["stage1", "stage2", "stage3", "stage4"])
+            for name, stage in profile["stages"].items():
+                self.assertGreater(stage["peak_traced_bytes"], 0, name)
+                self.assertTrue(stage["top_allocations"], name)
+                for path in stage["files"].values():
+                    self.assertTrue(Path(path).exists(), path)
+            self.assertGreater(pstats.Stats(profile["stages"]["stage3"]["files"]["pstats"]).total_calls, 0)
+            collapsed = Path(profile["stages"]["stage3"]["files"]["collapsed"]).read_text().splitlines()
+            self.assertTrue(any(line.startswith("build_candidates (candidates.py:") for line in collapsed))
+            for line in collapsed:
+                stack, micros = line.rsplit(" ", 1)
+                self.assertGreater(int(micros), 0)
+            self.assertTrue((profiler.out_dir / "profile_summary.json").exists())
+
+    def test_profiles_share_ingestion_and_match_standalone_runs(self):
+        date_str = "2026-02-20"
+        logger = logging.getLogger("navscan.test")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            full, full_universe = _run_settings(tmpdir, date_str)
+            subset_universe = tmpdir / "subset.yaml"
+            subset_universe.write_text("symbols:\n  - CCC\n  - BBB\n", encoding="utf-8")
+            subset = RunSettings(**{**vars(full), "signals_root": tmpdir / "s2", "reports_root": tmpdir / "r2"})
+            profiles = [RunProfile("full", full_universe, full), RunProfile("subset", subset_universe, subset)]
+
+            fetchers = _fake_fetchers()
+            nav = mock.Mock(side_effect=fetchers["fetch_nav_for_date"])
+            with mock.patch.multiple("navscan.stages.ingest", **{**fetchers, "fetch_nav_for_date": nav}):
+                results = run_profiles(profiles, logger)
+            self.assertEqual(nav.call_count, 1)
+            self.assertEqual(sorted(nav.call_args.args[0]), ["AAA", "BBB", "CCC"])
+            self.assertEqual([r["symbol"] for r in results["subset"].top_rows], ["CCC"])
+
+            for p in profiles:
+                (tmpdir / p.name).mkdir()
+                alone, _ = _run_settings(tmpdir / p.name, date_str)
+                with mock.patch.multiple("navscan.stages.ingest", **_fake_fetchers()):
+                    expected = run_pipeline(alone, p.universe_path, logger)
+                got = results[p.name]
+                self.assertEqual(got.top_rows, expected.top_rows, p.name)
+                self.assertEqual(got.csv_path.read_text(), expected.csv_path.read_text(), p.name)
+                self.assertEqual(got.md_path.read_text(), expected.md_path.read_text(), p.name)
+                for name in ("scored_universe.ndjson", "candidates_ranked.ndjson"):
+                    self.assertEqual(
+                        (p.settings.signals_root / f"date={date_str}" / name).read_text(),
+                        (alone.signals_root / f"date={date_str}" / name).read_text(),
+                        f"{p.name}/{name}",
+                    )
+                summary = json.loads((p.settings.reports_root / f"date={date_str}" / "run_summary.json").read_text())
+                self.assertEqual(summary["profile_name"], p.name)
+                self.assertEqual(summary["shared_symbols"], 3)
+
+            clash = RunProfile("clash", subset_universe, RunSettings(**{**vars(subset), "reports_root": tmpdir / "r3"}))
+            with self.assertRaises(ValueError):
+                run_profiles([profiles[0], profiles[1], clash], logger)
+
+    def test_bench_generator_is_deterministic_and_compare_flags_regressions(self):
+        repo_root = Path(__file__).resolve().parents[1]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            first = generate_raw(tmpdir / "a", 8, 25, seed=3)
+            generate_raw(tmpdir / "b", 8, 25, seed=3)
+            files = sorted(p.relative_to(tmpdir / "a") for p in (tmpdir / "a").rglob("*.ndjson"))
+            self.assertEqual(len(files), 4 * 25)
+            for rel in files:
+                self.assertEqual((tmpdir / "a" / rel).read_bytes(), (tmpdir / "b" / rel).read_bytes(), str(rel))
+            self.assertEqual(len(first.symbols), 8)
+            self.assertEqual(first.dates[0], "2024-01-02")
+
+            config = repo_root / "configs" / "stage3_signals.json"
+            results = bench.run_suite(["tiny"], config, repeat=1, workdir=tmpdir / "w")
+            tiny = results["sizes"]["tiny"]
+            self.assertEqual(tiny["silver_rows"], 10 * 30)
+            self.assertEqual(sorted(tiny["cases"]), sorted(bench.CASES))
+            self.assertTrue(all(v >= 0 for v in tiny["cases"].values()))
+            # Rerunning in a kept workdir still loads and computes into a fresh warehouse.
+            rerun = bench.run_suite(["tiny"], config, repeat=1, workdir=tmpdir / "w")["sizes"]["tiny"]["cases"]
+            self.assertGreater(rerun["warehouse_load"], 0)
+            self.assertGreater(rerun["outcomes"], 0)
+
+        baseline = {"calibration_s": 1.0, "sizes": {"tiny": {"cases": {"stage3_scoring": 0.10, "outcomes": 0.001}}}}
+        current = {"calibration_s": 1.0, "sizes": {"tiny": {"cases": {"stage3_scoring": 0.20, "outcomes": 0.002}}}}
+        flags = {c["case"]: c["regressed"] for c in bench.compare(current, baseline, threshold=0.25)}
+        # outcomes doubled too, but by less than the absolute noise floor.
+        self.assertEqual(flags, {"stage3_scoring": True, "outcomes": False})
+        # A host twice as slow on the calibration workload explains the whole slowdown.
+        current["calibration_s"] = 2.0
+        self.assertFalse(any(c["regressed"] for c in bench.compare(current, baseline, threshold=0.25)))
+
+    def test_backfill_matrix_and_single_warehouse_update(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            run_settings, _ = _run_settings(tmpdir, "2026-02-20")
+            settings = BackfillSettings(
+                start="2026-02-13",
+                end="2026-02-18",
+                raw_root=run_settings.raw_root,
+                silver_root=run_settings.silver_root,
+                signals_root=run_settings.signals_root,
+                stage3_config=run_settings.stage3_config,
+                db_path=tmpdir / "wh.sqlite",
+                fetch_workers=2,
+                score_workers=2,
+            )
+            with mock.patch.multiple("navscan.stages.ingest", **_fake_fetchers()):
+                out = run_backfill(settings, ["AAA", "BBB", "CCC"], logging.getLogger("navscan.test"))
+
+            self.assertEqual(out["dates"], ["2026-02-13", "2026-02-16", "2026-02-17", "2026-02-18"])
+            for row in out["matrix"].values():
+                self.assertEqual(row, {"stage1": "ok", "stage2": "ok", "stage3": "ok"})
+            self.assertEqual(out["errors"], {})
+            self.assertEqual(out["stage5"]["scan_dates_considered"], out["dates"])
+            conn = sqlite3.connect(settings.db_path)
+            self.assertEqual(conn.execute("SELECT COUNT(DISTINCT scan_date) FROM candidates").fetchone()[0], 4)
+            conn.close()
+
+    def test_serve_extends_warm_panel_like_a_cold_rebuild(self):
+        logger = logging.getLogger("navscan.test")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            run_settings, universe = _run_settings(tmpdir, "2026-02-18")
+            settings = ServeSettings(
+                raw_root=run_settings.raw_root,
+                silver_root=run_settings.silver_root,
+                signals_root=run_settings.signals_root,
+                reports_root=run_settings.reports_root,
+                stage3_config=run_settings.stage3_config,
+                db_path=tmpdir / "wh.sqlite",
+                top_n=5,
+                zscore_window=2,
+            )
+            symbols = ["AAA", "BBB", "CCC"]
+            with mock.patch.multiple("navscan.stages.ingest", **_fake_fetchers(drift=0.25)):
+                ingest_dates(["2026-02-16", "2026-02-17"], symbols, settings.raw_root, logger)
+                daemon = ScanDaemon(settings, universe, logger)
+                daemon.start()
+                first = daemon.tick(datetime(2026, 2, 17, 8, 0))
+                ingest_dates(["2026-02-18"], symbols, settings.raw_root, logger)
+                second = daemon.tick(datetime(2026, 2, 18, 8, 0))
+                daemon.close()
+
+            self.assertEqual([r["date"] for r in first], ["2026-02-16", "2026-02-17"])
+            self.assertEqual([r["date"] for r in second], ["2026-02-18"])
+            self.assertNotIn("error", second[0])
+
+            cold_root = tmpdir / "cold_silver"
+            build_silver(settings.raw_root, cold_root, symbols, [], 2, logger)
+            warm_all = (settings.silver_root / "all_dates.ndjson").read_text(encoding="utf-8")
+            self.assertEqual(warm_all.count('"pd_zscore_20d": null'), 3)
+            self.assertEqual(warm_all, (cold_root / "all_dates.ndjson").read_text(encoding="utf-8"))
+
+            opts = CandidateOptions(
+                silver_root=cold_root,
+                output_root=tmpdir / "cold_signals",
+                config_path=settings.stage3_config,
+                date="2026-02-18",
+                top_n=5,
+                no_memo=True,
+            )
+            cold = build_candidates(opts, logger)
+            warm_ranked = settings.signals_root / "date=2026-02-18" / "candidates_ranked.ndjson"
+            self.assertEqual(
+                [(r["symbol"], r["score"], r["half_life_days"]) for r in cold.ranked_rows],
+                [(r["symbol"], r["score"], r["half_life_days"]) for r in map(json.loads, warm_ranked.read_text(encoding="utf-8").splitlines())],
+            )
+            conn = sqlite3.connect(settings.db_path)
+            loaded = conn.execute("SELECT COUNT(*) FROM loaded_partitions WHERE kind = 'candidates'").fetchone()[0]
+            self.assertEqual(loaded, 3)
+            conn.close()
+
+    def test_serve_fills_earlier_scan_outcomes_when_follow_up_arrives(self):
+        logger = logging.getLogger("navscan.test")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            run_settings, universe = _run_settings(tmpdir, "2026-02-19")
+            settings = ServeSettings(
+                raw_root=run_settings.raw_root,
+                silver_root=run_settings.silver_root,
+                signals_root=run_settings.signals_root,
+                reports_root=run_settings.reports_root,
+                stage3_config=run_settings.stage3_config,
+                db_path=tmpdir / "wh.sqlite",
+                top_n=5,
+            )
+            symbols = ["AAA", "BBB", "CCC"]
+            with mock.patch.multiple("navscan.stages.ingest", **_fake_fetchers()):
+                daemon = ScanDaemon(settings, universe, logger)
+                daemon.start()
+                ingest_dates(["2026-02-19"], symbols, settings.raw_root, logger)
+                first = daemon.tick(datetime(2026, 2, 19, 8, 0))
+                ingest_dates(["2026-02-20"], symbols, settings.raw_root, logger)
+                second = daemon.tick(datetime(2026, 2, 20, 8, 0))
+                daemon.close()
+
+            self.assertEqual([r["date"] for r in first + second], ["2026-02-19", "2026-02-20"])
+            conn = sqlite3.connect(settings.db_path)
+            statuses = {
+                r[0]
+                for r in conn.execute(
+                    "SELECT status FROM outcomes WHERE scan_date = '2026-02-19' AND horizon_days = 1"
+                )
+            }
+            conn.close()
+            self.assertEqual(statuses, {"ok"})
+
 
 if __name__ == "__main__":
     unittest.main()
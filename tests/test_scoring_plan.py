@@ -0,0 +1,87 @@
+import json
+import unittest
+from pathlib import Path
+
+from navscan.signals.extreme import detect_extreme
+from navscan.signals.filters import event_filter, liquidity_filter
+from navscan.signals.plan import columns_from_rows, compile_scoring_plan
+from navscan.signals.rank import compute_score, select_top_n
+from navscan.signals.risk_flags import build_risk_flags
+
+CFG = json.loads((Path(__file__).resolve().parents[1] / "configs" / "stage3_signals.json").read_text())
+
+
+def _rows():
+    base = {
+        "nav_staleness_flag": False,
+        "distribution_event_flag": False,
+        "data_quality_flags": [],
+    }
+    return [
+        {**base, "symbol": "ZHIGH", "pd_zscore_20d": -2.5, "premium_discount_pct": -3.0, "dollar_volume": 4e6},
+        {**base, "symbol": "PDONLY", "pd_zscore_20d": None, "premium_discount_pct": 7.5, "dollar_volume": 3e7},
+        {**base, "symbol": "THIN", "pd_zscore_20d": None, "premium_discount_pct": -6.0, "dollar_volume": 1e5},
+        {**base, "symbol": "NOVOL", "pd_zscore_20d": 1.0, "premium_discount_pct": 1.0, "dollar_volume": None},
+        {**base, "symbol": "EMPTY", "pd_zscore_20d": None, "premium_discount_pct": None, "dollar_volume": 5e6},
+        {
+            **base,
+            "symbol": "EVENT",
+            "pd_zscore_20d": 3.0,
+            "premium_discount_pct": 9.0,
+            "dollar_volume": 5e6,
+            "distribution_event_flag": True,
+            "nav_staleness_flag": True,
+            "data_quality_flags": ["insufficient_history_20d"],
+        },
+    ]
+
+
+class TestScoringPlan(unittest.TestCase):
+    def test_matches_row_rules(self):
+        rows = _rows()
+        half_lives = [4.0, None, 12.5, None, None, 0.5]
+        reasons = ["ok" if hl is not None else "insufficient_history" for hl in half_lives]
+
+        plan = compile_scoring_plan(CFG)
+        cols = columns_from_rows(rows)
+        result = plan.score(cols, plan.gate(cols), half_lives, reasons)
+
+        for i, row in enumerate(rows):
+            legacy = dict(row, half_life_days=half_lives[i])
+            is_extreme, extreme_component, extreme_reason = detect_extreme(legacy, CFG["extreme"])
+            liq_ok, liq_reason = liquidity_filter(legacy, CFG["liquidity"])
+            evt_ok, evt_reason = event_filter(legacy, CFG["event_filter"])
+            legacy["_liquidity_reference_dv"] = float(CFG["liquidity"]["reference_dollar_volume"])
+            legacy["risk_flags"] = build_risk_flags(legacy, str(CFG["event_filter"]["event_data_status"]))
+            parts = compute_score(legacy, CFG["score"], extreme_component)
+
+            out = result.annotate(i, dict(row))
+            self.assertEqual(out["extreme_triggered"], is_extreme, row["symbol"])
+            self.assertEqual(out["extreme_reason"], extreme_reason)
+            self.assertEqual(out["liquidity_pass"], liq_ok)
+            self.assertEqual(out["liquidity_reason"], liq_reason)
+            self.assertEqual(out["event_pass"], evt_ok)
+            self.assertEqual(out["event_reason"], evt_reason)
+            self.assertEqual(out["risk_flags"], legacy["risk_flags"])
+            for key, value in parts.items():
+                self.assertEqual(out[key], value, f"{row['symbol']}:{key}")
+
+    def test_ranked_candidates_order(self):
+        rows = _rows()
+        plan = compile_scoring_plan(CFG)
+        cols = columns_from_rows(rows)
+        result = plan.score(cols, plan.gate(cols), [None] * len(rows), ["insufficient_history"] * len(rows))
+        ranked = [cols.symbol[i] for i in result.ranked_candidates()]
+        self.assertEqual(ranked, ["ZHIGH", "PDONLY"])
+
+    def test_select_top_n_matches_full_sort_with_ties(self):
+        scores = [1.0, 3.0, 2.0, 3.0, 0.5, 2.0]
+        symbols = ["F", "D", "C", "B", "A", "E"]
+        full = select_top_n(range(len(scores)), scores, symbols)
+        self.assertEqual([symbols[i] for i in full], ["B", "D", "C", "E", "F", "A"])
+        for n in range(len(scores) + 2):
+            self.assertEqual(select_top_n(range(len(scores)), scores, symbols, n), full[:n])
+
+
+if __name__ == "__main__":
+    unittest.main()
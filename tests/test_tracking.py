@@ -0,0 +1,458 @@
+import json
+import logging
+import sqlite3
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+from unittest import mock
+
+from navscan.stages.tracking import update_warehouse
+from navscan.tracking.api import QueryService, ReadOnlyPool, ResultCache, make_server
+from navscan.tracking.archive import archive_snapshot_year, archived_snapshot_years, snapshot_relation
+from navscan.tracking.asof import SnapshotAsOfIndex
+from navscan.tracking.outcomes import (
+    compute_and_store_outcomes,
+    compute_outcomes_set_based,
+    update_outcomes_incremental,
+)
+from navscan.tracking.paths import compute_path_metrics
+from navscan.tracking.queries import query_reverted_by_date, query_reverted_by_date_range, query_rollups
+from navscan.tracking.store import (
+    connect,
+    connect_readonly,
+    init_schema,
+    schema_version,
+    partition_unchanged,
+    record_partition,
+    upsert_candidates,
+    upsert_snapshots,
+)
+
+
+def _memory_db() -> sqlite3.Connection:
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    init_schema(conn)
+    return conn
+
+
+def _snapshot(date: str, symbol: str, pd: float) -> dict:
+    return {"date": date, "symbol": symbol, "premium_discount_pct": pd, "dollar_volume": 1e6}
+
+
+class TestWarehouseWrites(unittest.TestCase):
+    def test_bulk_upsert_counts(self):
+        conn = _memory_db()
+        rows = [_snapshot("2026-02-20", "AAA", -8.0), _snapshot("2026-02-20", "BBB", 6.0)]
+        self.assertEqual(
+            upsert_snapshots(conn, rows, "snap.ndjson"),
+            {"inserted": 2, "updated": 0, "unchanged": 0},
+        )
+        rows[1] = _snapshot("2026-02-20", "BBB", 5.5)
+        self.assertEqual(
+            upsert_snapshots(conn, rows, "snap.ndjson"),
+            {"inserted": 0, "updated": 1, "unchanged": 1},
+        )
+        pd = conn.execute("SELECT premium_discount_pct FROM snapshots WHERE symbol = 'BBB'").fetchone()[0]
+        self.assertEqual(pd, 5.5)
+
+    def test_partition_fingerprint(self):
+        conn = _memory_db()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "snapshot.ndjson"
+            path.write_text('{"symbol": "AAA"}\n', encoding="utf-8")
+            unchanged, fp = partition_unchanged(conn, "snapshots", "2026-02-20", path)
+            self.assertFalse(unchanged)
+            record_partition(conn, "snapshots", "2026-02-20", path, fp, 1)
+            self.assertTrue(partition_unchanged(conn, "snapshots", "2026-02-20", path)[0])
+
+            path.write_text('{"symbol": "AAA", "nav": 1}\n', encoding="utf-8")
+            self.assertFalse(partition_unchanged(conn, "snapshots", "2026-02-20", path)[0])
+
+    def _seed_outcome_inputs(self, conn):
+        upsert_snapshots(
+            conn,
+            [_snapshot("2026-02-21", "AAA", -4.0), _snapshot("2026-02-21", "BBB", 7.0)],
+            "snap.ndjson",
+        )
+        cands = [
+            {"date": "2026-02-20", "symbol": "AAA", "rank": 1, "premium_discount_pct": -8.0},
+            {"date": "2026-02-20", "symbol": "BBB", "rank": 2, "premium_discount_pct": 6.0},
+            {"date": "2026-02-20", "symbol": "CCC", "rank": 3, "premium_discount_pct": 0.0},
+            {"date": "2026-02-20", "symbol": "DDD", "rank": 4, "premium_discount_pct": None},
+        ]
+        upsert_candidates(conn, cands, "cands.ndjson")
+        return cands
+
+    def test_outcome_statuses(self):
+        conn = _memory_db()
+        cands = self._seed_outcome_inputs(conn)
+        scan = [
+            {"symbol": c["symbol"], "premium_discount_pct_at_scan": c["premium_discount_pct"]} for c in cands
+        ]
+        counts = compute_and_store_outcomes(conn, "2026-02-20", scan, [1, 3])
+        self.assertEqual(counts, {"ok": 2, "missing_followup_data": 4, "zero_scan_pd": 2})
+
+        by_symbol = {
+            r["symbol"]: (r["status"], r["reverted_flag"])
+            for r in conn.execute("SELECT symbol, status, reverted_flag FROM outcomes WHERE horizon_days = 1")
+        }
+        self.assertEqual(by_symbol["AAA"], ("ok", 1))
+        self.assertEqual(by_symbol["BBB"], ("ok", 0))
+        self.assertEqual(by_symbol["CCC"], ("zero_scan_pd", None))
+        self.assertEqual(by_symbol["DDD"], ("missing_scan_pd", None))
+
+    def test_set_based_outcomes_match_row_path(self):
+        row_conn = _memory_db()
+        cands = self._seed_outcome_inputs(row_conn)
+        scan = [
+            {"symbol": c["symbol"], "premium_discount_pct_at_scan": c["premium_discount_pct"]} for c in cands
+        ]
+        row_counts = compute_and_store_outcomes(row_conn, "2026-02-20", scan, [1, 3])
+
+        set_conn = _memory_db()
+        self._seed_outcome_inputs(set_conn)
+        set_counts = compute_outcomes_set_based(set_conn, ["2026-02-20"], [1, 3])
+
+        self.assertEqual(set_counts, row_counts)
+        query = """
+            SELECT scan_date, symbol, horizon_days, target_date, pd_scan, pd_target, abs_pd_change,
+                   reverted_flag, status, reason, source_snapshot_date
+            FROM outcomes ORDER BY symbol, horizon_days
+        """
+        self.assertEqual(
+            [tuple(r) for r in set_conn.execute(query)],
+            [tuple(r) for r in row_conn.execute(query)],
+        )
+
+    def test_reverted_queries(self):
+        conn = _memory_db()
+        self.assertGreaterEqual(schema_version(conn), 1)
+        self._seed_outcome_inputs(conn)
+        compute_outcomes_set_based(conn, ["2026-02-20"], [1, 3])
+
+        out = query_reverted_by_date(conn, "2026-02-20", 3, "2026-02-28")
+        self.assertEqual(out["candidate_count"], 3)
+        self.assertEqual(out["reverted_count"], 1)
+        self.assertEqual(out["with_followup_count"], 2)
+        self.assertEqual(out["missing_followup_count"], 1)
+
+        self.assertEqual(query_reverted_by_date_range(conn, "2026-02-01", "2026-02-28", 3, "2026-02-28"), [out])
+        self.assertEqual(query_reverted_by_date(conn, "2026-02-19", 3, "2026-02-28")["candidate_count"], 0)
+
+    def test_incremental_outcomes_follow_watermark(self):
+        conn = _memory_db()
+        self._seed_outcome_inputs(conn)
+        counts, pairs = update_outcomes_incremental(conn, ["2026-02-20"], [1, 3])
+        self.assertEqual(counts, {"ok": 2, "missing_followup_data": 4, "zero_scan_pd": 2})
+        self.assertEqual(pairs, {"recomputed": 2, "skipped_unchanged": 0, "pending": 1})
+
+        _, pairs = update_outcomes_incremental(conn, ["2026-02-20"], [1, 3])
+        self.assertEqual(pairs, {"recomputed": 0, "skipped_unchanged": 2, "pending": 1})
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir) / "snapshot.ndjson"
+            path.write_text('{"symbol": "AAA"}\n', encoding="utf-8")
+            upsert_snapshots(conn, [_snapshot("2026-02-23", "AAA", -1.0)], str(path))
+            _, fp = partition_unchanged(conn, "snapshots", "2026-02-23", path)
+            record_partition(conn, "snapshots", "2026-02-23", path, fp, 1)
+
+        counts, pairs = update_outcomes_incremental(conn, ["2026-02-20"], [1, 3])
+        self.assertEqual(pairs, {"recomputed": 1, "skipped_unchanged": 1, "pending": 1})
+        self.assertEqual(counts["ok"], 1)
+        status = conn.execute(
+            "SELECT status FROM outcomes WHERE symbol = 'AAA' AND horizon_days = 3"
+        ).fetchone()[0]
+        self.assertEqual(status, "ok")
+
+    def test_rollups_follow_recomputed_pairs(self):
+        conn = _memory_db()
+        self._seed_outcome_inputs(conn)
+        update_outcomes_incremental(conn, ["2026-02-20"], [1, 3])
+        out = query_rollups(conn, "2026-02-01", "2026-02-28", ["horizon", "rank_bucket"])
+        self.assertEqual(
+            out,
+            [
+                {
+                    "horizon": 1,
+                    "rank_bucket": "1-5",
+                    "n": 4,
+                    "ok_count": 2,
+                    "reverted_count": 1,
+                    "missing_followup_count": 0,
+                    "hit_rate": 0.5,
+                    "mean_abs_pd_change": 1.5,
+                },
+                {
+                    "horizon": 3,
+                    "rank_bucket": "1-5",
+                    "n": 4,
+                    "ok_count": 0,
+                    "reverted_count": 0,
+                    "missing_followup_count": 2,
+                    "hit_rate": None,
+                    "mean_abs_pd_change": None,
+                },
+            ],
+        )
+
+        conn.execute("DELETE FROM outcome_rollups")
+        upsert_snapshots(conn, [_snapshot("2026-02-23", "AAA", -1.0)], "snap.ndjson")
+        update_outcomes_incremental(conn, ["2026-02-20"], [1, 3], force=True)
+        month = query_rollups(conn, "2026-02-01", "2026-02-28", ["month"], horizon_days=3)
+        self.assertEqual(month[0]["month"], "2026-02")
+        self.assertEqual((month[0]["ok_count"], month[0]["reverted_count"]), (1, 1))
+        with self.assertRaises(ValueError):
+            query_rollups(conn, "2026-02-01", "2026-02-28", ["category"])
+
+    def test_asof_index_resolves_horizon_modes(self):
+        index = SnapshotAsOfIndex.from_rows(
+            [
+                ("AAA", "2026-02-20", -8.0),
+                ("AAA", "2026-02-23", -5.0),
+                ("AAA", "2026-02-24", None),
+                ("AAA", "2026-02-25", -2.0),
+            ]
+        )
+        # 2026-02-20 is a Friday: one calendar day later is a Saturday with no snapshot.
+        self.assertIsNone(index.resolve("AAA", "2026-02-20", 1, "calendar"))
+        self.assertEqual(index.resolve("AAA", "2026-02-20", 3, "calendar"), ("2026-02-23", -5.0))
+        self.assertEqual(index.resolve("AAA", "2026-02-20", 1, "trading"), ("2026-02-23", -5.0))
+        self.assertEqual(index.resolve("AAA", "2026-02-20", 2, "trading"), ("2026-02-25", -2.0))
+        self.assertIsNone(index.resolve("AAA", "2026-02-20", 3, "trading"))
+        self.assertIsNone(index.resolve("AAA", "2026-02-20", 1, "asof"))
+        self.assertEqual(index.resolve("AAA", "2026-02-20", 4, "asof"), ("2026-02-23", -5.0))
+        self.assertIsNone(index.resolve("BBB", "2026-02-20", 1, "trading"))
+
+    def test_trading_mode_replaces_calendar_outcomes(self):
+        conn = _memory_db()
+        self._seed_outcome_inputs(conn)
+        update_outcomes_incremental(conn, ["2026-02-20"], [1, 3])
+        counts, pairs = update_outcomes_incremental(conn, ["2026-02-20"], [1, 3], mode="trading")
+        self.assertEqual(pairs["recomputed"], 2)
+        self.assertEqual(counts, {"ok": 2, "missing_followup_data": 4, "zero_scan_pd": 2})
+        rows = {
+            (r["symbol"], r["horizon_days"]): (r["target_date"], r["status"])
+            for r in conn.execute("SELECT symbol, horizon_days, target_date, status FROM outcomes")
+        }
+        self.assertEqual(len(rows), 8)
+        self.assertEqual(rows[("AAA", 1)], ("2026-02-21", "ok"))
+        self.assertEqual(rows[("AAA", 3)], ("2026-02-23", "missing_followup_data"))
+
+    def test_failed_outcome_write_keeps_previous_outcomes(self):
+        conn = _memory_db()
+        self._seed_outcome_inputs(conn)
+        update_outcomes_incremental(conn, ["2026-02-20"], [1, 3], mode="trading")
+        before = conn.execute("SELECT * FROM outcomes ORDER BY symbol, horizon_days").fetchall()
+        upsert_snapshots(conn, [_snapshot("2026-02-23", "AAA", -2.0)], "snap2.ndjson")
+        with mock.patch("navscan.tracking.outcomes.upsert_outcomes", side_effect=sqlite3.OperationalError("disk I/O")):
+            with self.assertRaises(sqlite3.OperationalError):
+                update_outcomes_incremental(conn, ["2026-02-20"], [1, 3], mode="trading", force=True)
+        after = conn.execute("SELECT * FROM outcomes ORDER BY symbol, horizon_days").fetchall()
+        self.assertEqual([tuple(r) for r in after], [tuple(r) for r in before])
+
+    def test_path_metrics(self):
+        conn = _memory_db()
+        upsert_snapshots(
+            conn,
+            [
+                _snapshot("2026-02-20", "AAA", -8.0),
+                _snapshot("2026-02-23", "AAA", -9.0),
+                _snapshot("2026-02-24", "AAA", -3.0),
+                _snapshot("2026-02-25", "AAA", 0.5),
+                _snapshot("2026-02-26", "AAA", -1.0),
+            ],
+            "snap.ndjson",
+        )
+        upsert_candidates(
+            conn,
+            [
+                {"date": "2026-02-20", "symbol": "AAA", "rank": 1, "premium_discount_pct": -8.0},
+                {"date": "2026-02-26", "symbol": "AAA", "rank": 1, "premium_discount_pct": -1.0},
+                {"date": "2026-02-20", "symbol": "BBB", "rank": 2, "premium_discount_pct": None},
+            ],
+            "cands.ndjson",
+        )
+        counts = compute_path_metrics(conn, ["2026-02-20", "2026-02-26"], [3, 5])
+        self.assertEqual(counts, {"ok": 2, "missing_followup_data": 2, "missing_scan_pd": 2, "zero_scan_pd": 0})
+        rows = {
+            (r["scan_date"], r["symbol"], r["window_days"]): r
+            for r in conn.execute("SELECT * FROM outcomes_path")
+        }
+        short = rows[("2026-02-20", "AAA", 3)]
+        self.assertEqual((short["observations"], short["max_favorable_reversion"]), (1, -1.0))
+        self.assertEqual((short["days_to_first_reversion"], short["crossed_zero"]), (None, 0))
+        full = rows[("2026-02-20", "AAA", 5)]
+        self.assertEqual((full["observations"], full["max_favorable_reversion"]), (3, 7.5))
+        self.assertEqual(full["max_favorable_date"], "2026-02-25")
+        self.assertEqual((full["days_to_first_reversion"], full["days_to_zero_cross"]), (4, 5))
+        self.assertEqual(rows[("2026-02-26", "AAA", 5)]["status"], "missing_followup_data")
+        self.assertEqual(rows[("2026-02-20", "BBB", 3)]["status"], "missing_scan_pd")
+
+    def test_archived_year_still_feeds_outcomes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            conn = connect(Path(tmpdir) / "wh.sqlite")
+            init_schema(conn)
+            upsert_snapshots(
+                conn,
+                [
+                    _snapshot("2025-12-31", "AAA", -8.0),
+                    _snapshot("2026-01-01", "AAA", -5.0),
+                    _snapshot("2026-01-02", "AAA", -9.0),
+                ],
+                "snap.ndjson",
+            )
+            upsert_candidates(
+                conn,
+                [{"date": "2025-12-31", "symbol": "AAA", "rank": 1, "premium_discount_pct": -8.0}],
+                "cands.ndjson",
+            )
+            with self.assertRaises(ValueError):
+                archive_snapshot_year(conn, 2026, Path(tmpdir) / "archive")
+            out = archive_snapshot_year(conn, 2025, Path(tmpdir) / "archive")
+            self.assertEqual((out["moved_rows"], out["archive_rows"]), (1, 1))
+            self.assertEqual(archived_snapshot_years(conn), {2025})
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0], 2)
+            self.assertEqual(snapshot_relation(conn, "2026-01-01"), "snapshots")
+
+            view = snapshot_relation(conn, "2025-12-31", "2026-01-02")
+            self.assertEqual(conn.execute(f"SELECT COUNT(*) FROM {view}").fetchone()[0], 3)
+            counts, _ = update_outcomes_incremental(conn, ["2025-12-31"], [1, 2])
+            self.assertEqual(counts["ok"], 2)
+            row = conn.execute("SELECT pd_scan, pd_target FROM outcomes WHERE horizon_days = 2").fetchone()
+            self.assertEqual(tuple(row), (-8.0, -9.0))
+            conn.close()
+
+    def test_changed_partition_in_archived_year_is_merged_into_archive(self):
+        logger = logging.getLogger("navscan.test")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            tmpdir = Path(tmpdir)
+            db_path, silver, signals = tmpdir / "wh.sqlite", tmpdir / "silver", tmpdir / "signals"
+
+            def write_silver(date: str, pd: float) -> None:
+                path = silver / f"date={date}" / "snapshot.ndjson"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(json.dumps(_snapshot(date, "AAA", pd)) + "\n", encoding="utf-8")
+
+            write_silver("2025-12-31", -8.0)
+            write_silver("2026-01-02", -9.0)
+            update_warehouse(db_path, signals, silver, [1], logger)
+            conn = connect(db_path)
+            archive_snapshot_year(conn, 2025, tmpdir / "archive")
+            conn.close()
+
+            write_silver("2025-12-31", -7.0)
+            with self.assertLogs(logger, level="WARNING"):
+                summary = update_warehouse(db_path, signals, silver, [1], logger)
+            self.assertEqual((summary["partitions"]["rearchived"], summary["partitions"]["skipped_archived"]), (1, 0))
+            again = update_warehouse(db_path, signals, silver, [1], logger)
+            self.assertEqual(again["partitions"]["skipped_archived"], 1)
+            with self.assertLogs(logger, level="WARNING"):
+                forced = update_warehouse(db_path, signals, silver, [1], logger, force_reload=True)
+            self.assertEqual((forced["partitions"]["rearchived"], forced["partitions"]["skipped_archived"]), (1, 0))
+
+            conn = connect(db_path)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM snapshots WHERE date < '2026'").fetchone()[0], 0)
+            view = snapshot_relation(conn, "2025-12-31", "2025-12-31")
+            rows = conn.execute(f"SELECT premium_discount_pct FROM {view} WHERE date = '2025-12-31'").fetchall()
+            self.assertEqual([r[0] for r in rows], [-7.0])
+            conn.close()
+
+    def test_readonly_connection_reads_during_write(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "wh.sqlite"
+            writer = connect(db_path)
+            init_schema(writer)
+            self.assertEqual(writer.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            upsert_snapshots(writer, [_snapshot("2026-02-20", "AAA", -8.0)], "snap.ndjson")
+
+            reader = connect_readonly(db_path)
+            writer.execute("BEGIN IMMEDIATE")
+            writer.execute("DELETE FROM snapshots")
+            self.assertEqual(reader.execute("SELECT COUNT(*) FROM snapshots").fetchone()[0], 1)
+            writer.rollback()
+            with self.assertRaises(sqlite3.OperationalError):
+                reader.execute("DELETE FROM snapshots")
+            reader.close()
+            writer.close()
+
+    def test_query_service_reports_database_errors(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "wh.sqlite"
+            writer = connect(db_path)
+            init_schema(writer)
+            self._seed_outcome_inputs(writer)
+            with writer:
+                writer.execute(
+                    "INSERT INTO archives (kind, year, path, row_count, archived_ts) "
+                    "VALUES ('snapshots', 2025, 'missing/snapshots_2025.sqlite', 0, '2026-01-01T00:00:00Z')"
+                )
+            writer.close()
+
+            pool = ReadOnlyPool(db_path, size=1)
+            service = QueryService(pool, ResultCache())
+            try:
+                status, body = service.handle("/history", {"symbol": "AAA", "start": "2025-01-01"})
+                self.assertEqual(status, 500)
+                self.assertIn("database error", body["error"])
+                # The only pooled connection is back; this would block otherwise.
+                self.assertEqual(service.handle("/health", {})[0], 200)
+            finally:
+                pool.close()
+
+    def test_http_api_caches_until_new_scan_date(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = Path(tmpdir) / "wh.sqlite"
+            writer = connect(db_path)
+            init_schema(writer)
+            self._seed_outcome_inputs(writer)
+            upsert_snapshots(writer, [_snapshot("2026-02-20", "AAA", -8.0)], "snap.ndjson")
+            update_outcomes_incremental(writer, ["2026-02-20"], [1])
+
+            server = make_server(db_path, port=0, pool_size=2)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            base = f"http://127.0.0.1:{server.server_address[1]}"
+
+            def get(path):
+                with urllib.request.urlopen(base + path) as resp:
+                    return json.loads(resp.read())
+
+            try:
+                out = get("/candidates?limit=2")
+                self.assertEqual(out["scan_date"], "2026-02-20")
+                self.assertEqual([r["symbol"] for r in out["candidates"]], ["AAA", "BBB"])
+                history = get("/history?symbol=AAA")["points"]
+                self.assertEqual([(p["date"], p["premium_discount_pct"]) for p in history], [
+                    ("2026-02-20", -8.0),
+                    ("2026-02-21", -4.0),
+                ])
+                hit = get("/hit-rate?start=2026-02-20&top_n=4")["rows"][0]
+                self.assertEqual((hit["candidate_count"], hit["reverted_count"]), (4, 1))
+                get("/candidates?limit=2")
+                self.assertEqual(get("/health")["cache"], {"entries": 3, "hits": 1, "misses": 3})
+
+                with self.assertRaises(urllib.error.HTTPError) as ctx:
+                    get("/hit-rate?start=yesterday")
+                self.assertEqual(ctx.exception.code, 400)
+                ctx.exception.close()
+
+                upsert_candidates(
+                    writer,
+                    [{"date": "2026-02-21", "symbol": "BBB", "rank": 1, "premium_discount_pct": 7.0}],
+                    "cands.ndjson",
+                )
+                self.assertEqual(get("/candidates")["scan_date"], "2026-02-21")
+                self.assertEqual(get("/health")["cache"]["entries"], 1)
+            finally:
+                server.shutdown()
+                server.server_close()
+                server.service.pool.close()
+                writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()